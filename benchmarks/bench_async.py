@@ -0,0 +1,96 @@
+# benchmarks/bench_async.py
+"""Compare the sync (threadpool) and async (DB_ASYNC=1) database layers under concurrent clients.
+
+Usage (from the project root, with requirements-dev.txt installed):
+    python -m benchmarks.bench_async --clients 50 --requests 2000
+
+Each mode runs in its own process against the same SQLite copy of the sample
+data, driving the ASGI app in-process through httpx.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PATHS = ["/inventory/health?limit=100", "/claims/summary"]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def drive(clients, requests):
+    import httpx
+    import main
+
+    latencies = []
+    counter = iter(range(requests))
+
+    async def client_loop(client):
+        for i in counter:
+            started = time.perf_counter()
+            response = await client.get(PATHS[i % len(PATHS)])
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+    }
+
+
+def run_mode(mode, database_url, clients, requests):
+    env = dict(os.environ, DATABASE_URL=database_url, DB_ASYNC="1" if mode == "async" else "0",
+               CLAIMS_SUMMARY_CACHE_TTL="0")
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_async", "--child",
+         "--clients", str(clients), "--requests", str(requests)],
+        cwd=ROOT, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(drive(args.clients, args.requests))))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        os.environ["DATABASE_URL"] = database_url
+        import load_data
+        load_data.load_data(database_url=database_url, incremental=True, quarantine_dir=Path(tmp) / 'quarantine')
+
+        results = {mode: run_mode(mode, database_url, args.clients, args.requests)
+                   for mode in ("sync", "async")}
+
+    print(json.dumps({"clients": args.clients, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# benchmarks/bench_startup.py
+"""Measure API cold start: import time, startup (lifespan) time and first-request latency.
+
+Usage (from the project root, with requirements-dev.txt installed):
+    python -m benchmarks.bench_startup --runs 10
+
+Every run is a fresh interpreter, as on a newly scaled-up worker. Runs are
+repeated with schema migration on start-up enabled and disabled
+(DB_MIGRATE_ON_STARTUP), against a SQLite copy of the sample data. Exits
+non-zero if importing main loaded any of HEAVY_MODULES.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FIRST_REQUESTS = ["/health", "/claims/summary", "/inventory/health?limit=100"]
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "openpyxl"]
+
+
+async def cold_start():
+    started = time.perf_counter()
+    import main
+    imported = time.perf_counter()
+    heavy_on_import = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    import httpx
+    timings = {"import_ms": (imported - started) * 1000, "heavy_modules_on_import": heavy_on_import}
+    async with main.app.router.lifespan_context(main.app):
+        timings["startup_ms"] = (time.perf_counter() - imported) * 1000
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for path in FIRST_REQUESTS:
+                request_started = time.perf_counter()
+                response = await client.get(path)
+                response.raise_for_status()
+                timings[f"first {path} ms"] = (time.perf_counter() - request_started) * 1000
+    timings["ready_ms"] = (time.perf_counter() - started) * 1000
+    timings["heavy_modules_loaded"] = [name for name in HEAVY_MODULES if name in sys.modules]
+    return timings
+
+
+def run_once(database_url, migrate):
+    env = dict(os.environ, DATABASE_URL=database_url, DB_MIGRATE_ON_STARTUP="1" if migrate else "0",
+               CLAIMS_SUMMARY_CACHE_TTL="0")
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child"],
+        cwd=ROOT, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(runs):
+    summary = {}
+    for key, value in runs[0].items():
+        if isinstance(value, float):
+            values = [run[key] for run in runs]
+            summary[key] = {"median": round(statistics.median(values), 1), "max": round(max(values), 1)}
+        elif isinstance(value, list):
+            summary[key] = sorted({name for run in runs for name in run[key]})
+        else:
+            summary[key] = value
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(cold_start())))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        os.environ["DATABASE_URL"] = database_url
+        import load_data
+        load_data.load_data(database_url=database_url, incremental=True, quarantine_dir=Path(tmp) / 'quarantine')
+
+        results = {
+            mode: summarize([run_once(database_url, migrate) for _ in range(args.runs)])
+            for mode, migrate in (("migrate_on_startup", True), ("no_migrate", False))
+        }
+
+    print(json.dumps({"runs": args.runs, "results": results}, indent=2))
+    heavy = sorted({name for summary in results.values() for name in summary["heavy_modules_on_import"]})
+    if heavy:
+        sys.exit(f"import main loaded {', '.join(heavy)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# benchmarks/datagen.py
+"""Deterministic synthetic supply-chain data in the same CSV layout as the sample files.
+
+Usage (from the project root):
+    python -m benchmarks.datagen --scale 1m --out data/1m
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SCALES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000, '10m': 10_000_000}
+CHUNK_ROWS = 500_000
+# Random stream for vendors/inventory, distinct from the per-chunk streams [seed, chunk]
+DIMENSION_STREAM = 2 ** 31 - 1
+
+START_DATE = np.datetime64('2024-10-01')
+DAYS_OF_HISTORY = 365
+N_WAREHOUSES = 20
+N_CARRIERS = 60
+
+STATUSES = np.array(['Delivered', 'Delayed', 'In Transit', 'Lost'])
+STATUS_WEIGHTS = [0.72, 0.17, 0.08, 0.03]
+POD_STATUSES = np.array(['Signed', 'Pending', 'Missing'])
+CLAIM_STATUSES = np.array(['Approved', 'Rejected', 'Pending'])
+CITIES = np.array(['Springfield', 'Riverside', 'Franklin', 'Greenville', 'Bristol', 'Clinton',
+                   'Fairview', 'Salem', 'Madison', 'Georgetown', 'Arlington', 'Ashland'])
+COUNTRIES = np.array(['United States', 'Mexico', 'Canada', 'Germany', 'China', 'India', 'Vietnam'])
+
+
+def _carriers():
+    names = np.array([f'Carrier {i:03d}' for i in range(1, N_CARRIERS + 1)])
+    # Zipf-like market share: a few national carriers move most of the volume
+    weights = 1.0 / np.arange(1, N_CARRIERS + 1) ** 1.2
+    return names, weights / weights.sum()
+
+
+def _products(rows):
+    return max(100, rows // 500)
+
+
+def _dates(days):
+    return pd.Series(START_DATE + days.astype('timedelta64[D]')).dt.strftime('%Y-%m-%d')
+
+
+def _shipment_chunk(rng, start, size, n_products):
+    ids = np.arange(start, start + size)
+    ship_days = rng.integers(0, DAYS_OF_HISTORY, size)
+    transit_days = rng.integers(1, 11, size)
+    shipments = pd.DataFrame({
+        'shipment_id': pd.Series(ids).map('S{:08d}'.format),
+        'origin_warehouse': pd.Series(rng.integers(1, N_WAREHOUSES + 1, size)).map('W{:03d}'.format),
+        'destination_city': CITIES[rng.integers(0, len(CITIES), size)],
+        'ship_date': _dates(ship_days),
+        'delivery_date': _dates(ship_days + transit_days),
+        'product_id': pd.Series(rng.integers(1, n_products + 1, size)).map('P{:05d}'.format),
+        'quantity': rng.integers(1, 250, size),
+        'freight_cost': rng.uniform(20, 500, size).round(2),
+    })
+
+    carriers, carrier_weights = _carriers()
+    status = rng.choice(len(STATUSES), size, p=STATUS_WEIGHTS)
+    damaged = rng.random(size) < 0.04
+    delivery_logs = pd.DataFrame({
+        'delivery_id': pd.Series(ids).map('D{:08d}'.format),
+        'shipment_id': shipments['shipment_id'],
+        'carrier': carriers[rng.choice(len(carriers), size, p=carrier_weights)],
+        'status': STATUSES[status],
+        'delivery_duration_days': transit_days + np.where(status == 1, rng.integers(1, 8, size), 0),
+        'damage_flag': damaged.astype(int),
+        'proof_of_delivery_status': POD_STATUSES[rng.choice(3, size, p=[0.8, 0.15, 0.05])],
+    })
+
+    # Claims are rare on clean deliveries and common on damaged or lost ones
+    lost = status == 3
+    delayed = status == 1
+    claim_rate = 0.01 + 0.55 * damaged + 0.7 * lost + 0.08 * delayed
+    has_claim = rng.random(size) < claim_rate
+    n_claims = int(has_claim.sum())
+    reason = np.where(damaged, 'Damage', np.where(lost, 'Lost Package',
+                      np.where(delayed, 'Delay', 'Incorrect Delivery')))[has_claim]
+    claim_days = ship_days[has_claim] + transit_days[has_claim] + rng.integers(0, 30, n_claims)
+    claim_status = CLAIM_STATUSES[rng.choice(3, n_claims, p=[0.5, 0.3, 0.2])]
+    resolved = _dates(claim_days + rng.integers(1, 60, n_claims)).where(claim_status != 'Pending', '')
+    claims = pd.DataFrame({
+        'delivery_id': delivery_logs['delivery_id'].values[has_claim],
+        'reason': reason,
+        'amount_claimed': rng.lognormal(5.5, 0.8, n_claims).round(2),
+        'claim_status': claim_status,
+        'claim_date': _dates(claim_days).values,
+        'resolved_date': resolved.values,
+    })
+    return shipments, delivery_logs, claims
+
+
+def _write(df, path, first):
+    df.to_csv(path, mode='w' if first else 'a', header=first, index=False)
+
+
+def generate(out_dir, rows, seed=42):
+    """Write shipments, delivery_logs, claims, vendors and inventory CSVs for `rows` shipments"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    n_products = _products(rows)
+
+    claim_count = 0
+    for number, start in enumerate(range(0, rows, CHUNK_ROWS)):
+        rng = np.random.default_rng([seed, number])
+        size = min(CHUNK_ROWS, rows - start)
+        shipments, delivery_logs, claims = _shipment_chunk(rng, start + 1, size, n_products)
+        claims.insert(0, 'claim_id', [f'C{i:08d}' for i in range(claim_count + 1, claim_count + len(claims) + 1)])
+        claim_count += len(claims)
+        first = number == 0
+        _write(shipments, out_dir / 'shipments.csv', first)
+        _write(delivery_logs, out_dir / 'delivery_logs.csv', first)
+        _write(claims, out_dir / 'claims.csv', first)
+
+    rng = np.random.default_rng([seed, DIMENSION_STREAM])
+    n_vendors = max(10, n_products // 2)
+    contract_days = rng.integers(-DAYS_OF_HISTORY, 0, n_vendors)
+    pd.DataFrame({
+        'vendor_id': [f'V{i:05d}' for i in range(1, n_vendors + 1)],
+        'vendor_name': [f'Vendor {i:05d}' for i in range(1, n_vendors + 1)],
+        'product_id': [f'P{i:05d}' for i in rng.permutation(n_products)[:n_vendors] + 1],
+        'contract_start': _dates(contract_days),
+        'contract_end': _dates(contract_days + 365),
+        'vendor_rating': rng.uniform(1, 5, n_vendors).round(1),
+        'country': COUNTRIES[rng.integers(0, len(COUNTRIES), n_vendors)],
+    }).to_csv(out_dir / 'vendors.csv', index=False)
+
+    warehouses = np.repeat(np.arange(1, N_WAREHOUSES + 1), n_products)
+    products = np.tile(np.arange(1, n_products + 1), N_WAREHOUSES)
+    n_inventory = len(warehouses)
+    last_restock = rng.integers(DAYS_OF_HISTORY - 60, DAYS_OF_HISTORY, n_inventory)
+    pd.DataFrame({
+        'warehouse_id': pd.Series(warehouses).map('W{:03d}'.format),
+        'product_id': pd.Series(products).map('P{:05d}'.format),
+        'stock_level': rng.integers(0, 1000, n_inventory),
+        'reorder_threshold': rng.integers(100, 300, n_inventory),
+        'last_restock_date': _dates(last_restock),
+        'next_restock_due': _dates(last_restock + rng.integers(7, 45, n_inventory)),
+    }).to_csv(out_dir / 'inventory (1).csv', index=False)
+
+    return {'shipments': rows, 'delivery_logs': rows, 'claims': claim_count,
+            'vendors': n_vendors, 'inventory': n_inventory}
+
+
+def generate_delivery_log_upload(path, rows, seed=7, first_id=900_000_000):
+    """A delivery-log upload file whose ids don't collide with generate()'s"""
+    rng = np.random.default_rng([seed, 0])
+    _, delivery_logs, _ = _shipment_chunk(rng, first_id, rows, 100)
+    delivery_logs['shipment_id'] = pd.Series(rng.integers(1, rows + 1, rows)).map('S{:08d}'.format)
+    delivery_logs.to_csv(path, index=False)
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=SCALES, default='10k')
+    parser.add_argument('--rows', type=int, help="Override the number of shipments")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', default='data')
+    args = parser.parse_args()
+    counts = generate(args.out, args.rows or SCALES[args.scale], seed=args.seed)
+    print(counts)
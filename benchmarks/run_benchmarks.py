@@ -0,0 +1,207 @@
+# benchmarks/run_benchmarks.py
+"""Benchmark the project's hot paths against SQLite and record a JSON baseline.
+
+Usage (from the project root, with requirements-dev.txt installed):
+    python -m benchmarks.run_benchmarks --scale 10k --output benchmarks/results/10k.json
+    python -m benchmarks.run_benchmarks --scale 10k --compare benchmarks/results/10k.json
+
+Every step runs in its own process so its peak RSS is measured in isolation.
+Steps share one generated dataset and one SQLite database, which the `load`
+step populates.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks import datagen
+
+ROOT = Path(__file__).resolve().parent.parent
+STEPS = ['load', 'pipeline', 'claims_summary', 'inventory_health', 'upload']
+# Metrics where a larger value is better; every other numeric metric is a cost
+HIGHER_IS_BETTER = {'rows_per_sec', 'requests_per_sec'}
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def latency_stats(latencies):
+    ordered = sorted(latencies)
+
+    def pct(p):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000, 3)
+
+    return {
+        'iterations': len(ordered),
+        'p50_ms': pct(50),
+        'p95_ms': pct(95),
+        'p99_ms': pct(99),
+        'mean_ms': round(statistics.mean(ordered) * 1000, 3),
+        'requests_per_sec': round(len(ordered) / sum(ordered), 1),
+    }
+
+
+def timed(fn, iterations):
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - started)
+    return latency_stats(latencies)
+
+
+# --- Steps (each runs in a child process) ---
+def step_load(data_dir, work_dir, iterations):
+    import load_data
+    started = time.perf_counter()
+    stats = load_data.load_data(folder=data_dir, database_url=os.environ['DATABASE_URL'], raise_errors=True,
+                                quarantine_dir=Path(work_dir) / 'quarantine')
+    elapsed = time.perf_counter() - started
+    rows = sum(table['rows'] for table in stats.values())
+    return {'rows': rows, 'seconds': round(elapsed, 3), 'rows_per_sec': round(rows / elapsed, 1),
+            'tables': stats}
+
+
+def step_pipeline(data_dir, work_dir, iterations):
+    import supply_chain_metrics
+    started = time.perf_counter()
+    result = supply_chain_metrics.run_pipeline(data_dir, str(Path(work_dir) / 'pipeline_output'),
+                                               now='2025-10-01')
+    elapsed = time.perf_counter() - started
+    rows = sum(len(frame) for frame in supply_chain_metrics.load_datasets(data_dir).values())
+    return {'input_rows': rows, 'output_rows': len(result), 'seconds': round(elapsed, 3),
+            'rows_per_sec': round(rows / elapsed, 1)}
+
+
+def step_claims_summary(data_dir, work_dir, iterations):
+    import crud
+    from database import SessionLocal
+    with SessionLocal() as db:
+        return timed(lambda: crud.get_claims_summary(db), iterations)
+
+
+def step_inventory_health(data_dir, work_dir, iterations):
+    import crud
+    from database import SessionLocal
+    with SessionLocal() as db:
+        return timed(lambda: crud.get_inventory_health(db), iterations)
+
+
+def step_upload(data_dir, work_dir, iterations):
+    from fastapi.testclient import TestClient
+    import main
+
+    rows = sum(1 for _ in open(Path(data_dir) / 'delivery_logs.csv')) - 1
+    upload = datagen.generate_delivery_log_upload(Path(work_dir) / 'upload.csv', rows)
+    client = TestClient(main.app)
+    started = time.perf_counter()
+    with open(upload, 'rb') as handle:
+        response = client.post('/uploads/delivery-logs', files={'file': ('upload.csv', handle, 'text/csv')})
+    elapsed = time.perf_counter() - started
+    response.raise_for_status()
+    body = response.json()
+    return {'rows': body['records_processed'], 'inserted': body['records_inserted'],
+            'seconds': round(elapsed, 3), 'rows_per_sec': round(body['records_processed'] / elapsed, 1)}
+
+
+def run_step(step, data_dir, work_dir, iterations):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{Path(work_dir) / 'bench.db'}",
+               CLAIMS_SUMMARY_CACHE_TTL='0', SLOW_QUERY_MS='1e9')
+    completed = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.run_benchmarks', '--step', step,
+         '--data-dir', str(data_dir), '--work-dir', str(work_dir), '--iterations', str(iterations)],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        # A missing number would only show up later as a bogus comparison, so stop here
+        sys.stderr.write(completed.stderr)
+        sys.exit(f"Step {step} failed with exit code {completed.returncode}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+# --- Baseline comparison ---
+def compare(current, baseline, tolerance):
+    """Print per-metric changes and return the list of regressions beyond tolerance"""
+    regressions = []
+    for step, metrics in current['results'].items():
+        previous = baseline.get('results', {}).get(step, {})
+        for name, value in metrics.items():
+            old = previous.get(name)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or old == 0:
+                continue
+            if name not in HIGHER_IS_BETTER and not name.endswith(('_ms', 'seconds', 'rss_mb')):
+                continue
+            change = (value - old) / old
+            worse = -change if name in HIGHER_IS_BETTER else change
+            marker = 'REGRESSION' if worse > tolerance else ''
+            print(f"{step:18} {name:18} {old:>12} -> {value:>12} ({change:+.1%}) {marker}")
+            if marker:
+                regressions.append((step, name, old, value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=datagen.SCALES, default='10k')
+    parser.add_argument('--rows', type=int, help="Override the number of shipments")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--steps', nargs='+', choices=STEPS, default=STEPS)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--output', help="Write results to this JSON file")
+    parser.add_argument('--compare', help="Baseline JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help="Relative slowdown reported as a regression (default 0.10)")
+    parser.add_argument('--step', choices=STEPS, help=argparse.SUPPRESS)
+    parser.add_argument('--data-dir', help=argparse.SUPPRESS)
+    parser.add_argument('--work-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.step:
+        result = globals()[f'step_{args.step}'](args.data_dir, args.work_dir, args.iterations)
+        result['peak_rss_mb'] = peak_rss_mb()
+        print(json.dumps(result))
+        return
+
+    rows = args.rows or datagen.SCALES[args.scale]
+    with tempfile.TemporaryDirectory() as work_dir:
+        data_dir = Path(work_dir) / 'data'
+        started = time.perf_counter()
+        counts = datagen.generate(data_dir, rows, seed=args.seed)
+        print(f"Generated {counts} in {time.perf_counter() - started:.1f}s")
+
+        results = {}
+        for step in [s for s in STEPS if s in args.steps or s == 'load']:
+            results[step] = run_step(step, data_dir, work_dir, args.iterations)
+            print(f"{step}: {results[step]}")
+
+    report = {
+        'scale': args.scale,
+        'rows': rows,
+        'seed': args.seed,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    if args.compare:
+        regressions = compare(report, json.loads(Path(args.compare).read_text()), args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+# cache.py
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Small thread-safe in-process cache whose entries expire after ttl seconds"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        # key -> [asyncio.Lock, callers using it] while get_or_set_async is filling the key
+        self._fills = {}
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+
+    def get_or_set(self, key, factory):
+        """Return the cached value, computing and storing it with factory() on a miss"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    async def get_or_set_async(self, key, factory):
+        """Same as get_or_set for a coroutine factory, awaited once for concurrent misses on a key
+
+        The first caller to miss computes the value; the others wait on its
+        per-key lock and then read what it stored. If it fails, the next
+        waiter tries factory() itself.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        fill = self._fills.setdefault(key, [asyncio.Lock(), 0])
+        fill[1] += 1
+        try:
+            async with fill[0]:
+                value = self.get(key, _MISSING)
+                if value is _MISSING:
+                    value = await factory()
+                    self.set(key, value)
+            return value
+        finally:
+            fill[1] -= 1
+            if not fill[1]:
+                del self._fills[key]
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when no key is given"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+class LRUCache:
+    """Thread-safe cache bounded to maxsize entries (least recently used evicted first) with a TTL
+
+    Counts hits, misses and evictions for monitoring.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def get_many(self, keys):
+        """Return {key: value} for the keys that are cached"""
+        found = {}
+        for key in keys:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                found[key] = value
+        return found
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when no key is given"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def invalidate_many(self, keys):
+        """Drop the given keys under a single lock acquisition"""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_MISSING = object()
+
+# --- Shared caches ---
+claims_summary_cache = TTLCache(ttl=float(os.getenv('CLAIMS_SUMMARY_CACHE_TTL', '30')))
+# Claim aging is live operational data, so it is only cached briefly
+claims_aging_cache = TTLCache(ttl=float(os.getenv('CLAIMS_AGING_CACHE_TTL', '15')))
+# Marks the daily carrier rollup as recently refreshed; reads refresh it at most this often
+carrier_rollup_freshness = TTLCache(ttl=float(os.getenv('CARRIER_ROLLUP_REFRESH_SECONDS', '60')))
+# Marks the restock forecasts as recently refreshed; reads recompute stale SKUs at most this often
+inventory_forecast_freshness = TTLCache(ttl=float(os.getenv('INVENTORY_FORECAST_REFRESH_SECONDS', '60')))
+# The vendor scorecard scans every shipment, so it is computed once and paged from the cache;
+# shipment, delivery-log and claim writes drop it on commit (see rollups.py)
+vendor_performance_cache = TTLCache(ttl=float(os.getenv('VENDOR_PERFORMANCE_CACHE_TTL', '300')))
+
+
+# Serve vendors and inventory from in-process column snapshots (dimstore.py) instead of the database
+DIMSTORE_ENABLED = os.getenv('DIMSTORE_ENABLED', '0').lower() in ('1', 'true', 'yes')
+
+
+# Single-entity lookups by primary key; crud reads through these and its create paths invalidate them
+ENTITY_CACHE_SIZE = int(os.getenv('ENTITY_CACHE_SIZE', '10000'))
+ENTITY_CACHE_TTL = float(os.getenv('ENTITY_CACHE_TTL', '60'))
+entity_caches = {
+    name: LRUCache(maxsize=ENTITY_CACHE_SIZE, ttl=ENTITY_CACHE_TTL)
+    for name in ('vendors', 'delivery_logs', 'shipments', 'claims')
+}
+
+
+def prometheus_lines():
+    """Entity cache counters in Prometheus text format (registered as a metrics collector)"""
+    series = [
+        ('entity_cache_hits_total', 'counter', 'Entity cache lookups served from memory', 'hits'),
+        ('entity_cache_misses_total', 'counter', 'Entity cache lookups that went to the database', 'misses'),
+        ('entity_cache_evictions_total', 'counter', 'Entries evicted to stay within ENTITY_CACHE_SIZE', 'evictions'),
+        ('entity_cache_entries', 'gauge', 'Entries currently cached', None),
+    ]
+    lines = []
+    for metric, kind, description, attribute in series:
+        lines += [f'# HELP {metric} {description}', f'# TYPE {metric} {kind}']
+        for name, entity_cache in sorted(entity_caches.items()):
+            value = getattr(entity_cache, attribute) if attribute else len(entity_cache)
+            lines.append(f'{metric}{{entity="{name}"}} {value}')
+    return lines
@@ -0,0 +1,45 @@
+import asyncio
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Literal, Optional
+from database import get_read_session, get_session, run_db
+import cache
+import crud
+import pydantic_models
+
+router = APIRouter(prefix="/carriers", tags=["carriers"])
+
+# One refresh at a time; concurrent readers wait for it instead of recomputing the same days
+_refresh_lock = asyncio.Lock()
+
+async def _ensure_fresh(db):
+    async with _refresh_lock:
+        await cache.carrier_rollup_freshness.get_or_set_async(
+            "daily", lambda: run_db(db, crud.refresh_carrier_performance)
+        )
+
+@router.get("/performance", response_model=List[pydantic_models.CarrierPerformance])
+async def get_carrier_performance(
+    window: Literal["daily", "weekly", "monthly"] = "monthly",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    carrier: Optional[str] = None,
+    db: Session = Depends(get_read_session)
+):
+    """Carrier delivery times, damage and claims per shipment-date window"""
+    if start is not None and end is not None and start > end:
+        raise HTTPException(400, "start must not be after end")
+    await _ensure_fresh(db)
+    return await run_db(db, crud.get_carrier_performance, window, start, end, carrier)
+
+@router.post("/performance/refresh")
+async def refresh_carrier_performance(
+    full: bool = Query(False, description="Recompute all history instead of the dates with new rows"),
+    db: Session = Depends(get_session)
+):
+    """Recompute the daily carrier rollup now"""
+    async with _refresh_lock:
+        days = await run_db(db, crud.refresh_carrier_performance, full)
+        cache.carrier_rollup_freshness.set("daily", days)
+    return {"days_refreshed": days}
\ No newline at end of file
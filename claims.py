@@ -1,13 +1,65 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from typing import List
-from database import get_db
+from typing import List, Optional
+from datetime import date
+from database import get_read_session, get_session, run_db
+import cache
 import crud
 import pydantic_models
+import responses
+import utils
 
 router = APIRouter(prefix="/claims", tags=["claims"])
 
 @router.get("/summary", response_model=List[pydantic_models.ClaimsSummary])
-async def get_claims_summary(db: Session = Depends(get_db)):
-    """Return claim percentages per carrier"""
-    return crud.get_claims_summary(db)
\ No newline at end of file
+async def get_claims_summary(request: Request, db: Session = Depends(get_read_session)):
+    """Return claim percentages per carrier
+
+    The encoded body is cached, so repeat reads (and 304s for a matching
+    If-None-Match) skip both the query and serialization.
+    """
+    async def build():
+        return responses.encode(await run_db(db, crud.claims_summary_rows))
+
+    payload = await cache.claims_summary_cache.get_or_set_async("summary", build)
+    return responses.json_response(request, payload)
+
+@router.post("/summary/refresh", response_model=List[pydantic_models.ClaimsSummary])
+async def refresh_claims_summary(db: Session = Depends(get_session)):
+    """Rebuild the per-carrier rollup from the base tables and drop the cached summary"""
+    summary = await run_db(db, crud.refresh_claims_summary)
+    cache.claims_summary_cache.set("summary", responses.encode([row.model_dump() for row in summary]))
+    return summary
+
+@router.get("/aging", response_model=pydantic_models.ClaimsAging)
+async def get_claims_aging(
+    request: Request,
+    since: Optional[date] = Query(None, description="Only claims filed on or after this date"),
+    db: Session = Depends(get_read_session)
+):
+    """Open-claim aging buckets and resolution-time percentiles per carrier and per reason"""
+    async def build():
+        return responses.encode(await run_db(db, crud.claims_aging_rows, since))
+
+    payload = await cache.claims_aging_cache.get_or_set_async(("aging", since), build)
+    return responses.json_response(request, payload)
+
+@router.get("/", response_model=List[pydantic_models.ClaimResponse])
+async def read_claims(
+    ids: str = Query(..., description="Comma-separated claim ids to fetch in one call"),
+    db: Session = Depends(get_session)
+):
+    """Get the listed claims"""
+    try:
+        keys = utils.split_ids(ids)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return await run_db(db, crud.get_entities_in_order, 'claims', keys)
+
+@router.get("/{claim_id}", response_model=pydantic_models.ClaimResponse)
+async def read_claim(claim_id: str, db: Session = Depends(get_session)):
+    """Get a specific claim by ID"""
+    claim = await run_db(db, crud.get_claim, claim_id)
+    if claim is None:
+        raise HTTPException(status_code=404, detail="Claim not found")
+    return claim
\ No newline at end of file
@@ -0,0 +1,141 @@
+# cleaning.py
+"""Chunked, process-parallel cleaning stage for the source CSVs.
+
+Every table has a spec mapping column -> parser. A parser is a pure, top-level
+function from a Series of raw strings to the converted Series, so a spec can
+be applied to any chunk in any worker process and checked on its own:
+
+    clean_chunk('claims', pd.DataFrame({'claim_date': ['06/03/2025']}))
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import pandas as pd
+
+DEFAULT_CHUNK_ROWS = 100_000
+# Below this much input, starting worker processes costs more than it saves
+PARALLEL_MIN_BYTES = int(os.getenv('CLEANING_PARALLEL_MIN_BYTES', str(8 * 1024 * 1024)))
+
+DATE_FORMATS = ('%Y-%m-%d', '%m/%d/%Y')
+BOOLEAN_VALUES = {
+    'true': True, '1': True, 'yes': True, 'y': True,
+    'false': False, '0': False, 'no': False, 'n': False
+}
+
+
+# --- Parsers ---
+def parse_dates(series):
+    """Parse a column of date strings, trying each known format on the rows still unparsed"""
+    text_values = series.astype('string').str.strip()
+    text_values = text_values.mask(text_values.isin(['', 'NULL']))
+    parsed = pd.Series(pd.NaT, index=series.index, dtype='datetime64[ns]')
+    for fmt in DATE_FORMATS:
+        pending = parsed.isna() & text_values.notna()
+        if not pending.any():
+            break
+        parsed[pending] = pd.to_datetime(text_values[pending], format=fmt, errors='coerce')
+    pending = parsed.isna() & text_values.notna()
+    if pending.any():
+        parsed[pending] = pd.to_datetime(text_values[pending], format='ISO8601', errors='coerce')
+    return parsed.dt.date.where(parsed.notna(), None)
+
+
+def parse_booleans(series):
+    return series.astype(str).str.strip().str.lower().map(BOOLEAN_VALUES).fillna(False).astype(bool)
+
+
+def parse_numbers(series, fill=None, integer=False):
+    """Coerce to numbers; invalid or missing values become fill (None keeps them NULL)"""
+    values = pd.to_numeric(series, errors='coerce')
+    if fill is not None:
+        values = values.fillna(fill)
+    return values.astype(int) if integer else values
+
+
+def numbers(fill=None, integer=False):
+    return partial(parse_numbers, fill=fill, integer=integer)
+
+
+# --- Per-table specs: column -> parser ---
+CLEANING_SPECS = {
+    'shipments': {
+        'ship_date': parse_dates,
+        'delivery_date': parse_dates,
+        'quantity': numbers(fill=0),
+        'freight_cost': numbers(fill=0),
+    },
+    'vendors': {
+        'contract_start': parse_dates,
+        'contract_end': parse_dates,
+        'vendor_rating': numbers(),
+    },
+    'inventory': {
+        'last_restock_date': parse_dates,
+        'next_restock_due': parse_dates,
+        'stock_level': numbers(fill=0, integer=True),
+        'reorder_threshold': numbers(fill=0, integer=True),
+    },
+    'delivery_logs': {
+        'delivery_duration_days': numbers(fill=0, integer=True),
+        'damage_flag': parse_booleans,
+    },
+    'claims': {
+        'claim_date': parse_dates,
+        'resolved_date': parse_dates,
+        'amount_claimed': numbers(fill=0.0),
+    },
+}
+
+
+def clean_chunk(name, df):
+    """Apply a table's spec to one chunk of raw (string) columns"""
+    for col, parser in CLEANING_SPECS.get(name, {}).items():
+        if col in df.columns:
+            df[col] = parser(df[col])
+    return df
+
+
+# --- Stage ---
+def _read_chunks(path, chunk_rows):
+    # Everything is read as text so every chunk has the same dtypes; the spec does the typing
+    return pd.read_csv(path, dtype=str, chunksize=chunk_rows)
+
+
+def _concat(chunks):
+    frame = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+    return frame.reset_index(drop=True)
+
+
+def read_and_clean(paths, workers=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Read {table: csv path} in chunks and clean the chunks on a process pool
+
+    Chunks are submitted as they are read, so parsing the next chunk overlaps
+    with cleaning the previous ones. Small inputs (or workers=1) are cleaned
+    in-process. Returns {table: cleaned DataFrame}, rows in file order.
+    """
+    paths = {name: Path(path) for name, path in paths.items()}
+    for path in paths.values():
+        if not path.exists():
+            raise FileNotFoundError(f"{path} not found")
+    workers = workers or os.cpu_count() or 1
+    total_bytes = sum(path.stat().st_size for path in paths.values())
+
+    if workers <= 1 or total_bytes < PARALLEL_MIN_BYTES:
+        return {
+            name: _concat([clean_chunk(name, chunk) for chunk in _read_chunks(path, chunk_rows)]
+                          or [clean_chunk(name, pd.read_csv(path, dtype=str))])
+            for name, path in paths.items()
+        }
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            name: [executor.submit(clean_chunk, name, chunk) for chunk in _read_chunks(path, chunk_rows)]
+            for name, path in paths.items()
+        }
+        frames = {}
+        for name, chunk_futures in futures.items():
+            chunks = [future.result() for future in chunk_futures]
+            frames[name] = _concat(chunks or [clean_chunk(name, pd.read_csv(paths[name], dtype=str))])
+        return frames
@@ -1,69 +1,539 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case
-from typing import List
+from sqlalchemy import func, case, select, literal, or_, tuple_, insert
+from sqlalchemy.exc import SQLAlchemyError
+from pydantic import ValidationError
+from typing import Any, List, Optional, Tuple
+import uuid
+import cache
 import models
+from database import pin_to_primary
 import pydantic_models
-from datetime import date
+import rollups
+import utils
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+
+# Cached entity lookups: reads go through the per-table LRU caches in cache.py
+ENTITY_RESPONSES = {
+    'vendors': (models.Vendor, pydantic_models.VendorResponse),
+    'delivery_logs': (models.DeliveryLog, pydantic_models.DeliveryLogResponse),
+    'shipments': (models.Shipment, pydantic_models.ShipmentResponse),
+    'claims': (models.Claim, pydantic_models.ClaimResponse),
+}
+
+def dimensions():
+    """The dimension snapshot store when DIMSTORE_ENABLED, else None"""
+    if not cache.DIMSTORE_ENABLED:
+        return None
+    import dimstore  # NumPy is only loaded when the store is enabled
+    return dimstore.store
+
+def get_entities(db: Session, table: str, ids: List[str]):
+    """Return {id: response model} for the ids that exist, fetching all cache misses in one query"""
+    model, response_model = ENTITY_RESPONSES[table]
+    store = dimensions() if table == 'vendors' else None
+    if store is not None:
+        return {row['vendor_id']: response_model(**row) for row in store.vendors(ids=list(dict.fromkeys(ids)))}
+    entity_cache = cache.entity_caches[table]
+    found = entity_cache.get_many(ids)
+    missing = [key for key in dict.fromkeys(ids) if key not in found]
+    if missing:
+        primary_key = model.__mapper__.primary_key[0]
+        for row in db.scalars(select(model).where(primary_key.in_(missing))):
+            key = getattr(row, primary_key.name)
+            found[key] = response_model.model_validate(row)
+            entity_cache.set(key, found[key])
+    return found
+
+def get_entities_in_order(db: Session, table: str, ids: List[str]):
+    """The existing entities among ids, in the order requested"""
+    found = get_entities(db, table, ids)
+    return [found[key] for key in ids if key in found]
+
+def get_entity(db: Session, table: str, key: str):
+    return get_entities(db, table, [key]).get(key)
+
+def _cache_entity(table: str, key: str, row):
+    """Write a freshly committed row through to its cache, replacing any stale entry"""
+    cache.entity_caches[table].set(key, ENTITY_RESPONSES[table][1].model_validate(row))
 
 # Shipment operations
+def new_shipment_id():
+    return "S" + uuid.uuid4().hex[:15].upper()
+
 def create_shipment(db: Session, shipment: pydantic_models.ShipmentCreate):
-    db_shipment = models.Shipment(**shipment.dict())
+    data = shipment.model_dump()
+    data['shipment_id'] = data['shipment_id'] or new_shipment_id()
+    db_shipment = models.Shipment(**data)
     db.add(db_shipment)
+    rollups.record_shipments(db, [(db_shipment.origin_warehouse, db_shipment.product_id)])
     db.commit()
     db.refresh(db_shipment)
+    _cache_entity('shipments', db_shipment.shipment_id, db_shipment)
     return db_shipment
 
+def get_shipment(db: Session, shipment_id: str):
+    return get_entity(db, 'shipments', shipment_id)
+
+def create_shipments_bulk(db: Session, records: List[Tuple[int, Any]]):
+    """Validate (index, raw record) pairs and insert the valid ones with one multi-row INSERT
+
+    Returns one BulkShipmentResult per record; rows are not read back.
+    """
+    results = {}
+    rows = []
+    for index, raw in records:
+        if isinstance(raw, Exception):
+            results[index] = pydantic_models.BulkShipmentResult(index=index, success=False, error=str(raw))
+            continue
+        try:
+            shipment = pydantic_models.ShipmentCreate.model_validate(raw)
+        except ValidationError as e:
+            error = e.errors()[0]
+            location = ".".join(str(part) for part in error['loc'])
+            results[index] = pydantic_models.BulkShipmentResult(
+                index=index, success=False, error=f"{location}: {error['msg']}" if location else error['msg']
+            )
+            continue
+        row = shipment.model_dump()
+        row['shipment_id'] = row['shipment_id'] or new_shipment_id()
+        rows.append((index, row))
+
+    # Reject keys that repeat within the batch or already exist, instead of failing the INSERT
+    existing = set(db.scalars(select(models.Shipment.shipment_id).where(
+        models.Shipment.shipment_id.in_([row['shipment_id'] for _, row in rows])
+    ))) if rows else set()
+    seen = set()
+    to_insert = []
+    for index, row in rows:
+        key = row['shipment_id']
+        if key in existing or key in seen:
+            results[index] = pydantic_models.BulkShipmentResult(
+                index=index, success=False, shipment_id=key, error="duplicate shipment_id"
+            )
+            continue
+        seen.add(key)
+        to_insert.append((index, row))
+
+    if to_insert:
+        try:
+            db.execute(insert(models.Shipment).values([row for _, row in to_insert]))
+            rollups.record_shipments(db, [(row['origin_warehouse'], row['product_id']) for _, row in to_insert])
+            db.commit()
+            # Dropped rather than written through, so a large batch does not evict the hot entries
+            cache.entity_caches['shipments'].invalidate_many(row['shipment_id'] for _, row in to_insert)
+            error = None
+        except SQLAlchemyError as e:
+            db.rollback()
+            error = str(getattr(e, 'orig', None) or e)
+        for index, row in to_insert:
+            results[index] = pydantic_models.BulkShipmentResult(
+                index=index, success=error is None, shipment_id=row['shipment_id'], error=error
+            )
+
+    return [results[index] for index, _ in records]
+
+# Delivery log operations
+def create_delivery_log(db: Session, delivery_log: pydantic_models.DeliveryLogCreate):
+    db_delivery_log = models.DeliveryLog(**delivery_log.model_dump())
+    db.add(db_delivery_log)
+    rollups.record_delivery_logs(db, [(db_delivery_log.carrier, db_delivery_log.shipment_id)])
+    db.commit()
+    db.refresh(db_delivery_log)
+    _cache_entity('delivery_logs', db_delivery_log.delivery_id, db_delivery_log)
+    return db_delivery_log
+
+def get_delivery_logs(db: Session, skip: int = 0, limit: int = 100):
+    return db.scalars(
+        select(models.DeliveryLog).order_by(models.DeliveryLog.delivery_id).offset(skip).limit(limit)
+    ).all()
+
+def get_delivery_log(db: Session, delivery_id: str):
+    return get_entity(db, 'delivery_logs', delivery_id)
+
+# Claim operations
+def create_claim(db: Session, claim: pydantic_models.ClaimCreate):
+    db_claim = models.Claim(**claim.model_dump())
+    db.add(db_claim)
+    db.flush()
+    rollups.record_claims(db, [(db_claim.delivery_id, db_claim.amount_claimed)])
+    db.commit()
+    db.refresh(db_claim)
+    _cache_entity('claims', db_claim.claim_id, db_claim)
+    return db_claim
+
+def get_claim(db: Session, claim_id: str):
+    return get_entity(db, 'claims', claim_id)
+
+# Vendor operations
+def get_vendors(db: Session, skip: int = 0, limit: int = 100):
+    store = dimensions()
+    if store is not None:
+        return [pydantic_models.VendorResponse(**row) for row in store.vendors(skip=skip, limit=limit)]
+    return db.scalars(
+        select(models.Vendor).order_by(models.Vendor.vendor_id).offset(skip).limit(limit)
+    ).all()
+
+def get_vendor(db: Session, vendor_id: str):
+    return get_entity(db, 'vendors', vendor_id)
+
+def create_vendor(db: Session, vendor: pydantic_models.VendorCreate):
+    db_vendor = models.Vendor(**vendor.model_dump())
+    db.add(db_vendor)
+    db.commit()
+    db.refresh(db_vendor)
+    _cache_entity('vendors', db_vendor.vendor_id, db_vendor)
+    store = dimensions()
+    if store is not None:
+        store.invalidate('vendors')
+    return db_vendor
+
 # Analytics operations
-def get_claims_summary(db: Session):
-    """Return claim percentages per carrier"""
-    result = db.query(
-        models.DeliveryLog.carrier,
-        func.count(models.Claim.claim_id).label('total_claims'),
-        func.count(models.DeliveryLog.delivery_id).label('total_shipments'),
-        func.avg(models.Claim.amount_claimed).label('avg_claim_amount')
+def vendor_performance_query():
+    """Per-vendor delivery and claim figures in one grouped query
+
+    Vendors reach shipments through product_id, so vendors sharing a product
+    share its shipments. Claims are totalled per delivery before the join so a
+    delivery with several claims is still counted once.
+    """
+    vendor, shipment, delivery = models.Vendor, models.Shipment, models.DeliveryLog
+    claims_per_delivery = utils.claims_per_delivery()
+
+    return select(
+        vendor.vendor_id,
+        vendor.vendor_name,
+        vendor.product_id,
+        vendor.vendor_rating,
+        func.count(func.distinct(shipment.shipment_id)).label('total_shipments'),
+        func.count(delivery.delivery_id).label('total_deliveries'),
+        func.sum(case((delivery.status == 'Delivered', 1), else_=0)).label('on_time'),
+        # Deliveries still in transit have no outcome yet
+        func.sum(case((delivery.status != 'In Transit', 1), else_=0)).label('completed'),
+        func.sum(case((delivery.damage_flag, 1), else_=0)).label('damaged'),
+        func.coalesce(func.sum(claims_per_delivery.c.claims), 0).label('total_claims'),
+        func.coalesce(func.sum(claims_per_delivery.c.amount), 0.0).label('claim_cost')
+    ).select_from(vendor).outerjoin(
+        shipment, shipment.product_id == vendor.product_id
     ).outerjoin(
-        models.Claim, models.DeliveryLog.delivery_id == models.Claim.delivery_id
+        delivery, delivery.shipment_id == shipment.shipment_id
+    ).outerjoin(
+        claims_per_delivery, claims_per_delivery.c.delivery_id == delivery.delivery_id
     ).group_by(
-        models.DeliveryLog.carrier
-    ).all()
-    
+        vendor.vendor_id, vendor.vendor_name, vendor.product_id, vendor.vendor_rating
+    ).order_by(vendor.vendor_id)
+
+def get_vendor_performance(db: Session):
+    """Return the scorecard for every vendor, ordered by vendor_id"""
+    def percentage(part, whole):
+        return round(part / whole * 100, 2) if whole else 0.0
+
+    return [
+        pydantic_models.VendorPerformance(
+            vendor_id=row.vendor_id,
+            vendor_name=row.vendor_name,
+            product_id=row.product_id,
+            vendor_rating=row.vendor_rating,
+            total_shipments=row.total_shipments,
+            total_deliveries=row.total_deliveries,
+            on_time_percentage=percentage(row.on_time or 0, row.completed or 0),
+            damage_percentage=percentage(row.damaged or 0, row.total_deliveries),
+            total_claims=row.total_claims,
+            claim_cost=round(row.claim_cost, 2),
+            avg_claim_amount=round(row.claim_cost / row.total_claims, 2) if row.total_claims else 0.0
+        )
+        for row in db.execute(vendor_performance_query())
+    ]
+
+def refresh_carrier_performance(db: Session, full: bool = False):
+    """Bring the daily carrier rollup up to date; returns the number of days recomputed"""
+    pin_to_primary(db)
+    days = rollups.refresh_carrier_daily(db, full=full)
+    db.commit()
+    return days
+
+def _period_start(day: date, window: str):
+    if window == 'weekly':
+        return day - timedelta(days=day.weekday())
+    if window == 'monthly':
+        return day.replace(day=1)
+    return day
+
+def get_carrier_performance(
+    db: Session,
+    window: str = 'monthly',
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    carrier: Optional[str] = None
+):
+    """Per-carrier performance by shipment date, bucketed into daily, weekly or monthly windows
+
+    Reads only the daily rollup rows in range; without start/end this is the
+    twelve months up to the latest shipment date.
+    """
+    daily = models.CarrierDailyPerformance
+    if end is None:
+        end = db.scalar(select(func.max(daily.day)))
+        if end is None:
+            return []
+    if start is None:
+        start = end - timedelta(days=365)
+
+    query = select(daily).where(daily.day >= start, daily.day <= end)
+    if carrier is not None:
+        query = query.where(daily.carrier == carrier)
+
+    totals = {}
+    for row in db.scalars(query):
+        key = (row.carrier, _period_start(row.day, window))
+        bucket = totals.setdefault(key, [0, 0, 0, 0, 0, 0.0])
+        bucket[0] += row.total_deliveries
+        bucket[1] += row.duration_sum
+        bucket[2] += row.duration_count
+        bucket[3] += row.damaged_shipments
+        bucket[4] += row.total_claims
+        bucket[5] += row.claim_amount
+
+    return [
+        pydantic_models.CarrierPerformance(
+            carrier=carrier_name,
+            period_start=period_start,
+            total_deliveries=deliveries,
+            avg_delivery_time=round(duration_sum / duration_count, 2) if duration_count else 0.0,
+            damaged_shipments=damaged,
+            total_claims=claims,
+            claim_amount=round(amount, 2),
+            claim_percentage=round(claims / deliveries * 100, 2) if deliveries else 0.0
+        )
+        for (carrier_name, period_start), (deliveries, duration_sum, duration_count, damaged, claims, amount)
+        in sorted(totals.items())
+    ]
+
+def claims_summary_rows(db: Session):
+    """Claim percentages per carrier from the materialized rollup, as plain dicts"""
+    result = db.query(models.CarrierClaimsRollup).order_by(models.CarrierClaimsRollup.carrier).all()
+    if not result and db.query(models.DeliveryLog.delivery_id).first() is not None:
+        # First read after a bulk load that bypassed the rollup
+        pin_to_primary(db)
+        rollups.rebuild_claims_rollup(db)
+        db.commit()
+        result = db.query(models.CarrierClaimsRollup).order_by(models.CarrierClaimsRollup.carrier).all()
+
     summary = []
-    for carrier, total_claims, total_shipments, avg_claim_amount in result:
+    for row in result:
+        carrier, total_claims, total_shipments = row.carrier, row.total_claims, row.total_shipments
+        avg_claim_amount = row.claim_amount_sum / row.claim_amount_count if row.claim_amount_count else 0
         claim_percentage = (total_claims / total_shipments * 100) if total_shipments > 0 else 0
-        summary.append(pydantic_models.ClaimsSummary(
+        summary.append(dict(
             carrier=carrier,
             total_claims=total_claims,
             total_shipments=total_shipments,
-            claim_percentage=round(claim_percentage, 2),
-            avg_claim_amount=round(avg_claim_amount or 0, 2)
+            claim_percentage=float(round(claim_percentage, 2)),
+            avg_claim_amount=float(round(avg_claim_amount or 0, 2))
         ))
     
     return summary
 
-def get_inventory_health(db: Session):
+def get_claims_summary(db: Session):
+    """Return claim percentages per carrier from the materialized rollup"""
+    return [pydantic_models.ClaimsSummary(**row) for row in claims_summary_rows(db)]
+
+def refresh_claims_summary(db: Session):
+    """Rebuild the carrier rollup from the base tables and return the fresh summary"""
+    pin_to_primary(db)
+    rollups.rebuild_claims_rollup(db)
+    db.commit()
+    return get_claims_summary(db)
+
+# Same buckets as CLAIM_AGING_BINS in supply_chain_metrics.py: (upper bound in days, label)
+CLAIM_AGING_BUCKETS = [(30, '0-30 days old'), (60, '31-60 days old'), (90, '61-90 days old'), (None, '90+ days old')]
+RESOLUTION_PERCENTILES = {'p50': 0.5, 'p90': 0.9, 'p95': 0.95}
+
+def claims_aging_query(db: Session, today: date, since: Optional[date] = None):
+    """Claim counts and amounts per (carrier, reason, open?, days), in one grouped query
+
+    days is the age of an open claim, or resolved_date - claim_date for a
+    resolved one. A claim is open while it has no resolved_date or its status
+    is pending. Claims whose delivery is unknown are kept, under UNKNOWN.
+    """
+    claim, delivery = models.Claim, models.DeliveryLog
+    is_open = case(
+        (or_(claim.resolved_date.is_(None), func.upper(claim.claim_status) == 'PENDING'), 1), else_=0
+    )
+    days = case(
+        (is_open == 1, utils.days_between(db, literal(today), claim.claim_date)),
+        else_=utils.days_between(db, claim.resolved_date, claim.claim_date)
+    )
+    per_claim = select(
+        func.coalesce(delivery.carrier, rollups.UNKNOWN_CARRIER).label('carrier'),
+        func.coalesce(claim.reason, 'Unspecified').label('reason'),
+        is_open.label('is_open'),
+        days.label('days'),
+        claim.claim_id,
+        claim.amount_claimed
+    ).select_from(claim).outerjoin(
+        delivery, delivery.delivery_id == claim.delivery_id
+    ).where(claim.claim_date.isnot(None))
+    if since is not None:
+        per_claim = per_claim.where(claim.claim_date >= since)
+
+    # Grouping the subquery's columns keeps the bound dates out of GROUP BY, where
+    # server-side parameters would not match the SELECT's
+    per_claim = per_claim.subquery()
+    return select(
+        per_claim.c.carrier,
+        per_claim.c.reason,
+        per_claim.c.is_open,
+        per_claim.c.days,
+        func.count(per_claim.c.claim_id).label('claims'),
+        func.coalesce(func.sum(per_claim.c.amount_claimed), 0.0).label('amount')
+    ).group_by(per_claim.c.carrier, per_claim.c.reason, per_claim.c.is_open, per_claim.c.days)
+
+def _aging_bucket(days: int):
+    for upper, label in CLAIM_AGING_BUCKETS:
+        if upper is None or days <= upper:
+            return label
+
+def _aging_groups(groups):
+    return [
+        dict(
+            name=name,
+            open_claims=sum(group['aging'].values()),
+            open_amount=round(group['open_amount'], 2),
+            aging={label: group['aging'][label] for _, label in CLAIM_AGING_BUCKETS},
+            resolved_claims=sum(group['resolution'].values()),
+            avg_resolution_days=round(
+                sum(days * count for days, count in group['resolution'].items()) / sum(group['resolution'].values()), 2
+            ) if group['resolution'] else None,
+            **{
+                f'{key}_resolution_days': utils.histogram_percentile(group['resolution'], fraction)
+                for key, fraction in RESOLUTION_PERCENTILES.items()
+            }
+        )
+        for name, group in sorted(groups.items())
+    ]
+
+def claims_aging_rows(db: Session, since: Optional[date] = None):
+    """Open-claim aging buckets and resolution-time percentiles per carrier and per reason
+
+    The database returns a days histogram; buckets and percentiles come from it.
+    """
+    today = date.today()
+    empty = lambda: {'aging': Counter(), 'open_amount': 0.0, 'resolution': Counter()}
+    by_carrier, by_reason = defaultdict(empty), defaultdict(empty)
+    for row in db.execute(claims_aging_query(db, today, since)):
+        for group in (by_carrier[row.carrier], by_reason[row.reason]):
+            if row.is_open:
+                group['aging'][_aging_bucket(row.days)] += row.claims
+                group['open_amount'] += row.amount
+            elif row.days is not None:
+                group['resolution'][row.days] += row.claims
+    return {
+        'as_of': today,
+        'since': since,
+        'by_carrier': _aging_groups(by_carrier),
+        'by_reason': _aging_groups(by_reason),
+    }
+
+def inventory_health_query(
+    db: Session,
+    warehouse_id: Optional[str] = None,
+    status: Optional[str] = None,
+    after: Optional[Tuple[str, str]] = None,
+    limit: Optional[int] = None
+):
+    """Select stock status and days until restock, computed in the database
+
+    Rows are ordered by the (warehouse_id, product_id) primary key; pass the
+    last key of a page as `after` to fetch the next one.
+    """
+    inventory = models.Inventory
+    stock_status = case(
+        (inventory.stock_level <= inventory.reorder_threshold, "CRITICAL"),
+        (inventory.stock_level <= inventory.reorder_threshold * 1.5, "LOW"),
+        else_="HEALTHY"
+    )
+    days_until_restock = utils.days_between(db, inventory.next_restock_due, literal(date.today()))
+
+    query = select(
+        inventory.warehouse_id,
+        inventory.product_id,
+        inventory.stock_level,
+        inventory.reorder_threshold,
+        stock_status.label('stock_status'),
+        days_until_restock.label('days_until_restock')
+    ).order_by(inventory.warehouse_id, inventory.product_id)
+
+    if warehouse_id is not None:
+        query = query.where(inventory.warehouse_id == warehouse_id)
+    if status is not None:
+        query = query.where(stock_status == status)
+    if after is not None:
+        query = query.where(tuple_(inventory.warehouse_id, inventory.product_id) > tuple_(*after))
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+def inventory_health_rows(db: Session, warehouse_id=None, status=None, after=None, limit=None):
+    """Stock and reorder status as plain dicts, built straight from the result tuples
+
+    With the dimension store enabled they are computed on its inventory snapshot instead.
+    """
+    store = dimensions()
+    if store is not None:
+        return store.inventory_health(warehouse_id, status, after, limit)
+    result = db.execute(inventory_health_query(db, warehouse_id, status, after, limit))
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+def refresh_inventory_forecast(db: Session, full: bool = False):
+    """Recompute stale (or all) restock forecasts; returns the number of SKUs recomputed"""
+    import forecasting  # NumPy is only loaded once forecasts are used
+    pin_to_primary(db)
+    refreshed = forecasting.refresh_forecasts(db, full=full)
+    db.commit()
+    return refreshed
+
+def inventory_forecast_rows(
+    db: Session,
+    warehouse_id: Optional[str] = None,
+    product_id: Optional[str] = None,
+    within_days: Optional[int] = None,
+    after: Optional[Tuple[str, str]] = None,
+    limit: Optional[int] = None
+):
+    """Precomputed forecasts as plain dicts, in (warehouse_id, product_id) order"""
+    forecast = models.InventoryForecast
+    query = select(
+        forecast.warehouse_id,
+        forecast.product_id,
+        forecast.stock_level,
+        forecast.reorder_threshold,
+        forecast.daily_consumption,
+        forecast.days_until_stockout,
+        forecast.stockout_date,
+        forecast.reorder_date,
+        forecast.recommended_order_quantity,
+        forecast.stockout_before_restock,
+        forecast.history_end
+    ).order_by(forecast.warehouse_id, forecast.product_id)
+
+    if warehouse_id is not None:
+        query = query.where(forecast.warehouse_id == warehouse_id)
+    if product_id is not None:
+        query = query.where(forecast.product_id == product_id)
+    if within_days is not None:
+        query = query.where(forecast.stockout_date <= date.today() + timedelta(days=within_days))
+    if after is not None:
+        query = query.where(tuple_(forecast.warehouse_id, forecast.product_id) > tuple_(*after))
+    if limit is not None:
+        query = query.limit(limit)
+    result = db.execute(query)
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+def get_inventory_health(db: Session, warehouse_id=None, status=None, after=None, limit=None):
     """Return stock and reorder status"""
-    inventory_items = db.query(models.Inventory).all()
-    
-    health_data = []
-    for item in inventory_items:
-        if item.stock_level <= item.reorder_threshold:
-            stock_status = "CRITICAL"
-        elif item.stock_level <= item.reorder_threshold * 1.5:
-            stock_status = "LOW"
-        else:
-            stock_status = "HEALTHY"
-        
-        days_until_restock = None
-        if item.next_restock_due:
-            days_until_restock = (item.next_restock_due - date.today()).days
-        
-        health_data.append(pydantic_models.InventoryHealth(
-            warehouse_id=item.warehouse_id,
-            product_id=item.product_id,
-            stock_level=item.stock_level,
-            reorder_threshold=item.reorder_threshold,
-            stock_status=stock_status,
-            days_until_restock=days_until_restock
-        ))
-    
-    return health_data
\ No newline at end of file
+    return [
+        pydantic_models.InventoryHealth(**row)
+        for row in inventory_health_rows(db, warehouse_id, status, after, limit)
+    ]
\ No newline at end of file
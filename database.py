@@ -1,8 +1,15 @@
 # app/database.py
-from sqlalchemy import create_engine
+from sqlalchemy import Delete, Insert, Update, create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from starlette.concurrency import run_in_threadpool
 import os
+import threading
+import time
+import weakref
 from dotenv import load_dotenv
 from urllib.parse import quote_plus
 
@@ -15,20 +22,135 @@ DB_HOST = os.getenv('DB_HOST', 'localhost')
 DB_NAME = os.getenv('DB_NAME', 'supply_chain')
 DB_PORT = os.getenv('DB_PORT', '3306')
 
-# Create MySQL connection string (force MySQL)
-DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Create MySQL connection string; DATABASE_URL overrides it (e.g. sqlite:///supply_chain.db for local testing)
+DATABASE_URL = os.getenv('DATABASE_URL') or f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-# Create engine with MySQL configuration
-engine = create_engine(
-    DATABASE_URL,
-    pool_size=5,
-    max_overflow=10,
-    pool_timeout=30,
-    pool_recycle=1800,
-    echo=True  # Set to False in production
-)
+# Optional read replica; aggregate reads go there and everything else to DATABASE_URL.
+# Locally two SQLite files work, e.g. REPLICA_DATABASE_URL=sqlite:///replica.db on a copy.
+REPLICA_DATABASE_URL = os.getenv('REPLICA_DATABASE_URL')
+
+# --- Pool profiles: each workload gets its own pool so one cannot starve another ---
+POOL_PROFILES = {
+    # Short transactional API requests
+    'api': {'pool_size': 5, 'max_overflow': 10, 'pool_timeout': 30},
+    # Aggregate reads behind the analytics endpoints; long queries, few connections
+    'analytics': {'pool_size': 3, 'max_overflow': 2, 'pool_timeout': 60},
+    # Background upload and load jobs (jobqueue.py sizes it to JOB_WORKERS)
+    'jobs': {'pool_size': 2, 'max_overflow': 0, 'pool_timeout': 60},
+    # load_data: one long-lived connection doing large batched writes
+    'bulk': {'pool_size': 1, 'max_overflow': 0, 'pool_timeout': 300},
+}
+
+def pool_settings(profile):
+    """A profile's pool settings; DB_POOL_<PROFILE>_SIZE / _OVERFLOW / _TIMEOUT override them"""
+    settings = dict(POOL_PROFILES[profile])
+    for key, suffix in (('pool_size', 'SIZE'), ('max_overflow', 'OVERFLOW'), ('pool_timeout', 'TIMEOUT')):
+        value = os.getenv(f'DB_POOL_{profile.upper()}_{suffix}')
+        if value is not None:
+            settings[key] = float(value) if key == 'pool_timeout' else int(value)
+    return settings
+
+class PoolStats:
+    """How long checkouts from one profile's pools waited for a connection"""
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+        self.pools = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def record(self, waited, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+pool_stats = {}
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records checkout wait times in its profile's PoolStats"""
+    stats = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats.pools.add(self)
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - started)
+        return connection
+
+def create_db_engine(url=None, profile='api', **kwargs):
+    """Engine for one workload, pooled per POOL_PROFILES[profile]; kwargs override anything"""
+    stats = pool_stats.setdefault(profile, PoolStats(profile))
+    # A subclass per profile keeps the stats when SQLAlchemy recreates the pool
+    poolclass = type(f'TimedQueuePool_{profile}', (TimedQueuePool,), {'stats': stats})
+    settings = {
+        'poolclass': poolclass,
+        'pool_recycle': 1800,
+        # Statement echo is costly; per-query timing is collected by instrumentation.py instead
+        'echo': os.getenv('DB_ECHO', '0').lower() in ('1', 'true', 'yes'),
+        **pool_settings(profile),
+        **kwargs,
+    }
+    return create_engine(url or DATABASE_URL, **settings)
+
+def pool_prometheus_lines():
+    """Pool sizes and checkout waits per profile in Prometheus text format (a metrics collector)"""
+    series = [
+        ('db_pool_checkout_wait_seconds_sum', 'counter', 'Total time spent waiting for a pooled connection',
+         lambda s: round(s.wait_seconds, 6)),
+        ('db_pool_checkout_wait_seconds_count', 'counter', 'Connections checked out',
+         lambda s: s.checkouts),
+        ('db_pool_checkout_wait_max_seconds', 'gauge', 'Longest wait for a pooled connection',
+         lambda s: round(s.max_wait_seconds, 6)),
+        ('db_pool_checkout_timeouts_total', 'counter', 'Checkouts that gave up after pool_timeout',
+         lambda s: s.timeouts),
+        ('db_pool_checked_out', 'gauge', 'Connections currently in use',
+         lambda s: sum(pool.checkedout() for pool in list(s.pools))),
+    ]
+    lines = []
+    for metric, kind, description, value in series:
+        lines += [f'# HELP {metric} {description}', f'# TYPE {metric} {kind}']
+        for profile, stats in sorted(pool_stats.items()):
+            lines.append(f'{metric}{{profile="{profile}"}} {value(stats)}')
+    return lines
+
+# --- Engines and sessions ---
+engine = create_db_engine(DATABASE_URL, 'api')
+# Its own pool even without a replica, so aggregates do not hold the API's connections
+analytics_engine = create_db_engine(REPLICA_DATABASE_URL or DATABASE_URL, 'analytics')
+
+class RoutingSession(Session):
+    """Reads go to the analytics engine (the replica, if any), writes to the primary
+
+    After the first write, or pin_to_primary(), the session stays on the primary
+    so it reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get('primary') or self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self.info['primary'] = True
+            return engine
+        return analytics_engine
+
+def pin_to_primary(db):
+    """Send the rest of this session's statements to the primary (e.g. before a rollup refresh)"""
+    db.info['primary'] = True
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, class_=RoutingSession)
 Base = declarative_base()
 
 def get_db():
@@ -36,4 +158,87 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# --- Optional async engine: DB_ASYNC=1 serves the routers from an async driver ---
+ASYNC_DRIVERS = {
+    'mysql': 'mysql+aiomysql',
+    'mysql+pymysql': 'mysql+aiomysql',
+    'postgresql': 'postgresql+asyncpg',
+    'postgresql+psycopg2': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+    'sqlite+pysqlite': 'sqlite+aiosqlite',
+}
+
+def to_async_url(url):
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername))
+
+# The asyncio extension (and greenlet) is only imported when the async engine is used
+USE_ASYNC_DB = os.getenv('DB_ASYNC', '0').lower() in ('1', 'true', 'yes')
+ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL') or to_async_url(DATABASE_URL)
+
+_async_engine = None
+_AsyncSessionLocal = None
+
+def get_async_engine():
+    """Create the async engine on first use so the async driver is only needed when enabled"""
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        _async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_recycle=1800, **pool_settings('api'))
+        _AsyncSessionLocal = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+async def get_async_db():
+    get_async_engine()
+    async with _AsyncSessionLocal() as db:
+        yield db
+
+async def get_session():
+    """Router dependency: an AsyncSession when DB_ASYNC is set, otherwise a regular Session"""
+    if USE_ASYNC_DB:
+        async for db in get_async_db():
+            yield db
+    else:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(db.close)
+
+async def get_read_session():
+    """Router dependency for aggregate reads: routed to the replica and the analytics pool
+
+    With DB_ASYNC set this is the regular async session; replica routing is sync-only.
+    """
+    if USE_ASYNC_DB:
+        async for db in get_async_db():
+            yield db
+    else:
+        db = ReadSessionLocal()
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(db.close)
+
+async def run_db(db, fn, *args, **kwargs):
+    """Run a crud function without blocking the event loop
+
+    On an AsyncSession the function runs through run_sync, so every query is
+    awaited on the async driver; a regular Session is used from the threadpool.
+    Its connection goes back to the pool before the thread does: otherwise, with
+    every thread waiting on the pool, no thread is left to close a session and
+    free one. Loaded objects stay usable; the session reconnects if used again.
+    """
+    if USE_ASYNC_DB:
+        from sqlalchemy.ext.asyncio import AsyncSession
+        if isinstance(db, AsyncSession):
+            return await db.run_sync(fn, *args, **kwargs)
+
+    def call():
+        try:
+            return fn(db, *args, **kwargs)
+        finally:
+            db.close()
+    return await run_in_threadpool(call)
\ No newline at end of file
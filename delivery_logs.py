@@ -1,27 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
-from database import get_db
+from typing import List, Optional
+from database import get_session, run_db
 import crud
 import pydantic_models
+import utils
 
 router = APIRouter(prefix="/delivery-logs", tags=["delivery_logs"])
 
 @router.get("/", response_model=List[pydantic_models.DeliveryLogResponse])
-async def read_delivery_logs(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all delivery logs"""
-    delivery_logs = crud.get_delivery_logs(db, skip=skip, limit=limit)
+async def read_delivery_logs(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    ids: Optional[str] = Query(None, description="Comma-separated delivery ids to fetch in one call"),
+    db: Session = Depends(get_session)
+):
+    """Get all delivery logs, or just the ones listed in ids"""
+    if ids is not None:
+        try:
+            keys = utils.split_ids(ids)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        return await run_db(db, crud.get_entities_in_order, 'delivery_logs', keys)
+    delivery_logs = await run_db(db, crud.get_delivery_logs, skip=skip, limit=limit)
     return delivery_logs
 
 @router.get("/{delivery_id}", response_model=pydantic_models.DeliveryLogResponse)
-async def read_delivery_log(delivery_id: int, db: Session = Depends(get_db)):
+async def read_delivery_log(delivery_id: str, db: Session = Depends(get_session)):
     """Get a specific delivery log by ID"""
-    delivery_log = crud.get_delivery_log(db, delivery_id)
+    delivery_log = await run_db(db, crud.get_delivery_log, delivery_id)
     if delivery_log is None:
         raise HTTPException(status_code=404, detail="Delivery log not found")
     return delivery_log
 
 @router.post("/", response_model=pydantic_models.DeliveryLogResponse)
-async def create_delivery_log(delivery_log: pydantic_models.DeliveryLogBase, db: Session = Depends(get_db)):
+async def create_delivery_log(delivery_log: pydantic_models.DeliveryLogCreate, db: Session = Depends(get_session)):
     """Create a new delivery log"""
-    return crud.create_delivery_log(db, delivery_log)
\ No newline at end of file
+    if await run_db(db, crud.get_delivery_log, delivery_log.delivery_id) is not None:
+        raise HTTPException(status_code=409, detail="Delivery log already exists")
+    return await run_db(db, crud.create_delivery_log, delivery_log)
\ No newline at end of file
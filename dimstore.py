@@ -0,0 +1,274 @@
+# dimstore.py
+"""In-process column snapshots of the small dimension tables (vendors, inventory).
+
+Enabled with DIMSTORE_ENABLED=1. Each table is held as NumPy column arrays
+in primary-key order: ID columns are categorical (int32 codes into a sorted
+array of distinct values), dates are datetime64[D] and missing numbers NaN.
+A primary-key lookup is a binary search over the sorted codes, and health
+computations run as array operations without a database round trip.
+
+A snapshot is rebuilt from the primary once it is DIMSTORE_REFRESH_SECONDS
+old, or after invalidate() (crud calls it on writes), and swapped in whole,
+so readers always see one consistent version. While one thread rebuilds,
+others keep reading the previous snapshot.
+"""
+import os
+import sys
+import threading
+import time
+from datetime import date, datetime
+from typing import NamedTuple
+
+import numpy as np
+from sqlalchemy import Boolean, Date, Float, Integer, select
+
+import models
+from database import engine
+
+DIMSTORE_REFRESH_SECONDS = float(os.getenv('DIMSTORE_REFRESH_SECONDS', '300'))
+
+# table -> (model, key columns, columns to encode as categories)
+TABLES = {
+    'vendors': (models.Vendor, ('vendor_id',), ('vendor_id', 'product_id', 'country')),
+    'inventory': (models.Inventory, ('warehouse_id', 'product_id'), ('warehouse_id', 'product_id')),
+}
+
+
+class Categorical(NamedTuple):
+    codes: np.ndarray  # int32, -1 for NULL
+    categories: np.ndarray  # sorted distinct values
+
+    @classmethod
+    def encode(cls, values):
+        present = np.fromiter((value is not None for value in values), dtype=bool, count=len(values))
+        categories, codes = np.unique(np.array(values, dtype=object)[present].astype(str), return_inverse=True)
+        all_codes = np.full(len(values), -1, dtype=np.int32)
+        all_codes[present] = codes
+        return cls(all_codes, categories)
+
+    def code(self, value):
+        """The code of value, or -1 when it does not occur"""
+        position = int(np.searchsorted(self.categories, value))
+        return position if position < len(self.categories) and self.categories[position] == value else -1
+
+    def decode(self, positions):
+        codes = self.codes[positions]
+        if not len(self.categories):
+            return np.full(len(codes), None, dtype=object)
+        values = self.categories[codes].astype(object)
+        values[codes < 0] = None
+        return values
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.categories.nbytes
+
+
+def _column_array(column, values):
+    sql_type = column.type
+    if isinstance(sql_type, Date):
+        return np.array(values, dtype='datetime64[D]')
+    if isinstance(sql_type, Boolean):
+        return np.array([bool(value) for value in values], dtype=bool)
+    if isinstance(sql_type, Integer):
+        if any(value is None for value in values):
+            return np.array(values, dtype=float)  # NaN marks NULL
+        return np.array(values, dtype=np.int64)
+    if isinstance(sql_type, Float):
+        return np.array(values, dtype=float)
+    return np.array(values, dtype=object)
+
+
+def _python_values(array, positions):
+    """Column values at positions as plain Python objects, NULLs as None"""
+    if isinstance(array, Categorical):
+        return array.decode(positions).tolist()
+    values = array[positions]
+    if values.dtype.kind == 'f':
+        return [None if value != value else value for value in values.tolist()]
+    return values.tolist()  # datetime64[D] gives datetime.date, NaT gives None
+
+
+class TableSnapshot:
+    """One table as column arrays, sorted by primary key"""
+
+    def __init__(self, name, columns, key_columns):
+        self.name = name
+        self.columns = columns
+        self.key_columns = key_columns
+        self.loaded_at = datetime.now()
+        self.created = time.monotonic()
+        self.stale = False
+        first = columns[key_columns[0]]
+        self.size = len(first.codes if isinstance(first, Categorical) else first)
+        # Rows are in key order, so the combined key codes are sorted and binary-searchable
+        self._keys = np.zeros(self.size, dtype=np.int64)
+        for col in key_columns:
+            categorical = columns[col]
+            self._keys = self._keys * len(categorical.categories) + categorical.codes
+
+    def __len__(self):
+        return self.size
+
+    def position(self, *key):
+        """Row position of a primary key, or None"""
+        combined = 0
+        for col, value in zip(self.key_columns, key):
+            categorical = self.columns[col]
+            code = categorical.code(value)
+            if code < 0:
+                return None
+            combined = combined * len(categorical.categories) + code
+        position = int(np.searchsorted(self._keys, combined))
+        return position if position < self.size and self._keys[position] == combined else None
+
+    def rows(self, positions, columns=None):
+        """Rows at positions as dicts of Python values"""
+        names = columns or list(self.columns)
+        values = [_python_values(self.columns[name], positions) for name in names]
+        return [dict(zip(names, row)) for row in zip(*values)]
+
+    @property
+    def nbytes(self):
+        total = 0
+        for array in self.columns.values():
+            total += array.nbytes
+            if not isinstance(array, Categorical) and array.dtype == object:
+                total += sum(sys.getsizeof(value) for value in array if value is not None)
+        return total + self._keys.nbytes
+
+
+def load_snapshot(name, bind=None):
+    """Read one table into a TableSnapshot"""
+    model, key_columns, categorical = TABLES[name]
+    table = model.__table__
+    with (bind or engine).connect() as conn:
+        rows = conn.execute(select(table)).all()
+    values = dict(zip(table.columns.keys(), zip(*rows))) if rows else {col: () for col in table.columns.keys()}
+    columns = {
+        col: Categorical.encode(values[col]) if col in categorical else _column_array(table.c[col], values[col])
+        for col in table.columns.keys()
+    }
+    # Sort by key codes rather than ORDER BY, whose collation may not match code order
+    order = np.lexsort([columns[col].codes for col in reversed(key_columns)])
+    columns = {
+        col: Categorical(array.codes[order], array.categories) if isinstance(array, Categorical) else array[order]
+        for col, array in columns.items()
+    }
+    return TableSnapshot(name, columns, key_columns)
+
+
+class DimensionStore:
+    """The current snapshot of each table, rebuilt when old or invalidated"""
+
+    def __init__(self, refresh_seconds=DIMSTORE_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.refreshes = 0
+        self._snapshots = {}
+        self._locks = {name: threading.Lock() for name in TABLES}
+
+    def _expired(self, snapshot):
+        return snapshot is None or snapshot.stale or time.monotonic() - snapshot.created > self.refresh_seconds
+
+    def get(self, name) -> TableSnapshot:
+        snapshot = self._snapshots.get(name)
+        if not self._expired(snapshot):
+            return snapshot
+        lock = self._locks[name]
+        # Someone else is rebuilding: the previous snapshot is still consistent, use it
+        if snapshot is not None and not lock.acquire(blocking=False):
+            return snapshot
+        if snapshot is None:
+            lock.acquire()
+        try:
+            snapshot = self._snapshots.get(name)
+            if self._expired(snapshot):
+                snapshot = load_snapshot(name)
+                self._snapshots[name] = snapshot
+                self.refreshes += 1
+            return snapshot
+        finally:
+            lock.release()
+
+    def invalidate(self, name=None):
+        """Rebuild one table (or all) on next read"""
+        for snapshot_name in ([name] if name else list(TABLES)):
+            snapshot = self._snapshots.get(snapshot_name)
+            if snapshot is not None:
+                snapshot.stale = True
+
+    def stats(self):
+        """{table: rows, bytes and age} of the snapshots currently held"""
+        return {
+            name: {
+                'rows': len(snapshot),
+                'bytes': snapshot.nbytes,
+                'loaded_at': snapshot.loaded_at.isoformat(timespec='seconds'),
+                'age_seconds': round(time.monotonic() - snapshot.created, 1),
+            }
+            for name, snapshot in sorted(self._snapshots.items())
+        }
+
+    # --- Vectorized reads ---
+    def vendors(self, ids=None, skip=0, limit=None):
+        """Vendor rows for the given ids (those that exist), or a page in vendor_id order"""
+        snapshot = self.get('vendors')
+        if ids is None:
+            positions = np.arange(skip, min(len(snapshot), skip + limit if limit is not None else len(snapshot)))
+        else:
+            positions = [position for position in map(snapshot.position, ids) if position is not None]
+        return snapshot.rows(positions)
+
+    def inventory_health(self, warehouse_id=None, status=None, after=None, limit=None, today=None):
+        """Same rows as crud.inventory_health_query, computed on the inventory snapshot"""
+        snapshot = self.get('inventory')
+        warehouses, products = snapshot.columns['warehouse_id'], snapshot.columns['product_id']
+        stock = snapshot.columns['stock_level']
+        threshold = snapshot.columns['reorder_threshold']
+
+        stock_status = np.select(
+            [stock <= threshold, stock <= threshold * 1.5], ['CRITICAL', 'LOW'], default='HEALTHY'
+        ).astype(object)
+        mask = np.ones(len(snapshot), dtype=bool)
+        if warehouse_id is not None:
+            mask &= warehouses.codes == warehouses.code(warehouse_id)
+        if status is not None:
+            mask &= stock_status == status
+        if after is not None:
+            # Categories are sorted, so comparing codes compares the strings
+            after_warehouse, after_product = after
+            warehouse_above = np.searchsorted(warehouses.categories, after_warehouse, side='right')
+            product_above = np.searchsorted(products.categories, after_product, side='right')
+            mask &= (warehouses.codes >= warehouse_above) | (
+                (warehouses.codes == warehouses.code(after_warehouse)) & (products.codes >= product_above)
+            )
+        positions = np.flatnonzero(mask)
+        if limit is not None:
+            positions = positions[:limit]
+
+        due = snapshot.columns['next_restock_due'][positions]
+        days = (due - np.datetime64(today or date.today(), 'D')).astype(object)
+        rows = snapshot.rows(positions, ['warehouse_id', 'product_id', 'stock_level', 'reorder_threshold'])
+        for row, row_status, row_days in zip(rows, stock_status[positions], days):
+            row['stock_status'] = row_status
+            row['days_until_restock'] = None if row_days is None else row_days.days
+        return rows
+
+
+store = DimensionStore()
+
+
+def prometheus_lines():
+    """Snapshot sizes in Prometheus text format (registered as a metrics collector when enabled)"""
+    stats = store.stats()
+    lines = []
+    for metric, kind, description, key in [
+        ('dimstore_bytes', 'gauge', 'Approximate memory held by each dimension snapshot', 'bytes'),
+        ('dimstore_rows', 'gauge', 'Rows in each dimension snapshot', 'rows'),
+        ('dimstore_age_seconds', 'gauge', 'Seconds since each snapshot was loaded', 'age_seconds'),
+    ]:
+        lines += [f'# HELP {metric} {description}', f'# TYPE {metric} {kind}']
+        lines += [f'{metric}{{table="{name}"}} {table_stats[key]}' for name, table_stats in stats.items()]
+    lines += ['# HELP dimstore_refreshes_total Snapshots rebuilt', '# TYPE dimstore_refreshes_total counter',
+              f'dimstore_refreshes_total {store.refreshes}']
+    return lines
@@ -0,0 +1,189 @@
+# forecasting.py
+"""Restock forecasting from outbound shipment history.
+
+Consumption per (warehouse, product) is read in one grouped query: units
+shipped from the warehouse over the last FORECAST_WINDOW_DAYS and over the
+last FORECAST_RECENT_DAYS, left-joined to inventory. Both rates are blended
+and the stock-out date, reorder date and order quantity for every SKU are
+projected at once with NumPy arrays. Results go to inventory_forecast, which
+the API serves as is.
+
+The window ends at the latest ship date on record rather than today, so a
+history that stops short of today still yields rates. A refresh recomputes
+only SKUs marked stale (rollups.mark_forecasts_stale) or never forecast.
+When the history gains a newer ship date it adds the SKUs that shipped on
+the days the windows gained or dropped. The first refresh of a day
+recomputes everything, since every projected date counts from today.
+"""
+import os
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from sqlalchemy import and_, case, delete, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+import models
+import utils
+
+FORECAST_WINDOW_DAYS = int(os.getenv('FORECAST_WINDOW_DAYS', '28'))
+FORECAST_RECENT_DAYS = int(os.getenv('FORECAST_RECENT_DAYS', '7'))
+# Share of the recent rate in the blended rate; the rest comes from the whole window
+FORECAST_RECENT_WEIGHT = float(os.getenv('FORECAST_RECENT_WEIGHT', '0.5'))
+# An order should cover this many days of consumption above the reorder threshold
+FORECAST_COVER_DAYS = int(os.getenv('FORECAST_COVER_DAYS', '30'))
+
+
+def history_end(db: Session):
+    """The latest ship date on record, which the consumption windows end at"""
+    return db.scalar(select(func.max(models.Shipment.ship_date)))
+
+
+def window_starts(as_of: date):
+    """First days of the full and recent consumption windows ending at as_of"""
+    return (as_of - timedelta(days=FORECAST_WINDOW_DAYS - 1),
+            as_of - timedelta(days=FORECAST_RECENT_DAYS - 1))
+
+
+def moved_window_keys(db: Session, previous_end: date, as_of: date):
+    """(warehouse, product) pairs whose consumption changes when the windows move from previous_end to as_of
+
+    Those are the SKUs shipped on the days a window dropped or gained; every
+    other SKU's window and recent totals stay the same.
+    """
+    shipment = models.Shipment
+    day = timedelta(days=1)
+    (previous_window, previous_recent), (window_start, recent_start) = window_starts(previous_end), window_starts(as_of)
+    return {tuple(key) for key in db.execute(
+        select(shipment.origin_warehouse, shipment.product_id).distinct().where(or_(
+            shipment.ship_date.between(previous_window, window_start - day),
+            shipment.ship_date.between(previous_recent, recent_start - day),
+            shipment.ship_date.between(previous_end + day, as_of),
+        ))
+    )}
+
+
+def consumption_query(as_of: date, keys=None):
+    """Inventory rows with units shipped in the full and recent windows, in one grouped pass"""
+    shipment, inventory = models.Shipment, models.Inventory
+    window_start, recent_start = window_starts(as_of)
+    shipped = select(
+        shipment.origin_warehouse.label('warehouse_id'),
+        shipment.product_id.label('product_id'),
+        func.sum(shipment.quantity).label('window_units'),
+        func.sum(case((shipment.ship_date >= recent_start, shipment.quantity), else_=0)).label('recent_units'),
+    ).where(
+        shipment.ship_date.between(window_start, as_of)
+    ).group_by(shipment.origin_warehouse, shipment.product_id)
+    if keys is not None:
+        shipped = shipped.where(utils.pairs_in(shipment.origin_warehouse, shipment.product_id, keys))
+    shipped = shipped.subquery()
+
+    query = select(
+        inventory.warehouse_id,
+        inventory.product_id,
+        inventory.stock_level,
+        inventory.reorder_threshold,
+        inventory.next_restock_due,
+        func.coalesce(shipped.c.window_units, 0),
+        func.coalesce(shipped.c.recent_units, 0),
+    ).outerjoin(shipped, and_(
+        shipped.c.warehouse_id == inventory.warehouse_id,
+        shipped.c.product_id == inventory.product_id,
+    ))
+    if keys is not None:
+        query = query.where(utils.pairs_in(inventory.warehouse_id, inventory.product_id, keys))
+    return query
+
+
+def _dates(today: date, days):
+    """today + whole days for an array of day counts; NaN (never) becomes None"""
+    finite = np.isfinite(days)
+    offsets = np.where(finite, days, 0).astype(int).astype('timedelta64[D]')
+    return [day if ok else None for day, ok in zip((np.datetime64(today, 'D') + offsets).tolist(), finite)]
+
+
+def project(rows, as_of: date, today: date):
+    """Forecast rows for (warehouse, product, stock, threshold, next_restock_due, window units, recent units)"""
+    if not rows:
+        return []
+    warehouse_ids, product_ids, stock, threshold, restock_due, window_units, recent_units = zip(*rows)
+    stock = np.array(stock, dtype=float)
+    stock = np.where(np.isnan(stock), 0.0, stock)
+    threshold = np.array(threshold, dtype=float)
+    threshold = np.where(np.isnan(threshold), 0.0, threshold)
+    rate = (
+        (1 - FORECAST_RECENT_WEIGHT) * np.array(window_units, dtype=float) / FORECAST_WINDOW_DAYS
+        + FORECAST_RECENT_WEIGHT * np.array(recent_units, dtype=float) / FORECAST_RECENT_DAYS
+    )
+
+    consuming = rate > 0
+    safe_rate = np.where(consuming, rate, 1.0)
+    days_until_stockout = np.where(consuming, np.floor(np.maximum(stock, 0) / safe_rate), np.nan)
+    days_until_reorder = np.where(consuming, np.floor(np.maximum(stock - threshold, 0) / safe_rate), np.nan)
+    order_quantity = np.ceil(np.maximum(threshold + rate * FORECAST_COVER_DAYS - stock, 0)).astype(int)
+
+    stockout_dates = _dates(today, days_until_stockout)
+    reorder_dates = _dates(today, days_until_reorder)
+    computed_at = datetime.now()
+    return [
+        {
+            'warehouse_id': warehouse_ids[i],
+            'product_id': product_ids[i],
+            'stock_level': int(stock[i]),
+            'reorder_threshold': int(threshold[i]),
+            'daily_consumption': round(float(rate[i]), 3),
+            'days_until_stockout': None if stockout_dates[i] is None else int(days_until_stockout[i]),
+            'stockout_date': stockout_dates[i],
+            'reorder_date': reorder_dates[i],
+            'recommended_order_quantity': int(order_quantity[i]),
+            'stockout_before_restock': bool(
+                stockout_dates[i] is not None and restock_due[i] is not None and stockout_dates[i] < restock_due[i]
+            ),
+            'history_end': as_of,
+            'stale': False,
+            'computed_at': computed_at,
+        }
+        for i in range(len(warehouse_ids))
+    ]
+
+
+def refresh_forecasts(db: Session, full: bool = False, today: date = None):
+    """Recompute stale and missing forecasts, or all of them; returns the number of SKUs recomputed
+
+    A new day recomputes everything, as does a history that ends earlier than
+    the forecasts do. A later history end adds the SKUs moved_window_keys finds.
+    """
+    forecast, inventory = models.InventoryForecast, models.Inventory
+    today = today or date.today()
+    as_of = history_end(db) or today
+
+    if not full:
+        previous_end, oldest = db.execute(select(func.max(forecast.history_end), func.min(forecast.computed_at))).one()
+        full = previous_end is None or previous_end > as_of or oldest is None or oldest.date() != today
+
+    if full:
+        rows = project(db.execute(consumption_query(as_of)).all(), as_of, today)
+        db.execute(delete(forecast))
+        if rows:
+            db.execute(insert(forecast), rows)
+        return len(rows)
+
+    keys = {tuple(key) for key in db.execute(
+        select(inventory.warehouse_id, inventory.product_id).outerjoin(forecast, and_(
+            forecast.warehouse_id == inventory.warehouse_id,
+            forecast.product_id == inventory.product_id,
+        )).where(or_(forecast.warehouse_id.is_(None), forecast.stale))
+    )}
+    if previous_end != as_of:
+        keys |= moved_window_keys(db, previous_end, as_of)
+        # The other forecasts come out the same over the new windows
+        db.execute(update(forecast).where(forecast.history_end != as_of).values(history_end=as_of))
+
+    refreshed = 0
+    for chunk in utils.chunked(sorted(keys)):
+        rows = project(db.execute(consumption_query(as_of, chunk)).all(), as_of, today)
+        db.execute(delete(forecast).where(utils.pairs_in(forecast.warehouse_id, forecast.product_id, chunk)))
+        if rows:
+            db.execute(insert(forecast), rows)
+        refreshed += len(rows)
+    return refreshed
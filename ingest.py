@@ -0,0 +1,191 @@
+# ingest.py
+# pandas, openpyxl and pyarrow are imported inside the readers that need them, so
+# importing this module (and the uploads router) stays cheap at API start-up.
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+import cache
+import models
+import pydantic_models
+import rollups
+
+DEFAULT_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 20
+
+
+# --- Incremental readers: each yields lists of raw row dicts of at most batch_size ---
+def iter_csv_batches(fileobj, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """Parse a CSV file object chunk by chunk, keeping every value as text"""
+    import pandas as pd
+
+    reader = pd.read_csv(fileobj, chunksize=batch_size, dtype=str, keep_default_na=False)
+    for chunk in reader:
+        yield chunk.to_dict('records')
+
+
+def iter_xlsx_batches(fileobj, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """Stream rows from the first worksheet of an Excel file without loading it whole"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [str(h).strip() if h is not None else '' for h in header]
+
+        batch = []
+        for values in rows:
+            if all(v is None for v in values):
+                continue
+            batch.append(dict(zip(header, values)))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        workbook.close()
+
+
+def iter_parquet_batches(fileobj, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """Read a Parquet file (e.g. from a snapshot) one record batch at a time, already typed"""
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(fileobj).iter_batches(batch_size=batch_size):
+        yield batch.to_pylist()
+
+
+def iter_upload_batches(fileobj, filename: str, batch_size: int = DEFAULT_BATCH_SIZE):
+    if filename.endswith('.xlsx'):
+        return iter_xlsx_batches(fileobj, batch_size)
+    if filename.endswith('.parquet'):
+        return iter_parquet_batches(fileobj, batch_size)
+    return iter_csv_batches(fileobj, batch_size)
+
+
+# --- Validation & persistence ---
+def validate_delivery_logs(rows: List[Dict[str, Any]], errors: List[str], offset: int = 0):
+    """Validate raw rows, returning (valid insert dicts, rejected count)"""
+    valid = []
+    rejected = 0
+    for i, row in enumerate(rows):
+        # Blank cells fall back to the schema defaults instead of failing coercion
+        cleaned = {k: v for k, v in row.items() if v is not None and v != ''}
+        try:
+            record = pydantic_models.DeliveryLogCreate.model_validate(cleaned)
+        except ValidationError as e:
+            rejected += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(f"row {offset + i + 1}: {e.errors()[0]['msg']}")
+            continue
+        valid.append(record.model_dump())
+    return valid, rejected
+
+
+def _drop_duplicate_keys(db: Session, records: List[Dict[str, Any]], errors: List[str]):
+    """Remove rows whose delivery_id repeats in the batch or already exists"""
+    ids = [r['delivery_id'] for r in records]
+    existing = set(db.scalars(
+        select(models.DeliveryLog.delivery_id).where(models.DeliveryLog.delivery_id.in_(ids))
+    ))
+    seen = set()
+    unique = []
+    for record in records:
+        key = record['delivery_id']
+        if key in existing or key in seen:
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(f"delivery_id {key}: duplicate key")
+            continue
+        seen.add(key)
+        unique.append(record)
+    return unique
+
+
+def _apply_quality_rules(db: Session, records: List[Dict[str, Any]], errors: List[str], rule_failures: Counter):
+    """Quarantine rows failing quality.RULES (e.g. unknown shipment_id) and return the rest"""
+    import pandas as pd
+    import quality
+
+    frame = pd.DataFrame.from_records(records)
+    shipment_ids = frame['shipment_id'].dropna().unique().tolist()
+    keys = {'shipments': set(db.scalars(
+        select(models.Shipment.shipment_id).where(models.Shipment.shipment_id.in_(shipment_ids))
+    ))}
+    clean, quarantined, counts = quality.validate('delivery_logs', frame, keys)
+    rule_failures.update({rule: count for rule, count in counts.items() if count})
+    if quarantined.empty:
+        return records
+    quality.write_quarantine('delivery_logs', quarantined)
+    for delivery_id, reasons in zip(quarantined['delivery_id'], quarantined[quality.REASONS_COLUMN]):
+        if len(errors) >= MAX_REPORTED_ERRORS:
+            break
+        errors.append(f"delivery_id {delivery_id}: {reasons}")
+    return [records[i] for i in clean.index]
+
+
+def ingest_delivery_logs(db: Session, fileobj, filename: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                         progress: Optional[Callable[[int, List[str]], None]] = None):
+    """Validate and bulk-insert an uploaded delivery log file one batch at a time
+
+    progress(rows processed, errors so far) is called after every batch.
+    """
+    started = time.perf_counter()
+    batches = []
+    errors: List[str] = []
+    rule_failures = Counter()
+    processed = inserted = rejected = 0
+
+    for number, rows in enumerate(iter_upload_batches(fileobj, filename, batch_size), start=1):
+        records, batch_rejected = validate_delivery_logs(rows, errors, offset=processed)
+        batch_inserted = 0
+        if records:
+            unique = _drop_duplicate_keys(db, records, errors)
+            if unique:
+                unique = _apply_quality_rules(db, unique, errors, rule_failures)
+            batch_rejected += len(records) - len(unique)
+            try:
+                if unique:
+                    db.execute(insert(models.DeliveryLog), unique)
+                    rollups.record_delivery_logs(db, [(r['carrier'], r['shipment_id']) for r in unique])
+                db.commit()
+                cache.entity_caches['delivery_logs'].invalidate_many(r['delivery_id'] for r in unique)
+                batch_inserted = len(unique)
+            except SQLAlchemyError as e:
+                db.rollback()
+                batch_rejected += len(unique)
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append(f"batch {number}: {getattr(e, 'orig', None) or e}")
+
+        processed += len(rows)
+        inserted += batch_inserted
+        rejected += batch_rejected
+        batches.append(pydantic_models.UploadBatchResult(
+            batch=number,
+            rows_received=len(rows),
+            rows_inserted=batch_inserted,
+            rows_rejected=batch_rejected
+        ))
+        if progress is not None:
+            progress(processed, errors)
+
+    elapsed = time.perf_counter() - started
+    return pydantic_models.FileUploadResponse(
+        filename=filename,
+        records_processed=processed,
+        records_inserted=inserted,
+        records_rejected=rejected,
+        batches=batches,
+        errors=errors,
+        rule_failures=dict(rule_failures),
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round(processed / elapsed, 1) if elapsed > 0 else 0.0,
+        message=f"Inserted {inserted} of {processed} delivery records ({rejected} rejected)"
+    )
@@ -0,0 +1,230 @@
+# instrumentation.py
+import contextvars
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '500'))
+# The same statement run this many times in one request is reported as a likely N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', '10'))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+slow_query_logger = logging.getLogger("supply_chain.slow_queries")
+
+
+class Histogram:
+    """Fixed-bucket histogram in the Prometheus style"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.total += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+    def render(self, name, labels):
+        with self._lock:
+            counts, total, count = list(self.counts), self.total, self.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{_labels(labels, le=bound)} {cumulative}')
+        lines.append(f'{name}_bucket{_labels(labels, le="+Inf")} {count}')
+        lines.append(f'{name}_sum{_labels(labels)} {total}')
+        lines.append(f'{name}_count{_labels(labels)} {count}')
+        return lines
+
+
+def _labels(labels, **extra):
+    items = list(labels.items()) + list(extra.items())
+    if not items:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for _, value in items)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(items, escaped)) + '}'
+
+
+class RequestStats:
+    """Queries issued while serving one request"""
+
+    def __init__(self):
+        self.query_count = 0
+        self.query_seconds = 0.0
+        self.statements = Counter()
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.request_latency = {}
+        self.query_latency = Histogram(QUERY_BUCKETS)
+        self.route_queries = Counter()
+        self.route_query_seconds = Counter()
+        self.n_plus_one = Counter()
+        self.slow_queries = 0
+        self.collectors = []
+        self._lock = threading.Lock()
+
+    def observe_request(self, method, route, status, seconds, stats):
+        key = (method, route, str(status))
+        with self._lock:
+            histogram = self.request_latency.get(key)
+            if histogram is None:
+                histogram = self.request_latency[key] = Histogram(LATENCY_BUCKETS)
+            self.route_queries[route] += stats.query_count
+            self.route_query_seconds[route] += stats.query_seconds
+        histogram.observe(seconds)
+
+        repeated = [(sql, n) for sql, n in stats.statements.items() if n >= N_PLUS_ONE_THRESHOLD]
+        if repeated:
+            with self._lock:
+                self.n_plus_one[route] += 1
+            sql, n = max(repeated, key=lambda item: item[1])
+            slow_query_logger.warning("Possible N+1 on %s %s: statement ran %d times: %s",
+                                      method, route, n, ' '.join(sql.split())[:200])
+
+    def record_slow_query(self):
+        with self._lock:
+            self.slow_queries += 1
+
+    def register_collector(self, collector):
+        """Add a callable returning extra Prometheus text lines (e.g. cache stats)"""
+        self.collectors.append(collector)
+
+    def render(self):
+        lines = [
+            '# HELP http_request_duration_seconds Request latency by route',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        with self._lock:
+            request_latency = dict(self.request_latency)
+            route_queries = dict(self.route_queries)
+            route_query_seconds = dict(self.route_query_seconds)
+            n_plus_one = dict(self.n_plus_one)
+            slow_queries = self.slow_queries
+        for (method, route, status), histogram in sorted(request_latency.items()):
+            lines += histogram.render('http_request_duration_seconds',
+                                      {'method': method, 'route': route, 'status': status})
+
+        lines += ['# HELP db_query_duration_seconds Duration of individual SQL statements',
+                  '# TYPE db_query_duration_seconds histogram']
+        lines += self.query_latency.render('db_query_duration_seconds', {})
+
+        lines += ['# HELP http_request_db_queries_total SQL statements issued while serving a route',
+                  '# TYPE http_request_db_queries_total counter']
+        lines += [f'http_request_db_queries_total{_labels({"route": r})} {n}' for r, n in sorted(route_queries.items())]
+        lines += ['# HELP http_request_db_seconds_total Time spent in SQL while serving a route',
+                  '# TYPE http_request_db_seconds_total counter']
+        lines += [f'http_request_db_seconds_total{_labels({"route": r})} {s}' for r, s in sorted(route_query_seconds.items())]
+        lines += ['# HELP http_request_n_plus_one_total Requests that repeated one statement N_PLUS_ONE_THRESHOLD+ times',
+                  '# TYPE http_request_n_plus_one_total counter']
+        lines += [f'http_request_n_plus_one_total{_labels({"route": r})} {n}' for r, n in sorted(n_plus_one.items())]
+        lines += ['# HELP db_slow_queries_total Statements slower than SLOW_QUERY_MS',
+                  '# TYPE db_slow_queries_total counter',
+                  f'db_slow_queries_total {slow_queries}']
+
+        for collector in self.collectors:
+            lines += collector()
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+_request_stats = contextvars.ContextVar('request_stats', default=None)
+
+
+# --- SQLAlchemy hooks (registered on the Engine class, so every engine is covered) ---
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    elapsed = time.perf_counter() - started
+    metrics.query_latency.observe(elapsed)
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.query_count += 1
+        stats.query_seconds += elapsed
+        stats.statements[statement] += 1
+
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        metrics.record_slow_query()
+        slow_query_logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, ' '.join(statement.split())[:500])
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    if context.connection is not None and context.connection.info.get('query_started'):
+        context.connection.info['query_started'].pop()
+
+
+# --- ASGI middleware ---
+class MetricsMiddleware:
+    """Record per-route latency and the SQL issued by each request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = {'code': 500}
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+            await send(message)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_stats.reset(token)
+            route = scope.get('route')
+            metrics.observe_request(scope['method'], getattr(route, 'path', 'unmatched'),
+                                    status['code'], elapsed, stats)
+
+
+# --- Logging off the request path ---
+_listener = None
+
+
+def configure_slow_query_log(path=None):
+    """Send slow-query and N+1 warnings through a queue to a background writer thread"""
+    global _listener
+    if _listener is not None:
+        return
+    target = logging.FileHandler(path) if path else logging.StreamHandler()
+    target.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+    log_queue = queue.SimpleQueue()
+    slow_query_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    slow_query_logger.setLevel(logging.WARNING)
+    slow_query_logger.propagate = False
+    _listener = logging.handlers.QueueListener(log_queue, target)
+    _listener.start()
@@ -1,13 +1,99 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-from database import get_db
+from typing import List, Literal, Optional
+import asyncio
+from database import get_read_session, get_session, run_db, ReadSessionLocal
+import cache
 import crud
 import pydantic_models
+import responses
 
 router = APIRouter(prefix="/inventory", tags=["inventory"])
 
+STREAM_BATCH_SIZE = 1000
+
+# One forecast refresh at a time; concurrent readers wait for it instead of recomputing the same SKUs
+_forecast_lock = asyncio.Lock()
+
+def parse_cursor(after: Optional[str]):
+    """Split a 'warehouse_id:product_id' keyset cursor"""
+    if after is None:
+        return None
+    warehouse_id, sep, product_id = after.partition(":")
+    if not sep:
+        raise HTTPException(400, "Cursor must look like 'warehouse_id:product_id'")
+    return warehouse_id, product_id
+
+async def _ensure_forecast_fresh(db):
+    async with _forecast_lock:
+        await cache.inventory_forecast_freshness.get_or_set_async(
+            "forecast", lambda: run_db(db, crud.refresh_inventory_forecast)
+        )
+
+def stream_inventory_health(warehouse_id, status, after, limit):
+    """Yield NDJSON lines batch by batch from a server-side cursor"""
+    # The request's session is closed before a streamed body is sent, so use our own
+    db = ReadSessionLocal()
+    try:
+        query = crud.inventory_health_query(db, warehouse_id, status, after, limit)
+        result = db.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        for rows in result.partitions():
+            yield b"".join(responses.dumps(dict(row._mapping)) + b"\n" for row in rows)
+    finally:
+        db.close()
+
 @router.get("/health", response_model=List[pydantic_models.InventoryHealth])
-async def get_inventory_health(db: Session = Depends(get_db)):
+async def get_inventory_health(
+    request: Request,
+    warehouse_id: Optional[str] = None,
+    status: Optional[Literal["CRITICAL", "LOW", "HEALTHY"]] = None,
+    after: Optional[str] = Query(None, description="Keyset cursor from the X-Next-Cursor header"),
+    limit: Optional[int] = Query(None, ge=1, le=100000),
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_read_session)
+):
     """Return stock and reorder status"""
-    return crud.get_inventory_health(db)
\ No newline at end of file
+    cursor = parse_cursor(after)
+    if format == "ndjson":
+        return StreamingResponse(
+            stream_inventory_health(warehouse_id, status, cursor, limit),
+            media_type="application/x-ndjson"
+        )
+
+    # Rows go from the query tuples straight to the encoder, skipping pydantic validation
+    health = await run_db(db, crud.inventory_health_rows, warehouse_id, status, cursor, limit)
+    headers = {}
+    if limit is not None and len(health) == limit:
+        headers["X-Next-Cursor"] = f"{health[-1]['warehouse_id']}:{health[-1]['product_id']}"
+    return responses.json_response(request, responses.encode(health), headers)
+
+@router.get("/forecast", response_model=List[pydantic_models.InventoryForecast])
+async def get_inventory_forecast(
+    request: Request,
+    warehouse_id: Optional[str] = None,
+    product_id: Optional[str] = None,
+    within_days: Optional[int] = Query(None, ge=0, description="Only SKUs projected to run out within this many days"),
+    after: Optional[str] = Query(None, description="Keyset cursor from the X-Next-Cursor header"),
+    limit: Optional[int] = Query(None, ge=1, le=100000),
+    db: Session = Depends(get_read_session)
+):
+    """Projected consumption, stock-out date and reorder quantity per SKU"""
+    cursor = parse_cursor(after)
+    await _ensure_forecast_fresh(db)
+    forecast = await run_db(db, crud.inventory_forecast_rows, warehouse_id, product_id, within_days, cursor, limit)
+    headers = {}
+    if limit is not None and len(forecast) == limit:
+        headers["X-Next-Cursor"] = f"{forecast[-1]['warehouse_id']}:{forecast[-1]['product_id']}"
+    return responses.json_response(request, responses.encode(forecast), headers)
+
+@router.post("/forecast/refresh")
+async def refresh_inventory_forecast(
+    full: bool = Query(False, description="Recompute every SKU instead of the stale ones"),
+    db: Session = Depends(get_session)
+):
+    """Recompute the restock forecasts now"""
+    async with _forecast_lock:
+        refreshed = await run_db(db, crud.refresh_inventory_forecast, full)
+        cache.inventory_forecast_freshness.set("forecast", refreshed)
+    return {"refreshed": refreshed}
\ No newline at end of file
@@ -0,0 +1,221 @@
+# jobqueue.py
+"""In-process background jobs for uploads and loads.
+
+Jobs run on a bounded thread pool (JOB_WORKERS) with at most JOB_QUEUE_LIMIT
+waiting, so a burst of uploads is refused instead of piling up. Job sessions
+come from their own engine whose pool holds JOB_WORKERS connections, so
+ingestion never takes connections from the API's pool. Loads run one at a time.
+
+Load jobs read snapshots only from directories directly under SNAPSHOT_ROOT.
+
+Progress is kept in memory and served by GET /jobs/{id}; finished jobs are
+kept for JOB_RETENTION_SECONDS. State is per worker process, so behind several
+workers a job must be polled on the worker that accepted it (or run one).
+"""
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy.orm import sessionmaker
+
+import cache
+from database import DATABASE_URL, create_db_engine
+
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+JOB_QUEUE_LIMIT = int(os.getenv('JOB_QUEUE_LIMIT', '20'))
+JOB_RETENTION_SECONDS = float(os.getenv('JOB_RETENTION_SECONDS', '3600'))
+MAX_JOB_ERRORS = 20
+SNAPSHOT_ROOT = Path(os.getenv('SNAPSHOT_ROOT', Path(__file__).parent / 'snapshots')).resolve()
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = 'queued', 'running', 'succeeded', 'failed'
+
+
+class JobQueueFull(Exception):
+    """Raised by submit() when JOB_QUEUE_LIMIT jobs are already waiting"""
+
+
+def snapshot_dir(name: str) -> Path:
+    """The directory of a named snapshot under SNAPSHOT_ROOT; ValueError for anything that is not a plain name"""
+    path = (SNAPSHOT_ROOT / name).resolve()
+    if Path(name).is_absolute() or '..' in Path(name).parts or path.parent != SNAPSHOT_ROOT:
+        raise ValueError(f"Invalid snapshot name: {name!r}")
+    return path
+
+
+class Job:
+    """State and progress of one background job; updated by the worker, read by the API"""
+
+    def __init__(self, kind: str, description: str):
+        self.job_id = uuid.uuid4().hex
+        self.kind = kind
+        self.description = description
+        self.status = QUEUED
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self.rows_processed = 0
+        self.rows_total = None
+        self.fraction_done = None
+        self.errors = []
+        self.result = None
+        self.error = None
+        self._started = None
+        self._finished = None
+
+    def update(self, rows_processed=None, rows_total=None, fraction_done=None, errors=None):
+        """Report progress; fraction_done (0-1) gives an ETA when the row total is not known"""
+        if rows_processed is not None:
+            self.rows_processed = rows_processed
+        if rows_total is not None:
+            self.rows_total = rows_total
+        if fraction_done is not None:
+            self.fraction_done = min(max(fraction_done, 0.0), 1.0)
+        if errors is not None:
+            self.errors = list(errors[:MAX_JOB_ERRORS])
+
+    @property
+    def elapsed_seconds(self):
+        if self._started is None:
+            return 0.0
+        return (self._finished or time.perf_counter()) - self._started
+
+    @property
+    def rows_per_second(self):
+        elapsed = self.elapsed_seconds
+        return round(self.rows_processed / elapsed, 1) if elapsed > 0 else 0.0
+
+    @property
+    def eta_seconds(self):
+        if self.status != RUNNING:
+            return 0.0 if self.status in (SUCCEEDED, FAILED) else None
+        fraction = self.fraction_done
+        if self.rows_total:
+            fraction = self.rows_processed / self.rows_total
+        if not fraction:
+            return None
+        return round(self.elapsed_seconds * (1 - fraction) / fraction, 1)
+
+    def as_dict(self):
+        return {
+            'job_id': self.job_id,
+            'kind': self.kind,
+            'description': self.description,
+            'status': self.status,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'rows_processed': self.rows_processed,
+            'rows_total': self.rows_total,
+            'rows_per_second': self.rows_per_second,
+            'elapsed_seconds': round(self.elapsed_seconds, 3),
+            'eta_seconds': self.eta_seconds,
+            'errors': self.errors,
+            'result': self.result,
+            'error': self.error,
+        }
+
+
+# Ingestion gets its own small pool: at most one connection per job worker
+job_engine = create_db_engine(DATABASE_URL, 'jobs', pool_size=JOB_WORKERS, max_overflow=0)
+JobSession = sessionmaker(autocommit=False, autoflush=False, bind=job_engine)
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='job')
+_jobs = {}
+_lock = threading.Lock()
+# A load rewrites whole tables; two at once would only contend on the same rows
+load_lock = threading.Lock()
+
+
+def _prune():
+    cutoff = time.perf_counter() - JOB_RETENTION_SECONDS
+    for job_id in [job_id for job_id, job in _jobs.items() if job._finished is not None and job._finished < cutoff]:
+        del _jobs[job_id]
+
+
+def _run(job: Job, fn, args, kwargs):
+    job.status = RUNNING
+    job.started_at = datetime.now()
+    job._started = time.perf_counter()
+    try:
+        job.result = fn(job, *args, **kwargs)
+        job.status = SUCCEEDED
+    except Exception as e:
+        job.error = f"{type(e).__name__}: {e}"
+        job.status = FAILED
+        traceback.print_exc()
+    finally:
+        job._finished = time.perf_counter()
+        job.finished_at = datetime.now()
+
+
+def submit(kind: str, description: str, fn, *args, **kwargs):
+    """Queue fn(job, *args, **kwargs) and return the Job; fn's return value becomes job.result"""
+    with _lock:
+        _prune()
+        if sum(job.status == QUEUED for job in _jobs.values()) >= JOB_QUEUE_LIMIT:
+            raise JobQueueFull(f"{JOB_QUEUE_LIMIT} jobs are already waiting; retry later")
+        job = Job(kind, description)
+        _jobs[job.job_id] = job
+    _executor.submit(_run, job, fn, args, kwargs)
+    return job
+
+
+def get(job_id: str):
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def active(kind: str):
+    """Jobs of this kind that are queued or running"""
+    with _lock:
+        return [job for job in _jobs.values() if job.kind == kind and job.status in (QUEUED, RUNNING)]
+
+
+def recent(limit: int = 50):
+    """The most recently created jobs, newest first"""
+    with _lock:
+        jobs = sorted(_jobs.values(), key=lambda job: job.created_at, reverse=True)
+    return jobs[:limit]
+
+
+# --- Job bodies ---
+def ingest_upload(job: Job, path: str, filename: str, batch_size: int):
+    """Ingest a delivery log file saved to disk by the upload route, then delete it"""
+    import ingest
+
+    size = os.path.getsize(path)
+    try:
+        with open(path, 'rb') as fileobj, JobSession() as db:
+            def progress(processed, errors):
+                job.update(rows_processed=processed, errors=errors,
+                           fraction_done=fileobj.tell() / size if size else None)
+            response = ingest.ingest_delivery_logs(db, fileobj, filename, batch_size, progress=progress)
+    finally:
+        os.remove(path)
+    job.update(rows_processed=response.records_processed, errors=response.errors)
+    return response.model_dump()
+
+
+def load(job: Job, **options):
+    """Run load_data.load_data() with progress reported to the job"""
+    import load_data
+
+    def progress(rows_loaded, rows_total):
+        job.update(rows_processed=rows_loaded, rows_total=rows_total)
+
+    with load_lock:
+        stats = load_data.load_data(progress=progress, raise_errors=True, **options)
+    # A load may have rewritten any row
+    for entity_cache in cache.entity_caches.values():
+        entity_cache.invalidate()
+    for summary_cache in (cache.claims_summary_cache, cache.claims_aging_cache, cache.vendor_performance_cache):
+        summary_cache.invalidate()
+    if cache.DIMSTORE_ENABLED:
+        import dimstore
+        dimstore.store.invalidate()
+    return stats
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List
+import jobqueue
+import pydantic_models
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+@router.post("/load", response_model=pydantic_models.JobStatus, status_code=202)
+async def start_load(options: pydantic_models.LoadJobRequest):
+    """Run the source-file loader in the background; poll /jobs/{job_id} for progress"""
+    if jobqueue.active("load"):
+        raise HTTPException(409, "A load is already queued or running")
+    snapshot_dir = None
+    if options.snapshot:
+        try:
+            snapshot_dir = jobqueue.snapshot_dir(options.snapshot)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        if not snapshot_dir.is_dir():
+            raise HTTPException(404, "Snapshot not found")
+    try:
+        job = jobqueue.submit(
+            "load", "snapshot " + options.snapshot if options.snapshot else "source CSVs", jobqueue.load,
+            incremental=options.incremental, validate=options.validate_rows, snapshot_dir=snapshot_dir
+        )
+    except jobqueue.JobQueueFull as e:
+        raise HTTPException(503, str(e))
+    return job.as_dict()
+
+@router.get("/", response_model=List[pydantic_models.JobStatus])
+async def list_jobs(limit: int = Query(50, ge=1, le=500)):
+    """Recent jobs on this worker, newest first"""
+    return [job.as_dict() for job in jobqueue.recent(limit)]
+
+@router.get("/{job_id}", response_model=pydantic_models.JobStatus)
+async def get_job(job_id: str):
+    """Status, rows processed, throughput, errors and ETA of a background job"""
+    job = jobqueue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.as_dict()
\ No newline at end of file
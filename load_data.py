@@ -1,136 +1,500 @@
 # load_data.py
 import os
+import csv
+import hashlib
+import io
+import tempfile
+import time
+from datetime import datetime
 from pathlib import Path
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import select, text, tuple_
+from sqlalchemy.engine import make_url
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
 from dotenv import load_dotenv
-from datetime import datetime
 from urllib.parse import quote_plus
 
 # --- Load .env automatically from script folder ---
 dotenv_path = Path(__file__).parent / '.env'
 load_dotenv(dotenv_path=dotenv_path)
 
-# --- Helper function to parse dates ---
-def parse_date(date_str):
-    if pd.isna(date_str) or date_str in ('', 'NULL'):
-        return None
+import cleaning
+from database import create_db_engine
+import migrations
+import models
+import quality
+import rollups
+import snapshot
+import utils
+
+DEFAULT_CHUNKSIZE = 10000
+
+# --- Source files, in the order they must be written (foreign keys) ---
+CSV_FILES = {
+    'shipments': 'shipments.csv',
+    'vendors': 'vendors.csv',
+    'inventory': 'inventory (1).csv',
+    'delivery_logs': 'delivery_logs.csv',
+    'claims': 'claims.csv',
+}
+
+def read_tables(folder, names=None, workers=None):
+    """Read and clean the given (default: all) source files; see cleaning.read_and_clean"""
+    paths = {name: Path(folder) / CSV_FILES[name] for name in (CSV_FILES if names is None else names)}
+    if not paths:
+        return {}
+    return cleaning.read_and_clean(paths, workers=workers)
+
+
+# --- Writers ---
+def _records(df):
+    """Convert a frame to insert dicts with NULLs for missing values"""
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def write_batches(conn, name, df, chunksize=DEFAULT_CHUNKSIZE):
+    """Portable path: one executemany INSERT per chunk (used for SQLite)"""
+    table = models.Base.metadata.tables[name]
+    for start in range(0, len(df), chunksize):
+        conn.execute(table.insert(), _records(df.iloc[start:start + chunksize]))
+
+
+def _write_csv(df, handle, null):
+    out = df.copy()
+    for col in out.columns:
+        if out[col].dtype == bool:
+            out[col] = out[col].astype(int)
+    out.to_csv(handle, index=False, header=False, na_rep=null, quoting=csv.QUOTE_MINIMAL)
+
+
+def write_mysql_infile(conn, name, df):
+    """Native path for MySQL: stage the table as a CSV and LOAD DATA LOCAL INFILE it"""
+    with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, newline='') as handle:
+        _write_csv(df, handle, null='\\N')
     try:
-        return datetime.strptime(str(date_str), '%m/%d/%Y').date()
-    except ValueError:
-        try:
-            return pd.to_datetime(date_str, errors='coerce').date()
-        except:
-            return None
+        columns = ', '.join(f"`{col}`" for col in df.columns)
+        path = handle.name.replace('\\', '/')
+        conn.execute(text(
+            f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE `{name}` "
+            "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+            f"LINES TERMINATED BY '\\n' ({columns})"
+        ))
+    finally:
+        os.unlink(handle.name)
 
-# --- Main function ---
-def load_data():
-    # Load database credentials from environment
+
+def write_postgres_copy(conn, name, df):
+    """Native path for PostgreSQL: COPY ... FROM STDIN"""
+    buffer = io.StringIO()
+    _write_csv(df, buffer, null='')
+    buffer.seek(0)
+    columns = ', '.join(f'"{col}"' for col in df.columns)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f'COPY "{name}" ({columns}) FROM STDIN WITH (FORMAT csv)', buffer)
+    finally:
+        cursor.close()
+
+
+def write_table(engine, name, df, chunksize=DEFAULT_CHUNKSIZE, native=True):
+    """Write one table in a single transaction, returning rows/sec"""
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        dialect = engine.dialect.name
+        if native and dialect == 'mysql':
+            write_mysql_infile(conn, name, df)
+        elif native and dialect == 'postgresql':
+            write_postgres_copy(conn, name, df)
+        else:
+            write_batches(conn, name, df, chunksize)
+    elapsed = time.perf_counter() - started
+    return {
+        'rows': len(df),
+        'seconds': round(elapsed, 3),
+        'rows_per_sec': round(len(df) / elapsed, 1) if elapsed > 0 else 0.0
+    }
+
+
+# --- Incremental loading: file and row fingerprints ---
+def file_fingerprint(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def primary_key_columns(name):
+    return [col.name for col in models.Base.metadata.tables[name].primary_key.columns]
+
+
+def row_fingerprints(df, key_columns):
+    """Return (row keys, 64-bit content hashes) for every row of a cleaned frame"""
+    keys = df[key_columns[0]].astype(str)
+    for col in key_columns[1:]:
+        keys = keys + '|' + df[col].astype(str)
+    hashes = pd.util.hash_pandas_object(df, index=False).astype('int64')
+    return pd.Series(hashes.values, index=keys.values)
+
+
+def upsert_statement(dialect, table):
+    """INSERT that updates the non-key columns when the primary key already exists"""
+    key_columns = [col.name for col in table.primary_key.columns]
+    stmt = utils.dialect_insert(dialect)(table)
+    if dialect == 'mysql':
+        return stmt.on_duplicate_key_update(
+            {col.name: stmt.inserted[col.name] for col in table.columns if col.name not in key_columns}
+        )
+    return stmt.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={col.name: stmt.excluded[col.name] for col in table.columns if col.name not in key_columns}
+    )
+
+
+def write_upserts(conn, table, records, chunksize=DEFAULT_CHUNKSIZE):
+    stmt = upsert_statement(conn.dialect.name, table)
+    for start in range(0, len(records), chunksize):
+        conn.execute(stmt, records[start:start + chunksize])
+
+
+def load_file_fingerprints(engine):
+    table = models.LoadFingerprint.__table__
+    with engine.connect() as conn:
+        return dict(conn.execute(select(table.c.table_name, table.c.file_hash)).all())
+
+
+def _key_filter(table, key_columns, keys):
+    if len(key_columns) == 1:
+        return table.c[key_columns[0]].in_([key[0] for key in keys])
+    return tuple_(*(table.c[col] for col in key_columns)).in_(keys)
+
+
+def stored_rows(conn, table, key_columns, keys):
+    """{key tuple: row dict} of the given keys that are already in the table"""
+    if not keys:
+        return {}
+    return {
+        tuple(row[col] for col in key_columns): dict(row)
+        for row in conn.execute(select(table).where(_key_filter(table, key_columns, keys))).mappings()
+    }
+
+
+# --- Incremental rollup maintenance: changed rows feed the same deltas as the API writes ---
+def _shipments_changed(db, records, previous):
+    # New shipments have no deliveries yet; a changed one may move its deliveries to another day
+    rollups.mark_days_stale(db, [row['ship_date'] for row in records if (row['shipment_id'],) in previous]
+                            + [row['ship_date'] for row in previous.values()])
+    rollups.record_shipments(db, [(row['origin_warehouse'], row['product_id'])
+                                  for row in records + list(previous.values())])
+
+
+def _inventory_changed(db, records, previous):
+    rollups.mark_forecasts_stale(db, [(row['warehouse_id'], row['product_id']) for row in records])
+
+
+def _delivery_logs_changed(db, records, previous):
+    rollups.record_delivery_logs(db, [
+        (row['carrier'], row['shipment_id']) for row in records if (row['delivery_id'],) not in previous
+    ])
+    rollups.update_delivery_logs(
+        db,
+        [(row['delivery_id'], row['carrier'], row['shipment_id']) for row in previous.values()],
+        [(row['delivery_id'], row['carrier'], row['shipment_id'])
+         for row in records if (row['delivery_id'],) in previous]
+    )
+
+
+def _claims_changed(db, records, previous):
+    rollups.record_claims(
+        db,
+        [(row['delivery_id'], row['amount_claimed']) for row in records],
+        removed=[(row['delivery_id'], row['amount_claimed']) for row in previous.values()]
+    )
+
+
+CHANGE_HOOKS = {
+    'shipments': _shipments_changed,
+    'inventory': _inventory_changed,
+    'delivery_logs': _delivery_logs_changed,
+    'claims': _claims_changed,
+}
+
+
+def changed_rows(engine, name, df, chunksize=DEFAULT_CHUNKSIZE):
+    """Split a cleaned frame into the rows that are new or changed since the last load
+
+    Returns (those rows, number of unchanged rows). Stored fingerprints are
+    looked up one chunk of keys at a time, so the cost follows the file rather
+    than the table. Every version of a key the file repeats is kept, so the
+    quality rules still see the duplicates.
+    """
+    key_columns = primary_key_columns(name)
+    fingerprints = row_fingerprints(df, key_columns)
+    fingerprint_table = models.RowFingerprint.__table__
+    changed = df.duplicated(subset=key_columns, keep=False).to_numpy(copy=True)
+    with engine.connect() as conn:
+        for start in range(0, len(df), chunksize):
+            chunk = fingerprints.iloc[start:start + chunksize]
+            stored = pd.Series(dict(conn.execute(
+                select(fingerprint_table.c.row_key, fingerprint_table.c.row_hash)
+                .where(fingerprint_table.c.table_name == name,
+                       fingerprint_table.c.row_key.in_(list(dict.fromkeys(chunk.index))))
+            ).all()), dtype='int64')
+            previous = stored.reindex(chunk.index)
+            changed[start:start + chunksize] |= (previous.isna() | (previous.values != chunk.values)).values
+    return df[changed].reset_index(drop=True), int((~changed).sum())
+
+
+def upsert_table(engine, name, df, file_hash, chunksize=DEFAULT_CHUNKSIZE, unchanged=0):
+    """Upsert the new or changed rows found by changed_rows(), returning load statistics
+
+    The previous versions of the rows are read before they are overwritten and
+    handed with the new ones to the table's CHANGE_HOOKS entry, which updates
+    the rollups incrementally.
+    """
+    started = time.perf_counter()
+    table = models.Base.metadata.tables[name]
+    key_columns = primary_key_columns(name)
+    df = df.drop_duplicates(subset=key_columns, keep='last').reset_index(drop=True)
+    fingerprints = row_fingerprints(df, key_columns)
+    fingerprint_table = models.RowFingerprint.__table__
+    hook = CHANGE_HOOKS.get(name)
+
+    with Session(engine) as db, db.begin():
+        conn = db.connection()
+        for start in range(0, len(df), chunksize):
+            rows = df.iloc[start:start + chunksize]
+            records = _records(rows)
+            # Rows loaded without fingerprints (e.g. by a full load) still count as updates
+            previous = stored_rows(conn, table, key_columns, list(rows[key_columns].itertuples(index=False, name=None)))
+            write_upserts(conn, table, records, chunksize)
+            write_upserts(conn, fingerprint_table, [
+                {'table_name': name, 'row_key': key, 'row_hash': int(value)}
+                for key, value in fingerprints.iloc[start:start + chunksize].items()
+            ], chunksize)
+            if hook is not None:
+                hook(db, records, previous)
+
+        write_upserts(conn, models.LoadFingerprint.__table__, [{
+            'table_name': name, 'file_hash': file_hash,
+            'row_count': len(df) + unchanged, 'loaded_at': datetime.now()
+        }])
+
+    elapsed = time.perf_counter() - started
+    return {
+        'rows': len(df),
+        'unchanged': unchanged,
+        'seconds': round(elapsed, 3),
+        'rows_per_sec': round(len(df) / elapsed, 1) if elapsed > 0 else 0.0
+    }
+
+
+# --- Data-quality rules ---
+def _known_keys(engine, name, values, df=None, batch_size=DEFAULT_CHUNKSIZE):
+    """Which of values are primary keys of a table, either about to be loaded (df) or already stored
+
+    Only values missing from df are looked up, batch_size at a time, never the whole table.
+    """
+    key = primary_key_columns(name)[0]
+    loading = df[key].dropna().to_numpy(dtype=object) if df is not None else np.array([], dtype=object)
+    values = pd.unique(values.dropna().to_numpy(dtype=object))
+    pending = values[~pd.Series(values).isin(loading).to_numpy()]
+    column = models.Base.metadata.tables[name].c[key]
+    stored = []
+    with engine.connect() as conn:
+        for start in range(0, len(pending), batch_size):
+            stored += conn.scalars(select(column).where(column.in_(pending[start:start + batch_size].tolist()))).all()
+    # Duplicates are harmless: isin() builds its own hash set
+    return np.concatenate([loading, np.array(stored, dtype=object)])
+
+
+def apply_quality_rules(engine, dataframes, quarantine_dir=None):
+    """Drop rows failing quality.RULES from each frame (in place) and quarantine them
+
+    Tables are checked in foreign-key order, so children are checked against
+    the parent rows that actually passed. Returns {table: report}.
+    """
+    reports = {}
+    for name in CSV_FILES:
+        if name not in dataframes:
+            continue
+        keys = {
+            parent: _known_keys(engine, parent, dataframes[name][column], dataframes.get(parent))
+            for parent, column in quality.reference_columns(name).items()
+        }
+        clean, quarantined, counts = quality.validate(name, dataframes[name], keys)
+        dataframes[name] = clean.reset_index(drop=True)
+        reports[name] = {
+            'quarantined': len(quarantined),
+            'rules': {rule: count for rule, count in counts.items() if count},
+            'file': quality.write_quarantine(name, quarantined, quarantine_dir),
+        }
+    return reports
+
+
+def get_connection_string():
+    # DATABASE_URL (e.g. sqlite:///supply_chain.db) overrides the MySQL settings
+    if os.getenv('DATABASE_URL'):
+        return os.getenv('DATABASE_URL')
     db_user = os.getenv('DB_USER', 'root')
     db_password = quote_plus(os.getenv('DB_PASSWORD', 'Suki@2808'))
     db_host = os.getenv('DB_HOST', 'localhost')
     db_name = os.getenv('DB_NAME', 'supply_chain')
     db_port = os.getenv('DB_PORT', '3306')
+    return f"mysql+pymysql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+
+
+def create_loader_engine(connection_string):
+    if connection_string.startswith('mysql'):
+        # LOAD DATA LOCAL INFILE must be enabled on the client side
+        return create_db_engine(connection_string, 'bulk', connect_args={'local_infile': True})
+    return create_db_engine(connection_string, 'bulk')
+
+
+# --- Main function ---
+def load_data(folder=None, database_url=None, chunksize=DEFAULT_CHUNKSIZE, workers=None, native=True,
+              incremental=False, validate=True, quarantine_dir=None, snapshot_dir=None, progress=None,
+              raise_errors=False):
+    """Load all source CSVs, returning per-table load statistics
+
+    With incremental=True unchanged files are skipped and only new or changed
+    rows (by primary key + content hash) are upserted; the rollups and
+    forecasts are then updated from those rows alone. With validate=True rows
+    failing the quality rules are written to quarantine_dir instead of loaded.
+    With snapshot_dir the tables come from a Parquet snapshot (see snapshot.py)
+    instead of the CSVs, already typed, so parsing and cleaning are skipped.
 
-    connection_string = f"mysql+pymysql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-    print(f"Connecting to: {connection_string.replace(db_password, '********')}")
+    progress(rows loaded, rows to load) is called once the files are read and
+    after each table. With raise_errors=True failures propagate (background
+    jobs use this) instead of being printed. The loader's engine and its
+    connections are disposed of before returning.
+    """
+    connection_string = database_url or get_connection_string()
+    print(f"Connecting to: {make_url(connection_string).render_as_string(hide_password=True)}")
 
+    stats = {}
+    engine = None
     try:
-        engine = create_engine(connection_string)
-        
+        engine = create_loader_engine(connection_string)
+
         # Test connection
         with engine.connect() as conn:
-            print("Connected to MySQL database successfully!")
-        
-        # --- Detect CSV files in the same folder as script ---
-        script_folder = Path(__file__).parent
-        csv_files = {
-            'vendors': script_folder / 'vendors.csv',
-            'inventory': script_folder / 'inventory (1).csv',
-            'shipments': script_folder / 'shipments.csv',
-            'delivery_logs': script_folder / 'delivery_logs.csv',
-            'claims': script_folder / 'claims.csv'
-        }
+            print(f"Connected to {engine.dialect.name} database successfully!")
+        migrations.upgrade(engine)
+
+        folder = Path(folder or Path(__file__).parent)
+        if snapshot_dir:
+            sources = {name: snapshot.snapshot_path(snapshot_dir, name) for name in CSV_FILES}
+        else:
+            sources = {name: folder / CSV_FILES[name] for name in CSV_FILES}
+        names = list(CSV_FILES)
+        file_hashes = {}
+        if incremental:
+            for name in CSV_FILES:
+                if not sources[name].exists():
+                    raise FileNotFoundError(f"{sources[name]} not found")
+            file_hashes = {name: file_fingerprint(sources[name]) for name in CSV_FILES}
+            previous = load_file_fingerprints(engine)
+            names = [name for name in CSV_FILES if previous.get(name) != file_hashes[name]]
+            for name in CSV_FILES:
+                if name not in names:
+                    print(f"- {name} unchanged, skipping")
 
-        # Load CSVs
-        dataframes = {}
-        for name, path in csv_files.items():
-            if not path.exists():
-                raise FileNotFoundError(f"{path} not found")
-            df = pd.read_csv(path)
-            dataframes[name] = df
+        # --- Read & clean CSV files on a process pool ---
+        started = time.perf_counter()
+        if snapshot_dir:
+            dataframes = snapshot.read_tables(snapshot_dir, names=names)
+        else:
+            dataframes = read_tables(folder, names=names, workers=workers)
+        for name, df in dataframes.items():
             print(f"Loaded {name}: {len(df)} records")
+        print(f"Parsed all files in {time.perf_counter() - started:.2f}s")
+
+        # --- Keep only new or changed rows, so the rest of the load scales with the change ---
+        unchanged = {}
+        if incremental:
+            started = time.perf_counter()
+            for name in names:
+                dataframes[name], unchanged[name] = changed_rows(engine, name, dataframes[name], chunksize)
+                print(f"- {name}: {len(dataframes[name])} new or changed, {unchanged[name]} unchanged")
+            print(f"Compared row fingerprints in {time.perf_counter() - started:.2f}s")
+
+        # --- Quarantine rows that break integrity or sanity rules ---
+        quality_reports = {}
+        if validate:
+            started = time.perf_counter()
+            quality_reports = apply_quality_rules(engine, dataframes, quarantine_dir)
+            for name, report in quality_reports.items():
+                if report['quarantined']:
+                    print(f"! {name}: {report['quarantined']} rows quarantined to {report['file']} {report['rules']}")
+            print(f"Checked quality rules in {time.perf_counter() - started:.2f}s")
 
-        # --- Data cleaning & transformations ---
-        # Vendors
-        vendors_df = dataframes['vendors']
-        for col in ['contract_start', 'contract_end']:
-            if col in vendors_df.columns:
-                vendors_df[col] = vendors_df[col].apply(parse_date)
-        if 'vendor_rating' in vendors_df.columns:
-            vendors_df['vendor_rating'] = pd.to_numeric(vendors_df['vendor_rating'], errors='coerce')
-
-        # Inventory
-        inventory_df = dataframes['inventory']
-        for col in ['last_restock_date', 'next_restock_due']:
-            if col in inventory_df.columns:
-                inventory_df[col] = inventory_df[col].apply(parse_date)
-        for col in ['stock_level', 'reorder_threshold']:
-            if col in inventory_df.columns:
-                inventory_df[col] = pd.to_numeric(inventory_df[col], errors='coerce').fillna(0).astype(int)
-
-        # Shipments
-        shipments_df = dataframes['shipments']
-        for col in ['ship_date', 'delivery_date']:
-            if col in shipments_df.columns:
-                shipments_df[col] = shipments_df[col].apply(parse_date)
-        for col in ['quantity', 'freight_cost']:
-            if col in shipments_df.columns:
-                shipments_df[col] = pd.to_numeric(shipments_df[col], errors='coerce').fillna(0)
-
-        # Delivery logs
-        delivery_logs_df = dataframes['delivery_logs']
-        if 'delivery_duration_days' in delivery_logs_df.columns:
-            delivery_logs_df['delivery_duration_days'] = pd.to_numeric(delivery_logs_df['delivery_duration_days'], errors='coerce').fillna(0).astype(int)
-        if 'damage_flag' in delivery_logs_df.columns:
-            delivery_logs_df['damage_flag'] = delivery_logs_df['damage_flag'].astype(str).str.lower().map({
-                'true': True, '1': True, 'yes': True, 'y': True,
-                'false': False, '0': False, 'no': False, 'n': False
-            }).fillna(False)
-
-        # Claims
-        claims_df = dataframes['claims']
-        for col in ['claim_date', 'resolved_date']:
-            if col in claims_df.columns:
-                claims_df[col] = claims_df[col].apply(parse_date)
-        if 'amount_claimed' in claims_df.columns:
-            claims_df['amount_claimed'] = pd.to_numeric(claims_df['amount_claimed'], errors='coerce').fillna(0.0)
-
-        # --- Load data into MySQL in correct order ---
-        print("Loading data into MySQL...")
-        shipments_df.to_sql("shipments", con=engine, if_exists="append", index=False, method='multi')
-        print("✓ Shipments data loaded")
-        vendors_df.to_sql("vendors", con=engine, if_exists="append", index=False, method='multi')
-        print("✓ Vendors data loaded")
-        inventory_df.to_sql("inventory", con=engine, if_exists="append", index=False, method='multi')
-        print("✓ Inventory data loaded")
-        delivery_logs_df.to_sql("delivery_logs", con=engine, if_exists="append", index=False, method='multi')
-        print("✓ Delivery logs data loaded")
-        claims_df.to_sql("claims", con=engine, if_exists="append", index=False, method='multi')
-        print("✓ Claims data loaded")
+        # --- Load data in foreign-key order ---
+        print("Loading data into database...")
+        rows_total = sum(len(dataframes[name]) for name in names)
+        rows_loaded = 0
+        if progress is not None:
+            progress(rows_loaded, rows_total)
+        for name in names:
+            if incremental:
+                stats[name] = upsert_table(engine, name, dataframes[name], file_hashes[name], chunksize=chunksize,
+                                           unchanged=unchanged[name])
+            else:
+                stats[name] = write_table(engine, name, dataframes[name], chunksize=chunksize, native=native)
+            if name in quality_reports:
+                stats[name]['quarantined'] = quality_reports[name]['quarantined']
+            print(f"✓ {name} loaded: {stats[name]['rows']} rows in {stats[name]['seconds']}s "
+                  f"({stats[name]['rows_per_sec']} rows/sec)")
+            rows_loaded += len(dataframes[name])
+            if progress is not None:
+                progress(rows_loaded, rows_total)
+
+        # Incremental loads already applied their changes to the claims rollup and queued
+        # the affected days and forecasts, so only those are recomputed
+        if not incremental and {'delivery_logs', 'claims'} & set(names):
+            with Session(engine) as session:
+                rollups.rebuild_claims_rollup(session)
+                session.commit()
+            print("✓ Carrier claims rollup refreshed")
+
+        if {'shipments', 'delivery_logs', 'claims'} & set(names):
+            with Session(engine) as session:
+                days = rollups.refresh_carrier_daily(session, full=not incremental)
+                session.commit()
+            print(f"✓ Carrier daily performance rollup refreshed ({days} days)")
+
+        if {'shipments', 'inventory'} & set(names):
+            import forecasting
+            with Session(engine) as session:
+                refreshed = forecasting.refresh_forecasts(session, full=not incremental)
+                session.commit()
+            print(f"✓ Restock forecasts refreshed ({refreshed} SKUs)")
 
         print("\nAll data loaded successfully!")
 
     except FileNotFoundError as e:
+        if raise_errors:
+            raise
         print(f"Error: File not found - {e}")
     except SQLAlchemyError as e:
+        if raise_errors:
+            raise
         print(f"Database error: {e}")
     except Exception as e:
+        if raise_errors:
+            raise
         print(f"Unexpected error: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        if engine is not None:
+            engine.dispose()
+
+    return stats
 
 # --- Run the loader ---
 if __name__ == "__main__":
-    load_data()
+    import sys
+    load_data(incremental='--incremental' in sys.argv[1:])
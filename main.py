@@ -1,14 +1,30 @@
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
+import cache
+import database
+import instrumentation
+import migrations
 import models
 from database import engine, get_db
-from routers import claims, inventory, shipments, uploads
+import carriers, claims, delivery_logs, inventory, jobs, shipments, uploads, vendors
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
+# Schema creation and migrations run once per worker start, not at import time.
+# Set DB_MIGRATE_ON_STARTUP=0 when a deploy step runs `python migrations.py` instead.
+MIGRATE_ON_STARTUP = os.getenv('DB_MIGRATE_ON_STARTUP', '1').lower() in ('1', 'true', 'yes')
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if MIGRATE_ON_STARTUP:
+        await run_in_threadpool(migrations.upgrade, engine)
+    yield
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Supply Chain API",
     description="API for managing supply chain operations and analytics",
     version="1.0.0",
@@ -25,11 +41,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and per-request SQL statistics, served at /metrics
+app.add_middleware(instrumentation.MetricsMiddleware)
+instrumentation.configure_slow_query_log(os.getenv('SLOW_QUERY_LOG'))
+instrumentation.metrics.register_collector(cache.prometheus_lines)
+instrumentation.metrics.register_collector(database.pool_prometheus_lines)
+if cache.DIMSTORE_ENABLED:
+    import dimstore
+    instrumentation.metrics.register_collector(dimstore.prometheus_lines)
+
 # Include only the required routers
+app.include_router(carriers.router)
 app.include_router(claims.router)
+app.include_router(delivery_logs.router)
 app.include_router(inventory.router)
+app.include_router(jobs.router)
 app.include_router(shipments.router)
 app.include_router(uploads.router)
+app.include_router(vendors.router)
 
 @app.get("/")
 async def root():
@@ -37,10 +66,18 @@ async def root():
         "message": "Supply Chain API",
         "version": "1.0.0",
         "endpoints": {
+            "carrier_performance": "/carriers/performance",
             "claims_summary": "/claims/summary",
+            "claims_aging": "/claims/aging",
             "inventory_health": "/inventory/health", 
+            "inventory_forecast": "/inventory/forecast",
+            "jobs": "/jobs/{job_id}",
             "log_shipment": "/shipments/",
-            "upload_delivery_logs": "/uploads/delivery-logs"
+            "log_shipments_bulk": "/shipments/bulk",
+            "upload_delivery_logs": "/uploads/delivery-logs",
+            "start_load": "/jobs/load",
+            "vendor_performance": "/vendors/performance",
+            "metrics": "/metrics"
         },
         "docs": "/docs",
         "redoc": "/redoc"
@@ -51,6 +88,11 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "supply-chain-api"}
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of request and SQL metrics"""
+    return PlainTextResponse(instrumentation.metrics.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,256 @@
+# migrations.py
+"""Bring an existing database up to the current schema.
+
+create_all() only creates missing tables, so changes to tables that already
+exist (new indexes, column types) are applied here. Every migration is
+idempotent and recorded in schema_migrations, so this is safe to run on each
+start-up and after every load. upgrade() does both, and on an up-to-date
+database costs a single query.
+
+Each migration spells out the indexes it adds rather than reading them from
+models.py, so what a version creates never changes once it is released. To
+change an index, append a migration that drops it and creates the new one.
+
+Usage:
+    python migrations.py            # create missing tables and apply pending migrations
+    python migrations.py --explain  # show which indexes the analytics queries use
+"""
+import argparse
+import hashlib
+import sys
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Column, DateTime, Index, MetaData, String, Table, insert, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+import models
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", String(50), primary_key=True),
+    Column("applied_at", DateTime),
+)
+
+
+# Stand-in tables for the indexes below, so defining them leaves models' metadata alone
+_index_metadata = MetaData()
+
+
+def _index(name, table_name, *columns):
+    """An index as a migration defines it, on a stand-in table holding just the named columns"""
+    table = _index_metadata.tables.get(table_name)
+    if table is None:
+        table = Table(table_name, _index_metadata)
+    for column in columns:
+        if column not in table.c:
+            table.append_column(Column(column, String))
+    return Index(name, *(table.c[column] for column in columns))
+
+
+def _create_indexes(*indexes):
+    def migrate(conn):
+        for index in indexes:
+            index.create(conn, checkfirst=True)
+    migrate.indexes = indexes
+    return migrate
+
+
+def _alter_column_type(table, column, sql_type):
+    def migrate(conn):
+        dialect = conn.dialect.name
+        if dialect == 'mysql':
+            conn.execute(text(f"ALTER TABLE {table} MODIFY {column} {sql_type}"))
+        elif dialect == 'postgresql':
+            conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {sql_type}"))
+        # SQLite ignores VARCHAR lengths, so there is nothing to change there
+    return migrate
+
+
+# (version, migration) in the order they must run; never edit an applied entry, append a new one
+MIGRATIONS = [
+    ("0001_key_types", [
+        _alter_column_type("claims", "delivery_id", "VARCHAR(50)"),
+        _alter_column_type("delivery_logs", "shipment_id", "VARCHAR(20)"),
+    ]),
+    ("0002_analytics_indexes", [
+        _create_indexes(
+            _index("ix_shipments_product_id", "shipments", "product_id"),
+            _index("ix_delivery_logs_shipment_id", "delivery_logs", "shipment_id"),
+            _index("ix_delivery_logs_carrier", "delivery_logs",
+                   "carrier", "delivery_id", "delivery_duration_days", "damage_flag"),
+            _index("ix_claims_delivery_id", "claims", "delivery_id", "claim_id", "amount_claimed"),
+            _index("ix_vendors_product_id", "vendors", "product_id"),
+            _index("ix_inventory_product_warehouse", "inventory", "product_id", "warehouse_id"),
+            _index("ix_inventory_next_restock_due", "inventory", "next_restock_due"),
+        ),
+    ]),
+    ("0003_forecast_indexes", [
+        _create_indexes(
+            _index("ix_shipments_ship_date", "shipments", "ship_date", "origin_warehouse", "product_id", "quantity"),
+        ),
+    ]),
+    ("0004_claims_aging_index", [
+        _create_indexes(
+            _index("ix_claims_aging", "claims",
+                   "claim_date", "resolved_date", "claim_status", "reason", "delivery_id", "amount_claimed"),
+        ),
+    ]),
+]
+
+
+def apply_migrations(engine: Engine):
+    """Apply pending migrations in order and return the versions that were applied"""
+    schema_migrations.create(engine, checkfirst=True)
+    with engine.connect() as conn:
+        applied = set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+    newly_applied = []
+    for version, steps in MIGRATIONS:
+        if version in applied:
+            continue
+        # MySQL commits DDL implicitly; the steps are idempotent so a partial run can be retried
+        with engine.begin() as conn:
+            for step in steps:
+                step(conn)
+            conn.execute(insert(schema_migrations).values(version=version, applied_at=datetime.now()))
+        newly_applied.append(version)
+    return newly_applied
+
+
+def schema_version():
+    """Fingerprint of the tables, columns and indexes declared in models.py"""
+    digest = hashlib.sha256()
+    for table in sorted(models.Base.metadata.tables.values(), key=lambda t: t.name):
+        digest.update(table.name.encode())
+        for column in table.columns:
+            digest.update(f"{column.name}:{column.type!r}".encode())
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            digest.update(f"{index.name}:{[column.name for column in index.columns]}".encode())
+    return "schema_" + digest.hexdigest()[:16]
+
+
+def upgrade(engine: Engine):
+    """Create missing tables and apply pending migrations, unless both are already recorded
+
+    Returns the versions applied (empty when the database was up to date).
+    """
+    current = schema_version()
+    expected = {version for version, _ in MIGRATIONS} | {current}
+    try:
+        with engine.connect() as conn:
+            applied = set(conn.execute(select(schema_migrations.c.version)).scalars())
+    except DBAPIError:
+        applied = set()  # no schema_migrations table yet
+    if expected <= applied:
+        return []
+
+    models.Base.metadata.create_all(bind=engine)
+    newly_applied = apply_migrations(engine)
+    if current not in applied:
+        with engine.begin() as conn:
+            conn.execute(insert(schema_migrations).values(version=current, applied_at=datetime.now()))
+        newly_applied.append(current)
+    return newly_applied
+
+
+# --- Index usage check ---
+def _primary_key_index(dialect: str, table_name: str):
+    """The name the dialect's query plans give a table's primary key"""
+    if dialect == 'sqlite':
+        return f"sqlite_autoindex_{table_name}_1"
+    if dialect == 'postgresql':
+        return f"{table_name}_pkey"
+    return "PRIMARY"
+
+
+def analytics_queries(db: Session):
+    """The statements the analytics endpoints and refreshes run, and the indexes each must use
+
+    Parameters are drawn from the data: the latest ship date, the 90 days of
+    claims before it and a page of one warehouse's inventory.
+    """
+    import crud
+    import forecasting
+    import rollups
+    import utils
+
+    inventory = models.Inventory
+    as_of = forecasting.history_end(db) or date.today()
+    keys = [tuple(key) for key in db.execute(
+        select(inventory.warehouse_id, inventory.product_id).order_by(inventory.warehouse_id, inventory.product_id)
+        .limit(50)
+    )] or [('W001', 'P00001')]
+    inventory_key = _primary_key_index(db.get_bind().dialect.name, 'inventory')
+    return {
+        'carrier_performance': (
+            utils.carrier_performance_query(),
+            ('ix_delivery_logs_carrier', 'ix_claims_delivery_id'),
+        ),
+        'carrier_daily_refresh': (
+            rollups.carrier_daily_query([as_of, as_of - timedelta(days=1)]),
+            ('ix_shipments_ship_date', 'ix_delivery_logs_shipment_id', 'ix_claims_delivery_id'),
+        ),
+        'vendor_performance': (
+            crud.vendor_performance_query(),
+            ('ix_shipments_product_id', 'ix_delivery_logs_shipment_id', 'ix_claims_delivery_id'),
+        ),
+        'claims_aging': (
+            crud.claims_aging_query(db, date.today(), since=as_of - timedelta(days=90)),
+            ('ix_claims_aging',),
+        ),
+        'inventory_health': (
+            crud.inventory_health_query(db, warehouse_id=keys[0][0], after=keys[0], limit=100),
+            (inventory_key,),
+        ),
+        'forecast_consumption': (
+            forecasting.consumption_query(as_of),
+            ('ix_shipments_ship_date',),
+        ),
+        'forecast_consumption_stale': (
+            forecasting.consumption_query(as_of, keys),
+            ('ix_shipments_ship_date', inventory_key),
+        ),
+    }
+
+
+def explain(conn, query):
+    """The database's plan for a query, as text"""
+    compiled = query.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    prefix = "EXPLAIN QUERY PLAN" if conn.dialect.name == 'sqlite' else "EXPLAIN"
+    rows = conn.execute(text(f"{prefix} {compiled}"))
+    return "\n".join(" ".join(str(value) for value in row) for row in rows)
+
+
+def check_index_usage(engine: Engine):
+    """Return {query name: (expected indexes, all used?, plan)} for the analytics queries
+
+    The planner may prefer a full scan on a tiny table, so run this against a
+    realistically sized database (e.g. one loaded from benchmarks/datagen.py).
+    """
+    report = {}
+    with engine.connect() as conn, Session(bind=conn) as db:
+        for name, (query, index_names) in analytics_queries(db).items():
+            plan = explain(conn, query)
+            report[name] = (index_names, all(index_name in plan for index_name in index_names), plan)
+    return report
+
+
+if __name__ == "__main__":
+    from database import engine
+
+    parser = argparse.ArgumentParser(description="Apply schema migrations")
+    parser.add_argument('--explain', action='store_true',
+                        help="Report whether the analytics queries use their indexes")
+    args = parser.parse_args()
+
+    print(f"Applied: {upgrade(engine) or 'nothing pending'}")
+    if args.explain:
+        report = check_index_usage(engine)
+        for name, (index_names, used, plan) in report.items():
+            print(f"{'OK     ' if used else 'MISSING'} {name}: {', '.join(index_names)}")
+            if not used:
+                print("    " + plan.replace("\n", "\n    "))
+        sys.exit(0 if all(used for _, used, _ in report.values()) else 1)
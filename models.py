@@ -1,5 +1,5 @@
 # app/models.py
-from sqlalchemy import Column, String, Date, Integer, Float, Boolean, ForeignKey
+from sqlalchemy import Column, String, Date, DateTime, Integer, BigInteger, Float, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -17,11 +17,17 @@ class Shipment(Base):
     
     deliveries = relationship("DeliveryLog", back_populates="shipment")
 
+    __table_args__ = (
+        Index("ix_shipments_product_id", "product_id"),
+        # Covers the forecast's windowed consumption scan
+        Index("ix_shipments_ship_date", "ship_date", "origin_warehouse", "product_id", "quantity"),
+    )
+
 class DeliveryLog(Base):
     __tablename__ = "delivery_logs"
     
     delivery_id = Column(String(50), primary_key=True, index=True)
-    shipment_id = Column(String(50), ForeignKey("shipments.shipment_id"))
+    shipment_id = Column(String(20), ForeignKey("shipments.shipment_id"))
     carrier = Column(String(100))
     status = Column(String(50))
     delivery_duration_days = Column(Integer)
@@ -31,11 +37,17 @@ class DeliveryLog(Base):
     shipment = relationship("Shipment", back_populates="deliveries")
     claims = relationship("Claim", back_populates="delivery")
 
+    __table_args__ = (
+        Index("ix_delivery_logs_shipment_id", "shipment_id"),
+        # Covers the per-carrier aggregates without touching the table rows
+        Index("ix_delivery_logs_carrier", "carrier", "delivery_id", "delivery_duration_days", "damage_flag"),
+    )
+
 class Claim(Base):
     __tablename__ = "claims"
     
     claim_id = Column(String(20), primary_key=True, index=True)
-    delivery_id = Column(String(20), ForeignKey("delivery_logs.delivery_id"))
+    delivery_id = Column(String(50), ForeignKey("delivery_logs.delivery_id"))
     reason = Column(String)
     amount_claimed = Column(Float)
     claim_status = Column(String(50), default="PENDING")
@@ -44,6 +56,14 @@ class Claim(Base):
     
     delivery = relationship("DeliveryLog", back_populates="claims")
 
+    __table_args__ = (
+        # Covers the delivery_logs -> claims join and the claim count/amount aggregates
+        Index("ix_claims_delivery_id", "delivery_id", "claim_id", "amount_claimed"),
+        # Covers the claims aging aggregate, led by the claim_date range filter
+        Index("ix_claims_aging", "claim_date", "resolved_date", "claim_status", "reason",
+              "delivery_id", "amount_claimed"),
+    )
+
 class Vendor(Base):
     __tablename__ = "vendors"
     
@@ -55,6 +75,10 @@ class Vendor(Base):
     vendor_rating = Column(Float)
     country = Column(String(100))
 
+    __table_args__ = (
+        Index("ix_vendors_product_id", "product_id"),
+    )
+
 class Inventory(Base):
     __tablename__ = "inventory"
     
@@ -63,4 +87,82 @@ class Inventory(Base):
     stock_level = Column(Integer)
     reorder_threshold = Column(Integer)
     last_restock_date = Column(Date, nullable=True)
-    next_restock_due = Column(Date, nullable=True)
\ No newline at end of file
+    next_restock_due = Column(Date, nullable=True)
+
+    __table_args__ = (
+        # The primary key serves warehouse lookups; this serves product lookups across warehouses
+        Index("ix_inventory_product_warehouse", "product_id", "warehouse_id"),
+        Index("ix_inventory_next_restock_due", "next_restock_due"),
+    )
+
+class CarrierClaimsRollup(Base):
+    """Per-carrier claim totals, maintained incrementally as rows are inserted"""
+    __tablename__ = "carrier_claims_rollup"
+
+    carrier = Column(String(100), primary_key=True)
+    total_shipments = Column(Integer, default=0)
+    total_claims = Column(Integer, default=0)
+    claim_amount_sum = Column(Float, default=0.0)
+    claim_amount_count = Column(Integer, default=0)
+
+class CarrierDailyPerformance(Base):
+    """Per-carrier delivery and claim totals for each shipment date, refreshed incrementally"""
+    __tablename__ = "carrier_daily_performance"
+
+    carrier = Column(String(100), primary_key=True)
+    day = Column(Date, primary_key=True)
+    total_deliveries = Column(Integer, default=0)
+    duration_sum = Column(Integer, default=0)
+    duration_count = Column(Integer, default=0)
+    damaged_shipments = Column(Integer, default=0)
+    total_claims = Column(Integer, default=0)
+    claim_amount = Column(Float, default=0.0)
+
+    __table_args__ = (
+        Index("ix_carrier_daily_performance_day", "day"),
+    )
+
+class CarrierDailyStaleDay(Base):
+    """Shipment dates with deliveries or claims written since carrier_daily_performance last covered them"""
+    __tablename__ = "carrier_daily_stale_days"
+
+    day = Column(Date, primary_key=True)
+
+class InventoryForecast(Base):
+    """Projected consumption, stock-out date and reorder plan per inventory row"""
+    __tablename__ = "inventory_forecast"
+
+    warehouse_id = Column(String(15), primary_key=True)
+    product_id = Column(String(15), primary_key=True)
+    stock_level = Column(Integer)
+    reorder_threshold = Column(Integer)
+    daily_consumption = Column(Float, default=0.0)
+    days_until_stockout = Column(Integer, nullable=True)
+    stockout_date = Column(Date, nullable=True)
+    reorder_date = Column(Date, nullable=True)
+    recommended_order_quantity = Column(Integer, default=0)
+    stockout_before_restock = Column(Boolean, default=False)
+    history_end = Column(Date)
+    stale = Column(Boolean, default=False)
+    computed_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_inventory_forecast_stockout_date", "stockout_date"),
+    )
+
+class LoadFingerprint(Base):
+    """Content hash of the last source file loaded into each table"""
+    __tablename__ = "load_fingerprints"
+
+    table_name = Column(String(50), primary_key=True)
+    file_hash = Column(String(64))
+    row_count = Column(Integer)
+    loaded_at = Column(DateTime)
+
+class RowFingerprint(Base):
+    """Content hash of each loaded row, keyed by table and primary key"""
+    __tablename__ = "row_fingerprints"
+
+    table_name = Column(String(50), primary_key=True)
+    row_key = Column(String(100), primary_key=True)
+    row_hash = Column(BigInteger)
\ No newline at end of file
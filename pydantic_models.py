@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List
-from datetime import date
+from typing import Any, Dict, Optional, List
+from datetime import date, datetime
 
 # Base Schemas
 class ShipmentBase(BaseModel):
@@ -45,21 +45,30 @@ class InventoryBase(BaseModel):
 
 # Response Schemas
 class ShipmentCreate(ShipmentBase):
-    pass
+    shipment_id: Optional[str] = Field(None, max_length=20)
 
 class ShipmentResponse(ShipmentBase):
     shipment_id: str
     model_config = ConfigDict(from_attributes=True)
 
+class DeliveryLogCreate(DeliveryLogBase):
+    delivery_id: str
+
 class DeliveryLogResponse(DeliveryLogBase):
     delivery_id: str
     model_config = ConfigDict(from_attributes=True)
 
+class ClaimCreate(ClaimBase):
+    claim_id: str
+
 class ClaimResponse(ClaimBase):
     claim_id: str
     resolved_date: Optional[date] = None
     model_config = ConfigDict(from_attributes=True)
 
+class VendorCreate(VendorBase):
+    vendor_id: str = Field(..., max_length=20)
+
 class VendorResponse(VendorBase):
     vendor_id: str
     model_config = ConfigDict(from_attributes=True)
@@ -76,6 +85,19 @@ class InventoryHealth(BaseModel):
     stock_status: str
     days_until_restock: Optional[int] = None
 
+class InventoryForecast(BaseModel):
+    warehouse_id: str
+    product_id: str
+    stock_level: int
+    reorder_threshold: int
+    daily_consumption: float
+    days_until_stockout: Optional[int] = None
+    stockout_date: Optional[date] = None
+    reorder_date: Optional[date] = None
+    recommended_order_quantity: int
+    stockout_before_restock: bool
+    history_end: Optional[date] = None
+
 class ClaimsSummary(BaseModel):
     carrier: str
     total_claims: int
@@ -83,7 +105,98 @@ class ClaimsSummary(BaseModel):
     claim_percentage: float
     avg_claim_amount: float
 
+class ClaimsAgingGroup(BaseModel):
+    name: str
+    open_claims: int
+    open_amount: float
+    aging: Dict[str, int]
+    resolved_claims: int
+    avg_resolution_days: Optional[float] = None
+    p50_resolution_days: Optional[int] = None
+    p90_resolution_days: Optional[int] = None
+    p95_resolution_days: Optional[int] = None
+
+class ClaimsAging(BaseModel):
+    as_of: date
+    since: Optional[date] = None
+    by_carrier: List[ClaimsAgingGroup]
+    by_reason: List[ClaimsAgingGroup]
+
+class VendorPerformance(BaseModel):
+    vendor_id: str
+    vendor_name: Optional[str] = None
+    product_id: Optional[str] = None
+    vendor_rating: Optional[float] = None
+    total_shipments: int
+    total_deliveries: int
+    on_time_percentage: float
+    damage_percentage: float
+    total_claims: int
+    claim_cost: float
+    avg_claim_amount: float
+
+class CarrierPerformance(BaseModel):
+    carrier: str
+    period_start: date
+    total_deliveries: int
+    avg_delivery_time: float
+    damaged_shipments: int
+    total_claims: int
+    claim_amount: float
+    claim_percentage: float
+
+class BulkShipmentResult(BaseModel):
+    index: int
+    success: bool
+    shipment_id: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkShipmentResponse(BaseModel):
+    received: int
+    inserted: int
+    failed: int
+    results: List[BulkShipmentResult]
+
+class UploadBatchResult(BaseModel):
+    batch: int
+    rows_received: int
+    rows_inserted: int
+    rows_rejected: int
+
 class FileUploadResponse(BaseModel):
     filename: str
     records_processed: int
-    message: str
\ No newline at end of file
+    message: str
+    records_inserted: int = 0
+    records_rejected: int = 0
+    batches: List[UploadBatchResult] = []
+    errors: List[str] = []
+    rule_failures: Dict[str, int] = {}
+    elapsed_seconds: float = 0.0
+    rows_per_second: float = 0.0
+
+class JobStatus(BaseModel):
+    job_id: str
+    kind: str
+    description: str
+    status: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    rows_processed: int = 0
+    rows_total: Optional[int] = None
+    rows_per_second: float = 0.0
+    elapsed_seconds: float = 0.0
+    eta_seconds: Optional[float] = None
+    errors: List[str] = []
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+class LoadJobRequest(BaseModel):
+    incremental: bool = True
+    validate_rows: bool = Field(True, description="Quarantine rows failing the quality rules")
+    # A bare name: the API never takes filesystem paths
+    snapshot: Optional[str] = Field(
+        None, max_length=100, pattern=r'^[A-Za-z0-9][A-Za-z0-9_.-]*$',
+        description="Load this Parquet snapshot (a directory under SNAPSHOT_ROOT) instead of the CSVs"
+    )
\ No newline at end of file
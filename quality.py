@@ -0,0 +1,158 @@
+# quality.py
+"""Declarative data-quality rules, evaluated over whole chunks.
+
+A rule is a named function returning a boolean mask of the rows that fail it.
+Value rules are plain column operations; reference rules are hash-set
+membership lookups (Series.isin) against the keys of the parent table.
+Failing rows are split off with the names of the rules they broke, so the
+caller can quarantine them instead of letting one bad row fail a whole load.
+"""
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+QUARANTINE_DIR = os.getenv('QUARANTINE_DIR', 'quarantine')
+REASONS_COLUMN = 'quarantine_reasons'
+
+
+class Rule(NamedTuple):
+    name: str
+    columns: tuple
+    failing: Callable  # (df, keys) -> boolean mask of failing rows
+    references: str = None  # parent table whose keys the rule needs
+
+
+# --- Rule constructors ---
+def _numbers(series):
+    return pd.to_numeric(series, errors='coerce')
+
+
+def _dates(series):
+    return pd.to_datetime(series, errors='coerce')
+
+
+def _blank(series):
+    return series.isna() | (series.astype(str).str.strip() == '')
+
+
+def required(col):
+    return Rule(f'{col}_missing', (col,), lambda df, keys: _blank(df[col]))
+
+
+def not_negative(col):
+    return Rule(f'{col}_negative', (col,), lambda df, keys: _numbers(df[col]) < 0)
+
+
+def between(col, low, high):
+    def failing(df, keys):
+        values = _numbers(df[col])
+        return values.notna() & ((values < low) | (values > high))
+    return Rule(f'{col}_out_of_range', (col,), failing)
+
+
+def not_before(col, other):
+    """col must not be earlier than other; rows missing either date pass"""
+    return Rule(f'{col}_before_{other}', (col, other),
+                lambda df, keys: _dates(df[col]) < _dates(df[other]))
+
+
+def references(col, table):
+    """Non-blank values of col must be keys of table"""
+    def failing(df, keys):
+        # Object dtype takes pandas' hash-table isin path, far faster than Arrow-backed strings
+        return ~_blank(df[col]) & ~df[col].astype(object).isin(keys[table])
+    return Rule(f'{col}_unknown', (col,), failing, references=table)
+
+
+def unique_key(*cols):
+    """Repeated keys fail except for their last occurrence (the row an upsert would keep)"""
+    return Rule('duplicate_key', cols, lambda df, keys: df.duplicated(subset=list(cols), keep='last'))
+
+
+# --- Rules per table ---
+RULES: Dict[str, List[Rule]] = {
+    'shipments': [
+        required('shipment_id'),
+        unique_key('shipment_id'),
+        not_negative('quantity'),
+        not_negative('freight_cost'),
+        not_before('delivery_date', 'ship_date'),
+    ],
+    'vendors': [
+        required('vendor_id'),
+        unique_key('vendor_id'),
+        between('vendor_rating', 0, 5),
+        not_before('contract_end', 'contract_start'),
+    ],
+    'inventory': [
+        required('warehouse_id'),
+        required('product_id'),
+        unique_key('warehouse_id', 'product_id'),
+        not_negative('stock_level'),
+        not_negative('reorder_threshold'),
+    ],
+    'delivery_logs': [
+        required('delivery_id'),
+        unique_key('delivery_id'),
+        references('shipment_id', 'shipments'),
+        not_negative('delivery_duration_days'),
+    ],
+    'claims': [
+        required('claim_id'),
+        unique_key('claim_id'),
+        references('delivery_id', 'delivery_logs'),
+        not_negative('amount_claimed'),
+        not_before('resolved_date', 'claim_date'),
+    ],
+}
+
+
+def reference_columns(table):
+    """{parent table: referencing column} for the parent keys validate(table, ...) needs"""
+    return {rule.references: rule.columns[0] for rule in RULES.get(table, []) if rule.references}
+
+
+def validate(table, df, keys=None):
+    """Split df into (passing rows, failing rows with reasons, {rule: failure count})
+
+    keys maps each referenced table to a collection of its key values.
+    """
+    keys = keys or {}
+    masks = {}
+    for rule in RULES.get(table, []):
+        if not all(col in df.columns for col in rule.columns):
+            continue
+        masks[rule.name] = np.asarray(rule.failing(df, keys), dtype=bool)
+
+    counts = {name: int(mask.sum()) for name, mask in masks.items()}
+    if not masks:
+        return df, df.iloc[0:0].assign(**{REASONS_COLUMN: []}), counts
+    failing = np.logical_or.reduce(list(masks.values()))
+    if not failing.any():
+        return df, df.iloc[0:0].assign(**{REASONS_COLUMN: []}), counts
+
+    reasons = np.full(int(failing.sum()), '', dtype=object)
+    for name, mask in masks.items():
+        hit = mask[failing]
+        reasons[hit] = reasons[hit] + (name + ';')
+    quarantined = df[failing].assign(**{REASONS_COLUMN: [reason.rstrip(';') for reason in reasons]})
+    return df[~failing], quarantined, counts
+
+
+def write_quarantine(table, quarantined, directory=None):
+    """Append failing rows to <directory>/<table>.csv; returns the path, or None if nothing failed"""
+    if quarantined.empty:
+        return None
+    path = Path(directory or QUARANTINE_DIR) / f'{table}.csv'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rows = quarantined.assign(quarantined_at=datetime.now().isoformat(timespec='seconds'))
+    exists = path.exists()
+    if exists:
+        # Loads and uploads produce the columns in different orders; follow the file's header
+        rows = rows.reindex(columns=pd.read_csv(path, nrows=0).columns)
+    rows.to_csv(path, mode='a', header=not exists, index=False)
+    return path
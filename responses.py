@@ -0,0 +1,114 @@
+# responses.py
+"""Fast path for large JSON list responses.
+
+Routes returning thousands of rows build plain dicts straight from the query
+rows and hand them to encode(), which serializes them once with orjson (the
+stdlib json module is the fallback). The resulting Payload carries a
+content-hash ETag and remembers its compressed forms, so a cached payload is
+never serialized or compressed twice. json_response() answers
+If-None-Match with 304 and picks br or gzip from Accept-Encoding.
+
+The route keeps its response_model for the OpenAPI schema; returning a
+Response directly makes FastAPI skip re-validating and re-encoding the rows.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+from fastapi import Request, Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - in requirements.txt; without it only gzip is offered
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+COMPRESS_MIN_BYTES = int(os.getenv('RESPONSE_COMPRESS_MIN_BYTES', '1024'))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def dumps(rows):
+    """Serialize to JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(rows, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(rows, separators=(',', ':'), default=str).encode()
+
+
+def _compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class Payload:
+    """An encoded JSON body, its ETag and its compressed variants (computed on first use)"""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self._compressed = {}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding):
+        if encoding is None:
+            return self.body
+        with self._lock:
+            if encoding not in self._compressed:
+                self._compressed[encoding] = _compress(self.body, encoding)
+            return self._compressed[encoding]
+
+
+def encode(rows) -> Payload:
+    return Payload(dumps(rows))
+
+
+def accepted_encoding(request: Request, size: int):
+    """The best compression the client accepts for a body of this size, or None"""
+    if size < COMPRESS_MIN_BYTES:
+        return None
+    accepted = set()
+    for item in request.headers.get('accept-encoding', '').split(','):
+        name, _, params = item.partition(';')
+        _, _, quality = params.partition('q=')
+        try:
+            if float(quality or 1) > 0:
+                accepted.add(name.strip().lower())
+        except ValueError:
+            continue
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def etag_matches(request: Request, etag: str):
+    if_none_match = request.headers.get('if-none-match')
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    return '*' in candidates or etag in candidates
+
+
+def json_response(request: Request, payload: Payload, headers=None, max_age: int = 0):
+    """A 304 when the client already has this payload, else the (compressed) JSON body"""
+    headers = {
+        'ETag': payload.etag,
+        'Cache-Control': f'private, max-age={max_age}',
+        'Vary': 'Accept-Encoding',
+        **(headers or {}),
+    }
+    if etag_matches(request, payload.etag):
+        return Response(status_code=304, headers=headers)
+    encoding = accepted_encoding(request, len(payload.body))
+    if encoding is not None:
+        headers['Content-Encoding'] = encoding
+    return Response(payload.encoded(encoding), media_type='application/json', headers=headers)
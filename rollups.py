@@ -0,0 +1,264 @@
+# rollups.py
+from collections import Counter, defaultdict
+from datetime import date
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import case, delete, event, func, insert, select, update
+from sqlalchemy.orm import Session
+
+import cache
+import models
+import utils
+
+UNKNOWN_CARRIER = "UNKNOWN"
+
+
+def _invalidate_on_commit(db: Session, *caches):
+    """Drop the given cached summaries once the current transaction is committed"""
+    def invalidate(session):
+        for summary_cache in caches:
+            summary_cache.invalidate()
+    event.listen(db, "after_commit", invalidate, once=True)
+
+
+# Rollup column -> delta key
+_ROLLUP_COLUMNS = {
+    'total_shipments': 'shipments',
+    'total_claims': 'claims',
+    'claim_amount_sum': 'amount_sum',
+    'claim_amount_count': 'amount_count',
+}
+
+
+def _apply_deltas(db: Session, deltas):
+    """Add per-carrier deltas to the rollup with one executemany upsert
+
+    A carrier's first row and later increments go through the same statement,
+    so concurrent writers never race to insert the same carrier. Carriers left
+    with no shipments and no claims are dropped, as rebuild_claims_rollup()
+    would never produce them.
+    """
+    if not deltas:
+        return
+    table = models.CarrierClaimsRollup.__table__
+    dialect = db.get_bind(clause=table.insert()).dialect.name
+    stmt = utils.dialect_insert(dialect)(table)
+    if dialect == 'mysql':
+        stmt = stmt.on_duplicate_key_update({col: table.c[col] + stmt.inserted[col] for col in _ROLLUP_COLUMNS})
+    else:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['carrier'],
+            set_={col: table.c[col] + stmt.excluded[col] for col in _ROLLUP_COLUMNS}
+        )
+    db.execute(stmt, [
+        dict(carrier=carrier, **{col: values[key] for col, key in _ROLLUP_COLUMNS.items()})
+        for carrier, values in deltas.items()
+    ])
+    for carriers in utils.chunked(deltas):
+        db.execute(delete(table).where(
+            table.c.carrier.in_(carriers), table.c.total_shipments == 0, table.c.total_claims == 0
+        ))
+    # The vendor scorecard counts the same deliveries and claims
+    _invalidate_on_commit(db, cache.claims_summary_cache, cache.vendor_performance_cache)
+
+
+def _empty_delta():
+    return {'shipments': 0, 'claims': 0, 'amount_sum': 0.0, 'amount_count': 0}
+
+
+def mark_days_stale(db: Session, days: Iterable[Optional[date]]):
+    """Queue shipment dates for the next refresh_carrier_daily()"""
+    days = sorted({day for day in days if day is not None})
+    if not days:
+        return
+    table = models.CarrierDailyStaleDay.__table__
+    dialect = db.get_bind(clause=table.insert()).dialect.name
+    stmt = utils.dialect_insert(dialect)(table)
+    if dialect == 'mysql':
+        stmt = stmt.on_duplicate_key_update(day=stmt.inserted.day)
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=['day'])
+    db.execute(stmt, [{'day': day} for day in days])
+
+
+def _mark_shipments_stale(db: Session, shipment_ids):
+    shipment_ids = {shipment_id for shipment_id in shipment_ids if shipment_id is not None}
+    if shipment_ids:
+        mark_days_stale(db, db.scalars(
+            select(models.Shipment.ship_date).distinct().where(models.Shipment.shipment_id.in_(shipment_ids))
+        ))
+
+
+def record_delivery_logs(db: Session, logs: Iterable[Tuple[str, str]]):
+    """Count newly inserted delivery logs, given as (carrier, shipment_id) pairs, in the rollups"""
+    logs = list(logs)
+    deltas = defaultdict(_empty_delta)
+    for carrier, count in Counter(carrier or UNKNOWN_CARRIER for carrier, _ in logs).items():
+        deltas[carrier]['shipments'] += count
+    _apply_deltas(db, deltas)
+    _mark_shipments_stale(db, (shipment_id for _, shipment_id in logs))
+
+
+def update_delivery_logs(db: Session, old: Iterable[Tuple[str, str, str]], new: Iterable[Tuple[str, str, str]]):
+    """Move updated delivery logs, given as (delivery_id, carrier, shipment_id) before and after, in the rollups
+
+    A delivery that changes carrier takes its existing claims along.
+    """
+    old, new = list(old), list(new)
+    deltas = defaultdict(_empty_delta)
+    for logs, sign in ((old, -1), (new, 1)):
+        for _, carrier, _ in logs:
+            deltas[carrier or UNKNOWN_CARRIER]['shipments'] += sign
+
+    carriers = {delivery_id: carrier or UNKNOWN_CARRIER for delivery_id, carrier, _ in new}
+    moved = {
+        delivery_id: (carrier or UNKNOWN_CARRIER, carriers[delivery_id])
+        for delivery_id, carrier, _ in old
+        if delivery_id in carriers and (carrier or UNKNOWN_CARRIER) != carriers[delivery_id]
+    }
+    if moved:
+        claim = models.Claim
+        for delivery_id, claims, amount_sum, amount_count in db.execute(
+            select(claim.delivery_id, func.count(claim.claim_id), func.sum(claim.amount_claimed),
+                   func.count(claim.amount_claimed))
+            .where(claim.delivery_id.in_(list(moved))).group_by(claim.delivery_id)
+        ):
+            for carrier, sign in zip(moved[delivery_id], (-1, 1)):
+                deltas[carrier]['claims'] += sign * claims
+                deltas[carrier]['amount_sum'] += sign * (amount_sum or 0.0)
+                deltas[carrier]['amount_count'] += sign * amount_count
+    _apply_deltas(db, deltas)
+    _mark_shipments_stale(db, (shipment_id for _, _, shipment_id in old + new))
+
+
+def record_claims(db: Session, claims: Iterable[Tuple[str, float]], removed: Iterable[Tuple[str, float]] = ()):
+    """Count newly inserted claims, given as (delivery_id, amount_claimed) pairs, in the rollups
+
+    removed holds the previous versions of claims that were updated, which are taken out.
+    """
+    claims, removed = list(claims), list(removed)
+    if not claims and not removed:
+        return
+    delivery_ids = {delivery_id for delivery_id, _ in claims + removed}
+    deliveries = {
+        delivery_id: (carrier, ship_date)
+        for delivery_id, carrier, ship_date in db.execute(
+            select(models.DeliveryLog.delivery_id, models.DeliveryLog.carrier, models.Shipment.ship_date)
+            .outerjoin(models.Shipment, models.Shipment.shipment_id == models.DeliveryLog.shipment_id)
+            .where(models.DeliveryLog.delivery_id.in_(delivery_ids))
+        )
+    }
+
+    deltas = defaultdict(_empty_delta)
+    for rows, sign in ((claims, 1), (removed, -1)):
+        for delivery_id, amount in rows:
+            carrier, _ = deliveries.get(delivery_id, (None, None))
+            delta = deltas[carrier or UNKNOWN_CARRIER]
+            delta['claims'] += sign
+            if amount is not None:
+                delta['amount_sum'] += sign * amount
+                delta['amount_count'] += sign
+    _apply_deltas(db, deltas)
+    mark_days_stale(db, (ship_date for _, ship_date in deliveries.values()))
+
+
+def rebuild_claims_rollup(db: Session):
+    """Recompute the whole per-carrier rollup from delivery_logs and claims"""
+    carrier = func.coalesce(models.DeliveryLog.carrier, UNKNOWN_CARRIER)
+    deltas = defaultdict(_empty_delta)
+    for name, shipments in db.execute(
+        select(carrier, func.count(models.DeliveryLog.delivery_id)).group_by(carrier)
+    ):
+        deltas[name]['shipments'] = shipments
+
+    for name, claims, amount_sum, amount_count in db.execute(
+        select(
+            carrier,
+            func.count(models.Claim.claim_id),
+            func.sum(models.Claim.amount_claimed),
+            func.count(models.Claim.amount_claimed)
+        ).select_from(models.Claim)
+        .outerjoin(models.DeliveryLog, models.DeliveryLog.delivery_id == models.Claim.delivery_id)
+        .group_by(carrier)
+    ):
+        deltas[name].update(claims=claims, amount_sum=amount_sum or 0.0, amount_count=amount_count)
+
+    db.execute(delete(models.CarrierClaimsRollup))
+    _apply_deltas(db, deltas)
+
+
+def mark_forecasts_stale(db: Session, keys: Iterable[Tuple[str, str]]):
+    """Flag the forecasts of (warehouse_id, product_id) pairs that just shipped for recomputation"""
+    keys = {key for key in keys if None not in key}
+    if not keys:
+        return
+    forecast = models.InventoryForecast
+    for chunk in utils.chunked(sorted(keys)):
+        db.execute(
+            update(forecast)
+            .where(utils.pairs_in(forecast.warehouse_id, forecast.product_id, chunk))
+            .values(stale=True)
+        )
+
+
+def carrier_daily_query(days=None):
+    """Per-carrier daily rows for the given shipment dates (or all of them), straight from the base tables"""
+    delivery, shipment = models.DeliveryLog, models.Shipment
+    claims = utils.claims_per_delivery()
+    carrier = func.coalesce(delivery.carrier, UNKNOWN_CARRIER)
+    query = select(
+        carrier.label('carrier'),
+        shipment.ship_date.label('day'),
+        func.count(delivery.delivery_id).label('total_deliveries'),
+        func.coalesce(func.sum(delivery.delivery_duration_days), 0).label('duration_sum'),
+        func.count(delivery.delivery_duration_days).label('duration_count'),
+        func.sum(case((delivery.damage_flag, 1), else_=0)).label('damaged_shipments'),
+        func.coalesce(func.sum(claims.c.claims), 0).label('total_claims'),
+        func.coalesce(func.sum(claims.c.amount), 0.0).label('claim_amount')
+    ).select_from(delivery).join(
+        shipment, shipment.shipment_id == delivery.shipment_id
+    ).outerjoin(
+        claims, claims.c.delivery_id == delivery.delivery_id
+    ).where(shipment.ship_date.isnot(None)).group_by(carrier, shipment.ship_date)
+    if days is not None:
+        query = query.where(shipment.ship_date.in_(days))
+    return query
+
+
+def record_shipments(db: Session, keys: Iterable[Tuple[str, str]]):
+    """Account for new or changed shipments, given as (warehouse_id, product_id) pairs
+
+    Their forecasts are marked stale and the vendor scorecard, which counts
+    shipments per product, is dropped on commit.
+    """
+    mark_forecasts_stale(db, keys)
+    _invalidate_on_commit(db, cache.vendor_performance_cache)
+
+
+def refresh_carrier_daily(db: Session, full: bool = False):
+    """Recompute the per-carrier daily rows of the stale shipment dates (or all of history)
+
+    Writes mark dates stale through record_delivery_logs, record_claims and
+    mark_days_stale, however old the shipment. An empty rollup is rebuilt in
+    full. Returns the number of days recomputed.
+    """
+    daily, stale_day = models.CarrierDailyPerformance, models.CarrierDailyStaleDay
+    days = None
+    if not full and db.scalar(select(daily.day).limit(1)) is not None:
+        days = list(db.scalars(select(stale_day.day)))
+        if not days:
+            return 0
+    # Cleared before the recompute: a date marked by a write committing meanwhile stays queued
+    clear = delete(stale_day)
+    if days is not None:
+        clear = clear.where(stale_day.day.in_(days))
+    db.execute(clear)
+
+    stale = delete(daily)
+    if days is not None:
+        stale = stale.where(daily.day.in_(days))
+    rows = [dict(row._mapping) for row in db.execute(carrier_daily_query(days))]
+    db.execute(stale)
+    if rows:
+        db.execute(insert(daily), rows)
+    return len(days) if days is not None else len({row['day'] for row in rows})
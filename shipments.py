@@ -1,12 +1,93 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from database import get_db
+from typing import List
+import json
+from database import get_session, run_db
 import crud
 import pydantic_models
+import utils
 
 router = APIRouter(prefix="/shipments", tags=["shipments"])
 
+BULK_BATCH_SIZE = 1000
+
 @router.post("/", response_model=pydantic_models.ShipmentResponse)
-async def log_shipment(shipment: pydantic_models.ShipmentCreate, db: Session = Depends(get_db)):
+async def log_shipment(shipment: pydantic_models.ShipmentCreate, db: Session = Depends(get_session)):
     """Add a new shipment record"""
-    return crud.create_shipment(db, shipment)
\ No newline at end of file
+    return await run_db(db, crud.create_shipment, shipment)
+
+@router.get("/", response_model=List[pydantic_models.ShipmentResponse])
+async def read_shipments(
+    ids: str = Query(..., description="Comma-separated shipment ids to fetch in one call"),
+    db: Session = Depends(get_session)
+):
+    """Get the listed shipments"""
+    try:
+        keys = utils.split_ids(ids)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return await run_db(db, crud.get_entities_in_order, 'shipments', keys)
+
+def _parse_line(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f"invalid JSON: {e}")
+
+async def iter_bulk_records(request: Request):
+    """Yield (index, record) pairs from an NDJSON stream or a JSON array body"""
+    if "ndjson" in request.headers.get("content-type", ""):
+        index = 0
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield index, _parse_line(line)
+                    index += 1
+        if buffer.strip():
+            yield index, _parse_line(buffer)
+        return
+
+    try:
+        records = json.loads(await request.body())
+    except ValueError as e:
+        raise HTTPException(400, f"Invalid JSON body: {e}")
+    if not isinstance(records, list):
+        raise HTTPException(400, "Expected a JSON array of shipments")
+    for index, record in enumerate(records):
+        yield index, record
+
+@router.post("/bulk", response_model=pydantic_models.BulkShipmentResponse)
+async def log_shipments_bulk(
+    request: Request,
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1, le=4000),
+    db: Session = Depends(get_session)
+):
+    """Add many shipments from a JSON array or an NDJSON stream (application/x-ndjson)"""
+    results = []
+    batch = []
+    async for record in iter_bulk_records(request):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            results.extend(await run_db(db, crud.create_shipments_bulk, batch))
+            batch = []
+    if batch:
+        results.extend(await run_db(db, crud.create_shipments_bulk, batch))
+
+    inserted = sum(result.success for result in results)
+    return pydantic_models.BulkShipmentResponse(
+        received=len(results),
+        inserted=inserted,
+        failed=len(results) - inserted,
+        results=results
+    )
+
+@router.get("/{shipment_id}", response_model=pydantic_models.ShipmentResponse)
+async def read_shipment(shipment_id: str, db: Session = Depends(get_session)):
+    """Get a specific shipment by ID"""
+    shipment = await run_db(db, crud.get_shipment, shipment_id)
+    if shipment is None:
+        raise HTTPException(status_code=404, detail="Shipment not found")
+    return shipment
@@ -0,0 +1,134 @@
+# snapshot.py
+"""Typed, compressed Parquet snapshots of the five source tables.
+
+A snapshot is one <table>.parquet file per table plus a manifest.json, with
+column types taken from models.py. Reading one skips CSV parsing and cleaning
+altogether, and reads are memory-mapped and can be limited to the columns
+needed.
+
+Usage:
+    python snapshot.py export snapshot/           # database -> Parquet
+    python snapshot.py import snapshot/           # Parquet -> database (via load_data)
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, select
+
+import models
+
+TABLES = ['shipments', 'vendors', 'inventory', 'delivery_logs', 'claims']
+EXPORT_BATCH_ROWS = 100_000
+COMPRESSION = 'zstd'
+MANIFEST = 'manifest.json'
+
+
+def arrow_type(column):
+    sql_type = column.type
+    if isinstance(sql_type, Boolean):
+        return pa.bool_()
+    if isinstance(sql_type, Integer):
+        return pa.int64()
+    if isinstance(sql_type, Float):
+        return pa.float64()
+    if isinstance(sql_type, DateTime):
+        return pa.timestamp('us')
+    if isinstance(sql_type, Date):
+        return pa.date32()
+    return pa.string()
+
+
+def arrow_schema(name):
+    """The Arrow schema matching a table in models.py"""
+    table = models.Base.metadata.tables[name]
+    return pa.schema([pa.field(col.name, arrow_type(col), nullable=not col.primary_key) for col in table.columns])
+
+
+def snapshot_path(directory, name):
+    return Path(directory) / f'{name}.parquet'
+
+
+# --- Export ---
+def export_table(conn, name, directory, batch_rows=EXPORT_BATCH_ROWS):
+    """Stream one table into Parquet in primary-key order, one row group per batch"""
+    table = models.Base.metadata.tables[name]
+    schema = arrow_schema(name)
+    rows = 0
+    result = conn.execution_options(yield_per=batch_rows).execute(
+        select(table).order_by(*table.primary_key.columns)
+    )
+    with pq.ParquetWriter(snapshot_path(directory, name), schema, compression=COMPRESSION) as writer:
+        for batch in result.partitions():
+            columns = list(zip(*batch))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+            ))
+            rows += len(batch)
+        if rows == 0:
+            writer.write_table(schema.empty_table())
+    return rows
+
+
+def export_snapshot(engine, directory, tables=None, batch_rows=EXPORT_BATCH_ROWS):
+    """Write each table to <directory>/<table>.parquet and return per-table stats"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    stats = {}
+    with engine.connect() as conn:
+        for name in tables or TABLES:
+            started = time.perf_counter()
+            rows = export_table(conn, name, directory, batch_rows)
+            stats[name] = {
+                'rows': rows,
+                'bytes': snapshot_path(directory, name).stat().st_size,
+                'seconds': round(time.perf_counter() - started, 3),
+            }
+    (directory / MANIFEST).write_text(json.dumps({
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'compression': COMPRESSION,
+        'tables': stats,
+    }, indent=2))
+    return stats
+
+
+# --- Import ---
+def read_arrow(directory, name, columns=None):
+    """Memory-mapped read of one snapshot table, optionally only some columns"""
+    return pq.read_table(snapshot_path(directory, name), columns=columns, memory_map=True)
+
+
+def read_frame(directory, name, columns=None, dates_as_objects=True):
+    """One snapshot table as a DataFrame
+
+    Dates come back as datetime.date objects (what the loader writes), or as
+    datetime64 columns with dates_as_objects=False (what the pipeline computes with).
+    """
+    return read_arrow(directory, name, columns).to_pandas(date_as_object=dates_as_objects)
+
+
+def read_tables(directory, names=None, columns=None):
+    """{table: DataFrame} for the given (default: all) tables; columns maps table -> column list"""
+    columns = columns or {}
+    return {name: read_frame(directory, name, columns.get(name)) for name in (TABLES if names is None else names)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export or import a Parquet snapshot of the source tables")
+    parser.add_argument('command', choices=['export', 'import'])
+    parser.add_argument('directory')
+    parser.add_argument('--tables', nargs='+', choices=TABLES, help="Export only these tables")
+    parser.add_argument('--incremental', action='store_true', help="Import: upsert only new or changed rows")
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        from database import engine
+        for name, table_stats in export_snapshot(engine, args.directory, args.tables).items():
+            print(f"✓ {name}: {table_stats['rows']} rows, {table_stats['bytes']} bytes in {table_stats['seconds']}s")
+    else:
+        import load_data
+        load_data.load_data(snapshot_dir=args.directory, incremental=args.incremental)
@@ -0,0 +1,297 @@
+# supply_chain_metrics.py
+import argparse
+import math
+import shutil
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+CSV_FILES = {
+    'shipments': 'shipments.csv',
+    'delivery_logs': 'delivery_logs.csv',
+    'claims': 'claims.csv',
+    'vendors': 'vendors.csv',
+    'inventory': 'inventory (1).csv',
+}
+
+DATE_COLUMNS = ['ship_date', 'delivery_date', 'last_restock_date', 'next_restock_due',
+                'contract_start', 'contract_end', 'claim_date', 'resolved_date']
+
+# Low-cardinality text columns are read straight into categoricals. Join keys stay
+# plain strings so merges between tables don't have to reconcile categories.
+CATEGORY_COLUMNS = ['destination_city', 'carrier', 'status', 'proof_of_delivery_status',
+                    'reason', 'claim_status', 'vendor_name', 'country']
+
+CLAIM_AGING_BINS = [-1, 30, 60, 90, float('inf')]
+CLAIM_AGING_LABELS = ['0-30 days old', '31-60 days old', '61-90 days old', '90+ days old']
+RESTOCK_BINS = [-9999, -1, 0, 7, 30, 9999]
+RESTOCK_LABELS = [
+    'Overdue Restock',
+    'Restock Due Today',
+    'Restock Within 7 Days',
+    'Restock Within 30 Days',
+    'Restock Beyond 30 Days'
+]
+
+DAMAGE_FLAG_VALUES = {'true': True, '1': True, 'yes': True, 'y': True,
+                      'false': False, '0': False, 'no': False, 'n': False}
+
+
+def compact_dtypes(df):
+    """Downcast numeric columns to the smallest dtype that holds their values"""
+    for col in df.select_dtypes(include='integer').columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    for col in df.select_dtypes(include='float').columns:
+        df[col] = pd.to_numeric(df[col], downcast='float')
+    return df
+
+
+# Tables the in-memory pipeline joins; vendors is not needed
+PIPELINE_TABLES = ['shipments', 'delivery_logs', 'claims', 'inventory']
+
+
+def load_snapshot(snapshot_dir, tables=PIPELINE_TABLES):
+    """Read typed tables from a Parquet snapshot (see snapshot.py) instead of parsing CSVs"""
+    import snapshot
+    frames = {}
+    for name in tables:
+        df = snapshot.read_frame(snapshot_dir, name, dates_as_objects=False)
+        for col in CATEGORY_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        frames[name] = df
+    return frames
+
+
+def load_datasets(data_dir='.'):
+    """Read the five source CSVs with categorical text columns"""
+    frames = {}
+    for name, filename in CSV_FILES.items():
+        header = pd.read_csv(Path(data_dir) / filename, nrows=0).columns
+        frames[name] = pd.read_csv(
+            Path(data_dir) / filename,
+            dtype={col: 'category' for col in CATEGORY_COLUMNS if col in header}
+        )
+    return frames
+
+
+def clean_table(name, df):
+    """Parse dates, fill missing values and normalise categorical labels of one table"""
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+
+    if name == 'delivery_logs':
+        df['delivery_duration_days'] = df['delivery_duration_days'].fillna(0)
+        df['damage_flag'] = (
+            df['damage_flag'].astype(str).str.strip().str.lower()
+            .map(DAMAGE_FLAG_VALUES).fillna(False).astype(bool)
+        )
+        df['status'] = df['status'].astype('string').str.upper().str.strip()
+    elif name == 'claims':
+        df['claim_status'] = df['claim_status'].astype('string').fillna('Pending').str.upper().str.strip()
+
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return compact_dtypes(df)
+
+
+def clean_data(frames):
+    for name, df in frames.items():
+        frames[name] = clean_table(name, df)
+    return frames
+
+
+def merge_datasets(frames):
+    """Join shipments -> delivery logs -> claims"""
+    shipment_delivery = pd.merge(frames['shipments'], frames['delivery_logs'],
+                                 on='shipment_id', how='inner')
+    return pd.merge(shipment_delivery, frames['claims'], on='delivery_id', how='inner')
+
+
+def _claim_metrics(df, now):
+    df['expected_delivery_days'] = (df['delivery_date'] - df['ship_date']).dt.days
+    df['delay_duration'] = (df['delivery_duration_days'] - df['expected_delivery_days']).clip(lower=0)
+
+    df['claim_aging_days'] = (now - df['claim_date']).dt.days.fillna(0)
+    df['claim_open_duration'] = pd.cut(df['claim_aging_days'], bins=CLAIM_AGING_BINS,
+                                       labels=CLAIM_AGING_LABELS)
+    return df
+
+
+def _restock_metrics(merged, now):
+    merged['needs_reorder'] = merged['stock_level'] <= merged['reorder_threshold']
+    merged['days_until_restock'] = (merged['next_restock_due'] - now).dt.days
+    merged['restock_status'] = pd.cut(merged['days_until_restock'], bins=RESTOCK_BINS,
+                                      labels=RESTOCK_LABELS)
+    return compact_dtypes(merged)
+
+
+def calculate_metrics(df, inventory, now=None):
+    """Add delay, claim aging and restock metrics with column-wise operations"""
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    merged = pd.merge(
+        _claim_metrics(df, now), inventory,
+        left_on=['origin_warehouse', 'product_id'],
+        right_on=['warehouse_id', 'product_id'],
+        how='left'
+    )
+    return _restock_metrics(merged, now)
+
+
+# --- Out-of-core mode ---
+# In-memory frames are several times larger than their CSV text; used to size partitions.
+SAMPLE_ROWS = 1000
+
+
+def _bytes_per_row(path):
+    """Estimate (csv bytes, in-memory bytes) per row from a sample"""
+    sample = pd.read_csv(path, nrows=SAMPLE_ROWS)
+    with open(path, 'rb') as handle:
+        csv_bytes = sum(len(handle.readline()) for _ in range(len(sample) + 1))
+    rows = max(len(sample), 1)
+    return csv_bytes / rows, sample.memory_usage(deep=True).sum() / rows
+
+
+def plan_partitions(data_dir, memory_budget_mb):
+    """Pick (partitions, read chunk rows) so one partition of both large sides fits the budget"""
+    budget = memory_budget_mb * 1024 * 1024
+    estimated = 0
+    chunk_rows = None
+    for name in ('shipments', 'delivery_logs'):
+        path = Path(data_dir) / CSV_FILES[name]
+        csv_row, memory_row = _bytes_per_row(path)
+        estimated += path.stat().st_size / csv_row * memory_row
+        # A read chunk may use a quarter of the budget
+        rows = int(budget / 4 / memory_row)
+        chunk_rows = rows if chunk_rows is None else min(chunk_rows, rows)
+    # Joined rows roughly double the footprint of their inputs
+    partitions = max(1, math.ceil(estimated * 2 / budget))
+    return partitions, max(chunk_rows, 1)
+
+
+def _spill_partitions(path, key, partitions, chunk_rows, target_dir):
+    """Stream a CSV and write each chunk's rows to per-partition Parquet files by key hash"""
+    for number, chunk in enumerate(pd.read_csv(path, chunksize=chunk_rows, dtype=str)):
+        bucket = pd.util.hash_pandas_object(chunk[key], index=False).values % partitions
+        for part, rows in chunk.groupby(bucket):
+            part_dir = Path(target_dir) / f'part={part}'
+            part_dir.mkdir(parents=True, exist_ok=True)
+            rows.to_parquet(part_dir / f'chunk-{number}.parquet', index=False)
+
+
+def _read_partition(target_dir, part):
+    part_dir = Path(target_dir) / f'part={part}'
+    files = sorted(part_dir.glob('*.parquet'))
+    if not files:
+        return None
+    return pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)
+
+
+def _typed(name, df, data_dir):
+    """Re-apply the CSV type inference lost by spilling every column as text"""
+    header = pd.read_csv(Path(data_dir) / CSV_FILES[name], nrows=SAMPLE_ROWS).dtypes
+    for col, dtype in header.items():
+        if col in df.columns and col not in DATE_COLUMNS and dtype.kind in 'ifb':
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return clean_table(name, df)
+
+
+def iter_enriched_chunks(data_dir='.', memory_budget_mb=512, now=None, workdir=None):
+    """Join and enrich shipments partition by partition, yielding bounded-size frames
+
+    Shipments and delivery logs are hash-partitioned by shipment_id into spill
+    files; claims (by delivery_id) and inventory (by warehouse_id, product_id)
+    are the small sides and are held in memory as lookup indexes.
+    """
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    partitions, chunk_rows = plan_partitions(data_dir, memory_budget_mb)
+
+    claims = clean_table('claims', pd.read_csv(Path(data_dir) / CSV_FILES['claims']))
+    claims_index = claims.set_index('delivery_id')
+    inventory = clean_table('inventory', pd.read_csv(Path(data_dir) / CSV_FILES['inventory']))
+    inventory_index = inventory.assign(warehouse_id_match=inventory['warehouse_id']).set_index(
+        ['warehouse_id', 'product_id'])
+
+    with tempfile.TemporaryDirectory(dir=workdir) as spill_dir:
+        for name in ('shipments', 'delivery_logs'):
+            _spill_partitions(Path(data_dir) / CSV_FILES[name], 'shipment_id',
+                              partitions, chunk_rows, Path(spill_dir) / name)
+
+        for part in range(partitions):
+            shipments = _read_partition(Path(spill_dir) / 'shipments', part)
+            delivery_logs = _read_partition(Path(spill_dir) / 'delivery_logs', part)
+            if shipments is None or delivery_logs is None:
+                continue
+            joined = pd.merge(_typed('shipments', shipments, data_dir),
+                              _typed('delivery_logs', delivery_logs, data_dir),
+                              on='shipment_id', how='inner')
+            joined = joined.join(claims_index, on='delivery_id', how='inner')
+            if joined.empty:
+                continue
+
+            enriched = _claim_metrics(joined, now).join(
+                inventory_index, on=['origin_warehouse', 'product_id'], how='left'
+            ).rename(columns={'warehouse_id_match': 'warehouse_id'})
+            yield _restock_metrics(enriched.reset_index(drop=True), now)
+
+
+def write_output(df, output_path, output_format='parquet'):
+    """Write the enriched rows as Parquet partitioned by ship month, or as one CSV"""
+    if output_format == 'csv':
+        df.to_csv(output_path, index=False)
+        return
+    df = df.assign(ship_month=df['ship_date'].dt.strftime('%Y-%m').fillna('unknown'))
+    df.to_parquet(output_path, partition_cols=['ship_month'], index=False,
+                  existing_data_behavior='delete_matching')
+
+
+def _append_partitioned(df, output_path, number):
+    """Add one chunk's files to a ship_month-partitioned Parquet dataset"""
+    df = df.assign(ship_month=df['ship_date'].dt.strftime('%Y-%m').fillna('unknown'))
+    # Categories differ between chunks; plain strings keep the dataset schema uniform
+    for col in df.select_dtypes(include='category').columns:
+        df[col] = df[col].astype('string')
+    df.to_parquet(output_path, partition_cols=['ship_month'], index=False,
+                  basename_template=f'chunk-{number}-{{i}}.parquet',
+                  existing_data_behavior='overwrite_or_ignore')
+
+
+def run_out_of_core(data_dir='.', output_path='processed_shipment_data', memory_budget_mb=512, now=None):
+    """Stream the enriched rows to a partitioned Parquet dataset, returning the row count"""
+    shutil.rmtree(output_path, ignore_errors=True)
+    rows = 0
+    for number, chunk in enumerate(iter_enriched_chunks(data_dir, memory_budget_mb, now=now)):
+        _append_partitioned(chunk, output_path, number)
+        rows += len(chunk)
+    return rows
+
+
+def run_pipeline(data_dir='.', output_path='processed_shipment_data', output_format='parquet', now=None,
+                 out_of_core=False, memory_budget_mb=512, snapshot_dir=None):
+    """Load, clean, merge and enrich the supply-chain data, then write it out"""
+    if out_of_core:
+        return run_out_of_core(data_dir, output_path, memory_budget_mb, now=now)
+
+    frames = clean_data(load_snapshot(snapshot_dir) if snapshot_dir else load_datasets(data_dir))
+    print("Missing values in shipments:\n", frames['shipments'].isnull().sum())
+    final_data = calculate_metrics(merge_datasets(frames), frames['inventory'], now=now)
+    write_output(final_data, output_path, output_format)
+    return final_data
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compute supply-chain shipment metrics")
+    parser.add_argument('--data-dir', default='.')
+    parser.add_argument('--output', default='processed_shipment_data')
+    parser.add_argument('--format', choices=['parquet', 'csv'], default='parquet')
+    parser.add_argument('--out-of-core', action='store_true',
+                        help="Stream partitions instead of joining everything in memory (Parquet only)")
+    parser.add_argument('--memory-budget-mb', type=int, default=512)
+    parser.add_argument('--snapshot', help="Read a Parquet snapshot directory (snapshot.py) instead of the CSVs")
+    args = parser.parse_args()
+    run_pipeline(args.data_dir, args.output, args.format,
+                 out_of_core=args.out_of_core, memory_budget_mb=args.memory_budget_mb,
+                 snapshot_dir=args.snapshot)
@@ -0,0 +1,80 @@
+# tests/test_cache.py
+import asyncio
+
+import pytest
+
+import cache
+
+
+def test_concurrent_misses_compute_once():
+    summary_cache = cache.TTLCache(ttl=60)
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {'rows': len(calls)}
+
+    async def main():
+        return await asyncio.gather(*(summary_cache.get_or_set_async('summary', factory) for _ in range(20)))
+
+    assert asyncio.run(main()) == [{'rows': 1}] * 20
+    assert len(calls) == 1
+    assert summary_cache._fills == {}
+
+    summary_cache.invalidate()
+    assert asyncio.run(main()) == [{'rows': 2}] * 20
+
+
+def test_different_keys_compute_concurrently():
+    summary_cache = cache.TTLCache(ttl=60)
+    running = set()
+    overlapped = []
+
+    async def factory(key):
+        running.add(key)
+        await asyncio.sleep(0.01)
+        overlapped.append(len(running))
+        running.discard(key)
+        return key
+
+    async def main():
+        return await asyncio.gather(*(
+            summary_cache.get_or_set_async(key, lambda key=key: factory(key)) for key in ('a', 'b')
+        ))
+
+    assert asyncio.run(main()) == ['a', 'b']
+    assert max(overlapped) == 2
+
+
+def test_a_failed_fill_is_retried_by_the_next_waiter():
+    summary_cache = cache.TTLCache(ttl=60)
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        if len(calls) == 1:
+            raise RuntimeError("database unavailable")
+        return 'fresh'
+
+    async def main():
+        return await asyncio.gather(
+            *(summary_cache.get_or_set_async('summary', factory) for _ in range(5)), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert isinstance(results[0], RuntimeError)
+    assert results[1:] == ['fresh'] * 4
+    assert len(calls) == 2
+    assert summary_cache._fills == {}
+
+
+def test_get_or_set_async_hits_without_calling_factory():
+    summary_cache = cache.TTLCache(ttl=60)
+    summary_cache.set('summary', 'cached')
+
+    async def factory():
+        pytest.fail("factory called on a hit")
+
+    assert asyncio.run(summary_cache.get_or_set_async('summary', factory)) == 'cached'
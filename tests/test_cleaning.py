@@ -0,0 +1,104 @@
+# tests/test_cleaning.py
+from datetime import date
+
+import pandas as pd
+import pytest
+
+import cleaning
+
+
+def raw(**columns):
+    """A chunk the way read_and_clean reads it: every column as text"""
+    return pd.DataFrame(columns, dtype=object)
+
+
+def test_shipments_spec():
+    df = cleaning.clean_chunk('shipments', raw(
+        shipment_id=['S1', 'S2', 'S3', 'S4'],
+        ship_date=['2025-06-03', '06/04/2025', '2025-06-05T00:00:00', 'not a date'],
+        delivery_date=[None, 'NULL', '', '2025-13-01'],
+        quantity=['5', '', 'abc', '2.5'],
+        freight_cost=['10.25', None, 'n/a', '-3'],
+    ))
+    assert df['shipment_id'].tolist() == ['S1', 'S2', 'S3', 'S4']
+    assert df['ship_date'].tolist() == [date(2025, 6, 3), date(2025, 6, 4), date(2025, 6, 5), None]
+    assert df['delivery_date'].isna().all()
+    assert df['quantity'].tolist() == [5, 0, 0, 2.5]
+    assert df['freight_cost'].tolist() == [10.25, 0, 0, -3]
+
+
+def test_vendors_spec_keeps_bad_ratings_null():
+    df = cleaning.clean_chunk('vendors', raw(
+        contract_start=['01/31/2024', 'soon'],
+        contract_end=['2025-01-31', None],
+        vendor_rating=['4.5', 'great'],
+    ))
+    assert df['contract_start'].tolist() == [date(2024, 1, 31), None]
+    assert df['contract_end'].tolist() == [date(2025, 1, 31), None]
+    assert df['vendor_rating'].iloc[0] == 4.5
+    assert pd.isna(df['vendor_rating'].iloc[1])
+
+
+def test_inventory_spec_fills_integers():
+    df = cleaning.clean_chunk('inventory', raw(
+        last_restock_date=['2025-08-29', ''],
+        next_restock_due=['09/19/2025', 'tomorrow'],
+        stock_level=['12', 'lots'],
+        reorder_threshold=[None, '7'],
+    ))
+    assert df['last_restock_date'].tolist() == [date(2025, 8, 29), None]
+    assert df['next_restock_due'].tolist() == [date(2025, 9, 19), None]
+    assert df['stock_level'].tolist() == [12, 0]
+    assert df['reorder_threshold'].tolist() == [0, 7]
+    assert df['stock_level'].dtype.kind == df['reorder_threshold'].dtype.kind == 'i'
+
+
+def test_delivery_logs_spec_maps_damage_flags():
+    flags = ['1', '0', 'True', 'false', ' YES ', 'n', 'y', 'maybe', None, '']
+    df = cleaning.clean_chunk('delivery_logs', raw(
+        damage_flag=flags,
+        delivery_duration_days=['3', 'x', None, '4', '5', '6', '7', '8', '9', '10'],
+    ))
+    assert df['damage_flag'].tolist() == [True, False, True, False, True, False, True, False, False, False]
+    assert df['damage_flag'].dtype == bool
+    assert df['delivery_duration_days'].tolist() == [3, 0, 0, 4, 5, 6, 7, 8, 9, 10]
+
+
+def test_claims_spec():
+    df = cleaning.clean_chunk('claims', raw(
+        claim_date=['06/03/2025', '2025-06-04'],
+        resolved_date=['NULL', '2025-06-10'],
+        amount_claimed=['915.84', 'unknown'],
+    ))
+    assert df['claim_date'].tolist() == [date(2025, 6, 3), date(2025, 6, 4)]
+    assert df['resolved_date'].tolist() == [None, date(2025, 6, 10)]
+    assert df['amount_claimed'].tolist() == [915.84, 0.0]
+
+
+def test_unknown_tables_and_missing_columns_pass_through():
+    df = raw(reason=['Damage'])
+    assert cleaning.clean_chunk('claims', df.copy()).equals(df)
+    assert cleaning.clean_chunk('not_a_table', df.copy()).equals(df)
+
+
+def test_parallel_and_serial_cleaning_match(tmp_path, monkeypatch):
+    from benchmarks import datagen
+    datagen.generate(tmp_path, 1000)
+    paths = {
+        'shipments': tmp_path / 'shipments.csv',
+        'delivery_logs': tmp_path / 'delivery_logs.csv',
+        'claims': tmp_path / 'claims.csv',
+    }
+    serial = cleaning.read_and_clean(paths, workers=1, chunk_rows=300)
+
+    monkeypatch.setattr(cleaning, 'PARALLEL_MIN_BYTES', 0)
+    parallel = cleaning.read_and_clean(paths, workers=2, chunk_rows=300)
+
+    assert serial.keys() == parallel.keys()
+    for name in paths:
+        pd.testing.assert_frame_equal(serial[name], parallel[name])
+
+
+def test_missing_file_is_reported(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        cleaning.read_and_clean({'claims': tmp_path / 'claims.csv'})
@@ -0,0 +1,124 @@
+# tests/test_forecasting.py
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, insert, select
+from sqlalchemy.orm import Session
+
+import forecasting
+import models
+import rollups
+
+TODAY = date(2025, 1, 1)
+
+
+@pytest.fixture(autouse=True)
+def windows(monkeypatch):
+    monkeypatch.setattr(forecasting, 'FORECAST_WINDOW_DAYS', 28)
+    monkeypatch.setattr(forecasting, 'FORECAST_RECENT_DAYS', 7)
+    monkeypatch.setattr(forecasting, 'FORECAST_RECENT_WEIGHT', 0.5)
+    monkeypatch.setattr(forecasting, 'FORECAST_COVER_DAYS', 30)
+
+
+def test_project_blends_rates_and_projects_dates():
+    rows = forecasting.project([
+        ('W1', 'P1', 100, 20, date(2025, 1, 20), 56, 28),
+        ('W1', 'P2', 5, 10, None, 0, 0),
+        ('W2', 'P1', None, None, date(2025, 1, 5), 28, 0),
+    ], date(2024, 12, 31), TODAY)
+    fields = ('daily_consumption', 'days_until_stockout', 'stockout_date', 'reorder_date',
+              'recommended_order_quantity', 'stockout_before_restock')
+
+    # 2 units/day over the window and 4 over the recent days blend to 3
+    assert [rows[0][field] for field in fields] == [3.0, 33, date(2025, 2, 3), date(2025, 1, 27), 10, False]
+    assert rows[0]['history_end'] == date(2024, 12, 31)
+    # Nothing shipped: no stock-out, but still ordered up to the threshold
+    assert [rows[1][field] for field in fields] == [0.0, None, None, None, 5, False]
+    # Unknown stock counts as none, so it runs out today, before the restock
+    assert [rows[2][field] for field in fields] == [0.5, 0, TODAY, TODAY, 15, True]
+    assert (rows[2]['stock_level'], rows[2]['reorder_threshold']) == (0, 0)
+
+
+def test_project_without_rows():
+    assert forecasting.project([], TODAY, TODAY) == []
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'forecasts.db'}")
+    # SQLite's default limit, which some builds raise
+    event.listen(engine, 'connect', lambda conn, record: conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 32766))
+    models.Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def forecasts(db):
+    return sorted(
+        (row.warehouse_id, row.product_id, row.daily_consumption, row.days_until_stockout, row.stockout_date,
+         row.reorder_date, row.recommended_order_quantity, row.history_end)
+        for row in db.scalars(select(models.InventoryForecast))
+    )
+
+
+def fully_refreshed(db, today):
+    with db.begin_nested() as savepoint:
+        forecasting.refresh_forecasts(db, full=True, today=today)
+        rows = forecasts(db)
+        savepoint.rollback()
+    return rows
+
+
+def add_shipments(db, rows):
+    db.execute(insert(models.Shipment), [
+        {'shipment_id': f'S{number}', 'origin_warehouse': warehouse, 'product_id': product,
+         'ship_date': ship_date, 'quantity': quantity}
+        for number, (warehouse, product, ship_date, quantity) in rows
+    ])
+    rollups.mark_forecasts_stale(db, [(warehouse, product) for _, (warehouse, product, _, _) in rows])
+
+
+def test_newer_history_recomputes_only_the_skus_whose_windows_changed(db):
+    # Forecasts computed on an earlier day are all recomputed, so this runs on the real date
+    today = date.today()
+    end = today - timedelta(days=30)
+    db.execute(insert(models.Inventory), [
+        {'warehouse_id': 'W1', 'product_id': product, 'stock_level': 50, 'reorder_threshold': 10}
+        for product in ('P1', 'P2', 'P3', 'P4')
+    ])
+    add_shipments(db, enumerate([
+        ('W1', 'P1', end - timedelta(days=27), 10),  # first day of the window
+        ('W1', 'P2', end - timedelta(days=6), 10),  # first day of the recent window
+        ('W1', 'P3', end - timedelta(days=10), 10),  # stays in both windows
+        ('W1', 'P4', end, 10),
+    ]))
+    assert forecasting.refresh_forecasts(db, full=True, today=today) == 4
+
+    # A shipment of P4 a day later moves both windows by one day
+    add_shipments(db, [(5, ('W1', 'P4', end + timedelta(days=1), 7))])
+    assert forecasting.refresh_forecasts(db, today=today) == 3
+    assert forecasts(db) == fully_refreshed(db, today)
+    assert {row[-1] for row in forecasts(db)} == {end + timedelta(days=1)}
+
+    assert forecasting.refresh_forecasts(db, today=today) == 0
+    assert forecasting.refresh_forecasts(db, today=today + timedelta(days=1)) == 4
+
+
+def test_stale_keys_beyond_the_bind_parameter_limit(db):
+    # Two bind parameters per key: 17,000 keys would overflow SQLite's 32,766 in a single IN list
+    keys = [(f'W{number % 10}', f'P{number:05d}') for number in range(17_000)]
+    db.execute(insert(models.Inventory), [
+        {'warehouse_id': warehouse, 'product_id': product, 'stock_level': 5, 'reorder_threshold': 1}
+        for warehouse, product in keys
+    ])
+    db.execute(insert(models.Shipment), [
+        {'shipment_id': 'S1', 'origin_warehouse': 'W0', 'product_id': 'P00000', 'ship_date': TODAY, 'quantity': 1}
+    ])
+    assert forecasting.refresh_forecasts(db, full=True) == len(keys)
+
+    rollups.mark_forecasts_stale(db, keys)
+    assert db.scalar(select(models.InventoryForecast.stale).limit(1))
+    assert forecasting.refresh_forecasts(db) == len(keys)
+    assert not any(db.scalars(select(models.InventoryForecast.stale)))
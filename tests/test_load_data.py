@@ -0,0 +1,107 @@
+# tests/test_load_data.py
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+import forecasting
+import load_data
+import models
+import rollups
+from benchmarks import datagen
+
+
+def rollup_tables(db):
+    """The claims rollup, carrier daily rows and forecasts, in comparable form"""
+    return {
+        'claims': sorted(
+            (row.carrier, row.total_shipments, row.total_claims, round(row.claim_amount_sum, 2), row.claim_amount_count)
+            for row in db.scalars(select(models.CarrierClaimsRollup))
+        ),
+        'daily': sorted(
+            (row.carrier, row.day, row.total_deliveries, row.duration_sum, row.duration_count,
+             row.damaged_shipments, row.total_claims, round(row.claim_amount, 2))
+            for row in db.scalars(select(models.CarrierDailyPerformance))
+        ),
+        'forecasts': sorted(
+            (row.warehouse_id, row.product_id, row.stock_level, round(row.daily_consumption, 6),
+             row.stockout_date, row.reorder_date, row.recommended_order_quantity)
+            for row in db.scalars(select(models.InventoryForecast))
+        ),
+    }
+
+
+def rebuilt_tables(db):
+    """The same tables recomputed from scratch, leaving the database untouched"""
+    with db.begin_nested() as savepoint:
+        rollups.rebuild_claims_rollup(db)
+        rollups.refresh_carrier_daily(db, full=True)
+        forecasting.refresh_forecasts(db, full=True)
+        db.flush()
+        tables = rollup_tables(db)
+        savepoint.rollback()
+    return tables
+
+
+def change_rows(folder):
+    """Edit a few rows of each fact table, including every delivery of one carrier"""
+    shipments = pd.read_csv(folder / 'shipments.csv', dtype=str)
+    shipments.loc[:4, 'ship_date'] = '2020-01-15'
+    shipments.loc[5:9, 'quantity'] = '999'
+    shipments.to_csv(folder / 'shipments.csv', index=False)
+
+    logs = pd.read_csv(folder / 'delivery_logs.csv', dtype=str)
+    retired = logs['carrier'].value_counts().index[-1]
+    logs.loc[logs['carrier'] == retired, 'carrier'] = 'Brand New Carrier'
+    logs.loc[:4, 'delivery_duration_days'] = '30'
+    logs.to_csv(folder / 'delivery_logs.csv', index=False)
+
+    claims = pd.read_csv(folder / 'claims.csv', dtype=str)
+    claims.loc[:2, 'amount_claimed'] = '12345.67'
+    claims.loc[3:5, 'delivery_id'] = logs['delivery_id'].iloc[-3:].values
+    claims.to_csv(folder / 'claims.csv', index=False)
+    return retired
+
+
+def test_incremental_reload_matches_full_rebuild(tmp_path):
+    url = f"sqlite:///{tmp_path / 'incremental.db'}"
+    folder = tmp_path / 'data'
+    datagen.generate(folder, 500)
+    load = dict(folder=folder, database_url=url, incremental=True, raise_errors=True,
+                quarantine_dir=tmp_path / 'quarantine')
+    load_data.load_data(**load)
+    retired = change_rows(folder)
+
+    stats = load_data.load_data(**load)
+
+    assert {name: table['unchanged'] > 0 for name, table in stats.items()} == {
+        'shipments': True, 'delivery_logs': True, 'claims': True
+    }
+    engine = create_engine(url)
+    with Session(engine) as db:
+        tables = rollup_tables(db)
+        assert tables == rebuilt_tables(db)
+    engine.dispose()
+    assert retired not in {carrier for carrier, *_ in tables['claims']}
+    assert 'Brand New Carrier' in {carrier for carrier, *_ in tables['claims']}
+
+
+def test_each_load_disposes_of_its_engine(tmp_path, monkeypatch):
+    disposed = []
+
+    def create_loader_engine(connection_string):
+        engine = create_engine(connection_string)
+        dispose = engine.dispose
+        engine.dispose = lambda *args, **kwargs: (disposed.append(engine), dispose(*args, **kwargs))
+        return engine
+
+    monkeypatch.setattr(load_data, 'create_loader_engine', create_loader_engine)
+    datagen.generate(tmp_path / 'data', 50)
+    url = f"sqlite:///{tmp_path / 'dispose.db'}"
+
+    load_data.load_data(folder=tmp_path / 'data', database_url=url, quarantine_dir=tmp_path / 'quarantine')
+    assert len(disposed) == 1
+
+    with pytest.raises(FileNotFoundError):
+        load_data.load_data(folder=tmp_path / 'missing', database_url=url, raise_errors=True)
+    assert len(disposed) == 2
@@ -0,0 +1,77 @@
+# tests/test_migrations.py
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+import load_data
+import migrations
+import models
+from benchmarks import datagen
+
+PINNED_VERSIONS = [version for version, _ in migrations.MIGRATIONS]
+
+
+def index_columns(engine):
+    """{index name: [columns]} across the model tables"""
+    inspector = inspect(engine)
+    return {
+        index['name']: index['column_names']
+        for table in models.Base.metadata.tables
+        for index in inspector.get_indexes(table)
+    }
+
+
+def migration_index_names():
+    return {
+        index.name
+        for _, steps in migrations.MIGRATIONS
+        for step in steps
+        for index in getattr(step, 'indexes', ())
+    }
+
+
+@pytest.fixture(scope='module')
+def datagen_engine(tmp_path_factory):
+    """A small generated dataset loaded into SQLite through upgrade() and the loader"""
+    tmp = tmp_path_factory.mktemp('datagen')
+    url = f"sqlite:///{tmp / 'datagen.db'}"
+    engine = create_engine(url)
+    assert set(PINNED_VERSIONS) <= set(migrations.upgrade(engine))
+    datagen.generate(tmp / 'data', 2000)
+    load_data.load_data(folder=tmp / 'data', database_url=url, raise_errors=True, quarantine_dir=tmp / 'quarantine')
+    yield engine
+    engine.dispose()
+
+
+def test_analytics_queries_use_their_indexes(datagen_engine):
+    report = migrations.check_index_usage(datagen_engine)
+    assert set(report) == {
+        'carrier_performance', 'carrier_daily_refresh', 'vendor_performance', 'claims_aging',
+        'inventory_health', 'forecast_consumption', 'forecast_consumption_stale',
+    }
+    full_scans = {name: plan for name, (_, used, plan) in report.items() if not used}
+    assert not full_scans
+
+
+def test_each_migration_creates_only_its_own_indexes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pinned.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    expected = index_columns(engine)
+    # Back to the schema from before the analytics indexes
+    with engine.begin() as conn:
+        for name in migration_index_names():
+            conn.execute(text(f"DROP INDEX {name}"))
+
+    def applied_through(version):
+        return migrations.MIGRATIONS[:PINNED_VERSIONS.index(version) + 1]
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(migrations, 'MIGRATIONS', applied_through('0002_analytics_indexes'))
+        migrations.apply_migrations(engine)
+    at_0002 = index_columns(engine)
+    assert 'ix_delivery_logs_carrier' in at_0002
+    assert 'ix_shipments_ship_date' not in at_0002
+    assert 'ix_claims_aging' not in at_0002
+
+    assert migrations.apply_migrations(engine) == PINNED_VERSIONS[2:]
+    # Upgrading an old database ends with the same indexes as a fresh one
+    assert index_columns(engine) == expected
@@ -0,0 +1,153 @@
+# tests/test_quality.py
+import io
+from datetime import date
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+import ingest
+import models
+import quality
+
+
+def rule_failures(rule, df, keys=None):
+    return list(pd.Series(rule.failing(df, keys or {}), index=df.index).astype(bool))
+
+
+def test_required():
+    rule = quality.required('claim_id')
+    assert rule.name == 'claim_id_missing'
+    assert rule_failures(rule, pd.DataFrame({'claim_id': ['C1', None, '', '  ']})) == [False, True, True, True]
+
+
+def test_not_negative():
+    rule = quality.not_negative('quantity')
+    assert rule.name == 'quantity_negative'
+    # Values that are not numbers are left to the cleaning stage
+    assert rule_failures(rule, pd.DataFrame({'quantity': [0, 5, -1, 'x', None]})) == [False, False, True, False, False]
+
+
+def test_between():
+    rule = quality.between('vendor_rating', 0, 5)
+    assert rule.name == 'vendor_rating_out_of_range'
+    df = pd.DataFrame({'vendor_rating': [0, 5, 2.5, -0.1, 5.1, None]})
+    assert rule_failures(rule, df) == [False, False, False, True, True, False]
+
+
+def test_not_before():
+    rule = quality.not_before('resolved_date', 'claim_date')
+    assert rule.name == 'resolved_date_before_claim_date'
+    df = pd.DataFrame({
+        'claim_date': [date(2025, 6, 3), date(2025, 6, 3), date(2025, 6, 3), None],
+        'resolved_date': [date(2025, 6, 3), date(2025, 6, 10), date(2025, 6, 1), date(2025, 6, 1)],
+    })
+    assert rule_failures(rule, df) == [False, False, True, False]
+
+
+def test_references():
+    rule = quality.references('shipment_id', 'shipments')
+    assert (rule.name, rule.references) == ('shipment_id_unknown', 'shipments')
+    df = pd.DataFrame({'shipment_id': ['S1', 'S9', None, '']})
+    assert rule_failures(rule, df, {'shipments': {'S1'}}) == [False, True, False, False]
+
+
+def test_unique_key_keeps_the_last_occurrence():
+    rule = quality.unique_key('warehouse_id', 'product_id')
+    assert rule.name == 'duplicate_key'
+    df = pd.DataFrame({'warehouse_id': ['W1', 'W1', 'W2', 'W1'], 'product_id': ['P1', 'P2', 'P1', 'P1']})
+    assert rule_failures(rule, df) == [True, False, False, False]
+
+
+def test_validate_splits_rows_with_their_rule_names():
+    df = pd.DataFrame({
+        'claim_id': ['C1', 'C2', 'C3', 'C3', None],
+        'delivery_id': ['D1', 'D9', 'D1', 'D1', 'D1'],
+        'amount_claimed': [10.0, 5.0, -1.0, 3.0, 2.0],
+        'claim_date': [date(2025, 6, 3)] * 5,
+        'resolved_date': [None, None, None, date(2025, 6, 1), None],
+    })
+    clean, quarantined, counts = quality.validate('claims', df, {'delivery_logs': {'D1'}})
+
+    assert clean['claim_id'].tolist() == ['C1']
+    assert list(zip(quarantined['claim_id'].fillna('-'), quarantined[quality.REASONS_COLUMN])) == [
+        ('C2', 'delivery_id_unknown'),
+        ('C3', 'duplicate_key;amount_claimed_negative'),
+        ('C3', 'resolved_date_before_claim_date'),
+        ('-', 'claim_id_missing'),
+    ]
+    assert counts == {
+        'claim_id_missing': 1, 'duplicate_key': 1, 'delivery_id_unknown': 1,
+        'amount_claimed_negative': 1, 'resolved_date_before_claim_date': 1,
+    }
+
+
+def test_validate_passes_good_rows_untouched():
+    df = pd.DataFrame({'vendor_id': ['V1', 'V2'], 'vendor_rating': [4.5, 0],
+                       'contract_start': ['2024-01-01', None], 'contract_end': ['2025-01-01', '2025-01-01']})
+    clean, quarantined, counts = quality.validate('vendors', df)
+    assert clean.equals(df)
+    assert quarantined.empty and quality.REASONS_COLUMN in quarantined.columns
+    assert not any(counts.values())
+
+
+def test_validate_skips_rules_whose_columns_are_missing():
+    clean, quarantined, counts = quality.validate('shipments', pd.DataFrame({'shipment_id': ['S1']}))
+    assert len(clean) == 1 and quarantined.empty
+    assert set(counts) == {'shipment_id_missing', 'duplicate_key'}
+
+
+def test_write_quarantine_appends_under_the_files_header(tmp_path):
+    assert quality.write_quarantine('claims', pd.DataFrame(), tmp_path) is None
+
+    first = pd.DataFrame({'claim_id': ['C1'], 'amount_claimed': [-1.0],
+                          quality.REASONS_COLUMN: ['amount_claimed_negative']})
+    path = quality.write_quarantine('claims', first, tmp_path)
+    assert path == tmp_path / 'claims.csv'
+
+    second = pd.DataFrame({quality.REASONS_COLUMN: ['claim_id_missing'], 'amount_claimed': [2.0], 'claim_id': [None]})
+    quality.write_quarantine('claims', second, tmp_path)
+
+    written = pd.read_csv(path)
+    assert list(written.columns) == ['claim_id', 'amount_claimed', quality.REASONS_COLUMN, 'quarantined_at']
+    assert written[quality.REASONS_COLUMN].tolist() == ['amount_claimed_negative', 'claim_id_missing']
+    assert written['amount_claimed'].tolist() == [-1.0, 2.0]
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ingest.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        session.add(models.Shipment(shipment_id='S1', ship_date=date(2025, 6, 1)))
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+def test_upload_quarantines_rows_breaking_the_rules(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(quality, 'QUARANTINE_DIR', str(tmp_path / 'quarantine'))
+    upload = io.BytesIO(
+        b"delivery_id,shipment_id,carrier,status,delivery_duration_days,damage_flag,proof_of_delivery_status\n"
+        b"D1,S1,Acme,Delivered,3,0,Signed\n"
+        b"D2,S9,Acme,Delivered,3,0,Signed\n"
+        b"D3,S1,Acme,Delivered,-2,1,Signed\n"
+    )
+
+    result = ingest.ingest_delivery_logs(db, upload, 'logs.csv')
+
+    assert (result.records_inserted, result.records_rejected) == (1, 2)
+    assert result.rule_failures == {'shipment_id_unknown': 1, 'delivery_duration_days_negative': 1}
+    assert result.errors == [
+        'delivery_id D2: shipment_id_unknown',
+        'delivery_id D3: delivery_duration_days_negative',
+    ]
+    assert db.scalars(select(models.DeliveryLog.delivery_id)).all() == ['D1']
+    assert db.scalar(select(func.count()).select_from(models.CarrierClaimsRollup)) == 1
+
+    quarantined = pd.read_csv(tmp_path / 'quarantine' / 'delivery_logs.csv')
+    assert dict(zip(quarantined['delivery_id'], quarantined[quality.REASONS_COLUMN])) == {
+        'D2': 'shipment_id_unknown',
+        'D3': 'delivery_duration_days_negative',
+    }
@@ -0,0 +1,86 @@
+# tests/test_responses.py
+import gzip
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+import responses
+
+ROWS = [{'warehouse_id': f'W{number:03d}', 'product_id': f'P{number:05d}', 'stock_level': number}
+        for number in range(200)]
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    payload = responses.encode(ROWS)
+
+    @app.get('/rows')
+    def rows(request: Request):
+        return responses.json_response(request, payload, {'X-Total-Count': str(len(ROWS))}, max_age=60)
+
+    @app.get('/small')
+    def small(request: Request):
+        return responses.json_response(request, responses.encode({'ok': True}))
+
+    return TestClient(app)
+
+
+def test_payload_has_a_content_etag():
+    payload = responses.encode(ROWS)
+    assert payload.etag == responses.encode(list(ROWS)).etag
+    assert payload.etag != responses.encode(ROWS[:-1]).etag
+    assert payload.etag.startswith('"') and payload.etag.endswith('"')
+
+
+def test_payload_compresses_once_per_encoding():
+    payload = responses.encode(ROWS)
+    assert payload.encoded(None) is payload.body
+    gzipped = payload.encoded('gzip')
+    assert gzip.decompress(gzipped) == payload.body
+    assert len(gzipped) < len(payload.body)
+    assert payload.encoded('gzip') is gzipped
+
+
+def test_gzip_variant(client):
+    response = client.get('/rows', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert response.headers['cache-control'] == 'private, max-age=60'
+    assert response.headers['x-total-count'] == '200'
+    assert response.json() == ROWS
+
+
+def test_brotli_preferred_when_accepted(client):
+    pytest.importorskip('brotli')
+    response = client.get('/rows', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['content-encoding'] == 'br'
+    assert response.json() == ROWS
+
+
+def test_uncompressed_when_not_accepted_or_small(client):
+    for accept in ('identity', 'gzip;q=0', ''):
+        response = client.get('/rows', headers={'Accept-Encoding': accept})
+        assert 'content-encoding' not in response.headers
+        assert response.json() == ROWS
+    response = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+    assert 'content-encoding' not in response.headers
+    assert response.json() == {'ok': True}
+
+
+def test_matching_etag_gets_304(client):
+    etag = client.get('/rows').headers['etag']
+    for if_none_match in (etag, f'W/{etag}', f'"stale", {etag}', '*'):
+        response = client.get('/rows', headers={'If-None-Match': if_none_match, 'Accept-Encoding': 'gzip'})
+        assert response.status_code == 304
+        assert response.content == b''
+        assert response.headers['etag'] == etag
+        assert 'content-encoding' not in response.headers
+
+
+def test_changed_etag_gets_the_body(client):
+    response = client.get('/rows', headers={'If-None-Match': '"stale"'})
+    assert response.status_code == 200
+    assert response.json() == ROWS
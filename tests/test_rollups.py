@@ -0,0 +1,92 @@
+# tests/test_rollups.py
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+import cache
+import models
+import rollups
+
+
+def claims_rollup(db):
+    rollup = models.CarrierClaimsRollup
+    return sorted(
+        (row.carrier, row.total_shipments, row.total_claims, round(row.claim_amount_sum, 6), row.claim_amount_count)
+        for row in db.scalars(select(rollup))
+    )
+
+
+def rebuilt(db):
+    """The rollup rebuild_claims_rollup() produces, leaving the session's rollup untouched"""
+    with db.begin_nested() as savepoint:
+        rollups.rebuild_claims_rollup(db)
+        rows = claims_rollup(db)
+        savepoint.rollback()
+    return rows
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rollups.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        session.add_all([
+            models.Shipment(shipment_id='S1', ship_date=date(2024, 1, 1)),
+            models.Shipment(shipment_id='S2', ship_date=date(2024, 1, 2)),
+            models.DeliveryLog(delivery_id='D1', shipment_id='S1', carrier='Acme'),
+            models.DeliveryLog(delivery_id='D2', shipment_id='S2', carrier='Acme'),
+            models.DeliveryLog(delivery_id='D3', shipment_id='S2', carrier='Globex'),
+            models.Claim(claim_id='C1', delivery_id='D1', amount_claimed=10.5),
+            models.Claim(claim_id='C2', delivery_id='D3', amount_claimed=None),
+        ])
+        session.flush()
+        rollups.record_delivery_logs(session, [('Acme', 'S1'), ('Acme', 'S2'), ('Globex', 'S2')])
+        rollups.record_claims(session, [('D1', 10.5), ('D3', None)])
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+def test_recorded_inserts_match_rebuild(db):
+    assert claims_rollup(db) == rebuilt(db) == [
+        ('Acme', 2, 1, 10.5, 1),
+        ('Globex', 1, 1, 0.0, 0),
+    ]
+
+
+def test_moving_a_carriers_last_delivery_drops_its_row(db):
+    db.get(models.DeliveryLog, 'D3').carrier = 'Initech'
+    db.flush()
+    rollups.update_delivery_logs(db, [('D3', 'Globex', 'S2')], [('D3', 'Initech', 'S2')])
+    db.commit()
+
+    assert claims_rollup(db) == rebuilt(db)
+    assert 'Globex' not in {carrier for carrier, *_ in claims_rollup(db)}
+
+
+def test_updated_claims_match_rebuild(db):
+    claim = db.get(models.Claim, 'C1')
+    claim.delivery_id, claim.amount_claimed = 'D3', 4.0
+    db.flush()
+    rollups.record_claims(db, [('D3', 4.0)], removed=[('D1', 10.5)])
+    db.commit()
+
+    assert claims_rollup(db) == rebuilt(db) == [
+        ('Acme', 2, 0, 0.0, 0),
+        ('Globex', 1, 2, 4.0, 1),
+    ]
+
+
+@pytest.mark.parametrize('write', [
+    lambda db: rollups.record_shipments(db, [('W1', 'P1')]),
+    lambda db: rollups.record_delivery_logs(db, [('Acme', 'S1')]),
+    lambda db: rollups.record_claims(db, [('D1', 1.0)]),
+])
+def test_writes_drop_the_vendor_scorecard_on_commit(db, write):
+    cache.vendor_performance_cache.set('performance', ['stale'])
+    write(db)
+    assert cache.vendor_performance_cache.get('performance') == ['stale']
+    db.commit()
+    assert cache.vendor_performance_cache.get('performance') is None
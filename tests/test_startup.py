@@ -0,0 +1,18 @@
+# tests/test_startup.py
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "openpyxl"]
+
+
+def test_importing_main_skips_heavy_modules(tmp_path):
+    # A fresh interpreter: other tests import pandas into this one
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'startup.db'}")
+    output = subprocess.run(
+        [sys.executable, "-c", f"import sys, main; print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"],
+        cwd=ROOT, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    assert output.strip().splitlines()[-1] == "[]"
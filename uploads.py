@@ -1,36 +1,57 @@
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
-import pandas as pd
-import io
+from pathlib import Path
+import shutil
+import tempfile
 from database import get_db
+import ingest
+import jobqueue
 import pydantic_models
 
 router = APIRouter(prefix="/uploads", tags=["uploads"])
 
-@router.post("/delivery-logs", response_model=pydantic_models.FileUploadResponse)
+def save_upload(fileobj, filename: str):
+    """Copy the spooled upload to a temporary file that outlives the request"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=Path(filename).suffix) as saved:
+        shutil.copyfileobj(fileobj, saved)
+    return saved.name
+
+@router.post(
+    "/delivery-logs",
+    response_model=pydantic_models.FileUploadResponse,
+    responses={202: {"model": pydantic_models.JobStatus, "description": "Queued as a background job"}}
+)
 async def upload_delivery_logs(
     file: UploadFile = File(...),
+    batch_size: int = Query(ingest.DEFAULT_BATCH_SIZE, ge=1, le=100000),
+    background: bool = Query(False, description="Return a job at once and ingest in the background"),
     db: Session = Depends(get_db)
 ):
-    """Upload and process delivery logs file (CSV or Excel)"""
-    if not file.filename.endswith(('.csv', '.xlsx')):
-        raise HTTPException(400, "Only CSV and Excel files are supported")
-    
+    """Upload delivery logs (CSV, Excel or Parquet), validating and inserting them in batches"""
+    if not file.filename.endswith(('.csv', '.xlsx', '.parquet')):
+        raise HTTPException(400, "Only CSV, Excel and Parquet files are supported")
+
+    if background:
+        path = await run_in_threadpool(save_upload, file.file, file.filename)
+        try:
+            job = jobqueue.submit(
+                "upload", f"delivery logs from {file.filename}", jobqueue.ingest_upload, path, file.filename, batch_size
+            )
+        except jobqueue.JobQueueFull as e:
+            Path(path).unlink()
+            raise HTTPException(503, str(e))
+        return JSONResponse(
+            jsonable_encoder(job.as_dict()), status_code=202, headers={"Location": f"/jobs/{job.job_id}"}
+        )
+
     try:
-        content = await file.read()
-        
-        if file.filename.endswith('.csv'):
-            df = pd.read_csv(io.BytesIO(content))
-        else:
-            df = pd.read_excel(io.BytesIO(content))
-        
-        records_processed = len(df)
-        
-        return pydantic_models.FileUploadResponse(
-            filename=file.filename,
-            records_processed=records_processed,
-            message=f"Successfully processed {records_processed} delivery records"
+        # The spooled upload is parsed chunk by chunk off the event loop
+        return await run_in_threadpool(
+            ingest.ingest_delivery_logs, db, file.file, file.filename, batch_size
         )
-        
+
     except Exception as e:
         raise HTTPException(500, f"Error processing file: {str(e)}")
\ No newline at end of file
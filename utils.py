@@ -1,20 +1,94 @@
+import math
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import and_, func, cast, select, tuple_, Integer
 import models
 
-def get_carrier_performance(db: Session):
-    """Get carrier performance metrics (optional)"""
-    result = db.query(
+MAX_BATCH_IDS = 1000
+
+def chunked(values, size: int = MAX_BATCH_IDS):
+    """Split values into lists of at most size, to keep IN lists under the bind-parameter limits"""
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def split_ids(ids: str):
+    """Parse a comma-separated ?ids= value into unique ids, keeping their order"""
+    keys = list(dict.fromkeys(part.strip() for part in ids.split(',') if part.strip()))
+    if len(keys) > MAX_BATCH_IDS:
+        raise ValueError(f"At most {MAX_BATCH_IDS} ids per request")
+    return keys
+
+def days_between(db: Session, later, earlier):
+    """SQL expression for the whole days from earlier to later in the session's dialect"""
+    dialect = db.get_bind().dialect.name
+    if dialect == 'sqlite':
+        return cast(func.julianday(later) - func.julianday(earlier), Integer)
+    if dialect == 'postgresql':
+        return later - earlier
+    return func.datediff(later, earlier)
+
+def pairs_in(first, second, keys):
+    """(first, second) IN keys, plus first IN its values so the index on the pair can be used
+
+    SQLite plans a bare row-value IN list as a full scan.
+    """
+    keys = list(keys)
+    return and_(first.in_({key[0] for key in keys}), tuple_(first, second).in_(keys))
+
+def dialect_insert(dialect: str):
+    """The insert() of a dialect that supports upserts (ON CONFLICT / ON DUPLICATE KEY)"""
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"Upserts are not supported for the {dialect} dialect")
+    return insert
+
+def histogram_percentile(histogram, fraction):
+    """Nearest-rank percentile of a {value: count} histogram (None when it is empty)"""
+    total = sum(histogram.values())
+    if total == 0:
+        return None
+    rank = max(1, math.ceil(fraction * total))
+    seen = 0
+    for value in sorted(histogram):
+        seen += histogram[value]
+        if seen >= rank:
+            return value
+
+def claims_per_delivery():
+    """Subquery of claim count and amount per delivery_id
+
+    Join this instead of the claims table so a delivery with several claims
+    still counts once in delivery-level aggregates.
+    """
+    return select(
+        models.Claim.delivery_id,
+        func.count(models.Claim.claim_id).label('claims'),
+        func.sum(models.Claim.amount_claimed).label('amount')
+    ).group_by(models.Claim.delivery_id).subquery()
+
+def carrier_performance_query():
+    """Per-carrier delivery, damage and claim totals over all delivery logs"""
+    claims = claims_per_delivery()
+    return select(
         models.DeliveryLog.carrier,
         func.count(models.DeliveryLog.delivery_id).label('total_deliveries'),
         func.avg(models.DeliveryLog.delivery_duration_days).label('avg_delivery_time'),
         func.sum(models.DeliveryLog.damage_flag.cast(models.Integer)).label('damaged_shipments'),
-        func.count(models.Claim.claim_id).label('total_claims')
+        func.coalesce(func.sum(claims.c.claims), 0).label('total_claims')
     ).outerjoin(
-        models.Claim, models.DeliveryLog.delivery_id == models.Claim.delivery_id
+        claims, models.DeliveryLog.delivery_id == claims.c.delivery_id
     ).group_by(
         models.DeliveryLog.carrier
-    ).all()
+    )
+
+def get_carrier_performance(db: Session):
+    """Get carrier performance metrics (optional)"""
+    result = db.execute(carrier_performance_query()).all()
     
     return [
         {
@@ -1,32 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
-from database import get_db
+from typing import List, Optional
+from database import get_read_session, get_session, run_db
+import cache
 import crud
 import pydantic_models
+import utils
 
 router = APIRouter(prefix="/vendors", tags=["vendors"])
 
 @router.get("/", response_model=List[pydantic_models.VendorResponse])
-async def read_vendors(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all vendors"""
-    vendors = crud.get_vendors(db, skip=skip, limit=limit)
+async def read_vendors(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    ids: Optional[str] = Query(None, description="Comma-separated vendor ids to fetch in one call"),
+    db: Session = Depends(get_session)
+):
+    """Get all vendors, or just the ones listed in ids"""
+    if ids is not None:
+        try:
+            keys = utils.split_ids(ids)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        return await run_db(db, crud.get_entities_in_order, 'vendors', keys)
+    vendors = await run_db(db, crud.get_vendors, skip=skip, limit=limit)
     return vendors
 
+# Declared before /{vendor_id} so "performance" is not taken for a vendor id
+@router.get("/performance", response_model=List[pydantic_models.VendorPerformance])
+async def get_vendor_performance(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_session)
+):
+    """Get vendor performance metrics, one page at a time"""
+    scorecard = await cache.vendor_performance_cache.get_or_set_async(
+        "performance", lambda: run_db(db, crud.get_vendor_performance)
+    )
+    response.headers["X-Total-Count"] = str(len(scorecard))
+    return scorecard[skip:skip + limit]
+
 @router.get("/{vendor_id}", response_model=pydantic_models.VendorResponse)
-async def read_vendor(vendor_id: int, db: Session = Depends(get_db)):
+async def read_vendor(vendor_id: str, db: Session = Depends(get_session)):
     """Get a specific vendor by ID"""
-    vendor = crud.get_vendor(db, vendor_id)
+    vendor = await run_db(db, crud.get_vendor, vendor_id)
     if vendor is None:
         raise HTTPException(status_code=404, detail="Vendor not found")
     return vendor
 
 @router.post("/", response_model=pydantic_models.VendorResponse)
-async def create_vendor(vendor: pydantic_models.VendorCreate, db: Session = Depends(get_db)):
+async def create_vendor(vendor: pydantic_models.VendorCreate, db: Session = Depends(get_session)):
     """Create a new vendor"""
-    return crud.create_vendor(db, vendor)
-
-@router.get("/performance/", response_model=List[pydantic_models.VendorPerformance])
-async def get_vendor_performance(db: Session = Depends(get_db)):
-    """Get vendor performance metrics"""
-    return crud.get_vendor_performance(db)
\ No newline at end of file
+    if await run_db(db, crud.get_vendor, vendor.vendor_id) is not None:
+        raise HTTPException(status_code=409, detail="Vendor already exists")
+    created = await run_db(db, crud.create_vendor, vendor)
+    cache.vendor_performance_cache.invalidate()
+    return created
\ No newline at end of file